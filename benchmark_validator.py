@@ -0,0 +1,69 @@
+"""SQL validasyon hattı mikro benchmark'ı (eski çoklu parse ile tek geçişli analiz)"""
+
+import re
+import sys
+import timeit
+import sqlparse
+from src.validation.analyzer import analyze_sql
+from src.validation.rules import FORBIDDEN_FUNCTIONS, FORBIDDEN_KEYWORDS
+from src.validation.sql_validator import SQLValidator
+
+
+def build_query(join_count: int, predicate_count: int) -> str:
+    """JOIN ve WHERE koşulu sayısı verilen uzun bir SELECT üret"""
+    joins = "\n".join(
+        f"LEFT JOIN order_items oi{i} ON oi{i}.order_id = o.order_id"
+        for i in range(join_count)
+    )
+    predicates = "\n   OR ".join(
+        f"(o.total_amount > {i * 10} AND c.city = 'Şehir {i}')"
+        for i in range(predicate_count)
+    )
+    return f"""
+        SELECT c.name, COUNT(*) AS order_count, SUM(o.total_amount) AS total
+        FROM customers c
+        JOIN orders o ON o.customer_id = c.customer_id
+        {joins}
+        WHERE o.order_id IN (SELECT order_id FROM payments WHERE status = 'paid')
+          AND ({predicates})
+        GROUP BY c.name
+        HAVING COUNT(*) > 1
+        ORDER BY total DESC
+        LIMIT 100
+    """
+
+
+def legacy_pipeline(sql: str):
+    """Tek analizden önceki akış: üç parse, bir format ve kural başına ayrı tarama"""
+    sql_upper = sql.upper()
+    for keyword in FORBIDDEN_KEYWORDS:
+        re.search(r'\b' + re.escape(keyword) + r'\b', sql_upper)
+    sql_lower = sql.lower()
+    for func in FORBIDDEN_FUNCTIONS:
+        func.lower() in sql_lower
+    sqlparse.parse(sql)  # _check_only_select
+    sqlparse.parse(sql)  # _check_syntax
+    sqlparse.format(' '.join(sql.split()), reindent=True, keyword_case='upper', strip_comments=True)
+    sqlparse.parse(sql)  # extract_table_names
+
+
+def single_pass_pipeline(validator: SQLValidator, sql: str):
+    """Yeni akış: tek birleşik regex taraması ve tek analiz"""
+    analysis = analyze_sql(sql)
+    validator.validate(sql, analysis)
+    return analysis.sanitized, analysis.tables
+
+
+def main(repeat: int = 20):
+    validator = SQLValidator(strict_mode=False)
+    
+    print(f"{'uzunluk':>8} {'eski (ms)':>10} {'yeni (ms)':>10} {'hızlanma':>9}")
+    for join_count, predicate_count in ((1, 2), (4, 10), (8, 30), (10, 60)):
+        sql = build_query(join_count, predicate_count)
+        legacy = min(timeit.repeat(lambda: legacy_pipeline(sql), number=1, repeat=repeat))
+        single = min(timeit.repeat(lambda: single_pass_pipeline(validator, sql), number=1, repeat=repeat))
+        print(f"{len(sql):>8} {legacy * 1000:>10.2f} {single * 1000:>10.2f} {legacy / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
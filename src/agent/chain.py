@@ -1,7 +1,8 @@
 """LangChain zincirleri ve LLM entegrasyonu (Ollama/Gemini)"""
 
 import json
-from typing import Dict, Any, Optional
+from itertools import islice
+from typing import Dict, Any, Optional, Iterable
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.llms import Ollama
 from langchain_core.prompts import PromptTemplate
@@ -107,51 +108,99 @@ class LLMChainManager:
             SQL ve metadata içeren dict
         """
         try:
-            # Prompt oluştur
-            few_shot = FEW_SHOT_EXAMPLES if include_examples else ""
-            
-            prompt_template = PromptTemplate(
-                input_variables=["schema", "few_shot_examples", "question"],
-                template=SYSTEM_PROMPT + "\n\n" + QUERY_GENERATION_PROMPT,
-            )
-            
-            # Chain oluştur (LangChain 0.3 yeni API)
-            chain = prompt_template | self.llm | StrOutputParser()
+            chain, inputs = self._sql_generation_chain(question, schema, include_examples)
             
             # SQL oluştur
             logger.info("Generating SQL", question=question[:100])
-            response = chain.invoke({
-                "schema": schema,
-                "few_shot_examples": few_shot,
-                "question": question,
-            })
+            response = chain.invoke(inputs)
             
-            # JSON parse et
-            result = self._parse_json_response(response)
+            return self._handle_sql_response(response)
             
-            logger.info(
-                "SQL generated successfully",
-                sql=result.get("sql", "")[:100],
-                confidence=result.get("confidence"),
-            )
+        except Exception as e:
+            return self._sql_generation_failure(e)
+    
+    async def agenerate_sql(
+        self,
+        question: str,
+        schema: str,
+        include_examples: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Doğal dil sorusundan SQL oluştur (asyncio)
+        
+        Args:
+            question: Kullanıcının sorusu
+            schema: Veritabanı schema bilgisi
+            include_examples: Few-shot örnekleri dahil et
+        
+        Returns:
+            SQL ve metadata içeren dict
+        """
+        try:
+            chain, inputs = self._sql_generation_chain(question, schema, include_examples)
             
-            return result
+            logger.info("Generating SQL (async)", question=question[:100])
+            response = await chain.ainvoke(inputs)
+            
+            return self._handle_sql_response(response)
             
         except Exception as e:
-            logger.error("Failed to generate SQL", error=str(e))
-            return {
-                "sql": None,
-                "explanation": f"SQL oluşturma hatası: {str(e)}",
-                "confidence": 0.0,
-                "tables_used": [],
-                "error": str(e),
-            }
+            return self._sql_generation_failure(e)
+    
+    def _sql_generation_chain(
+        self,
+        question: str,
+        schema: str,
+        include_examples: bool,
+    ) -> tuple:
+        """SQL oluşturma zincirini ve girdilerini hazırla"""
+        # Prompt oluştur
+        few_shot = FEW_SHOT_EXAMPLES if include_examples else ""
+        
+        prompt_template = PromptTemplate(
+            input_variables=["schema", "few_shot_examples", "question"],
+            template=SYSTEM_PROMPT + "\n\n" + QUERY_GENERATION_PROMPT,
+        )
+        
+        # Chain oluştur (LangChain 0.3 yeni API)
+        chain = prompt_template | self.llm | StrOutputParser()
+        
+        return chain, {
+            "schema": schema,
+            "few_shot_examples": few_shot,
+            "question": question,
+        }
+    
+    def _handle_sql_response(self, response: str) -> Dict[str, Any]:
+        """LLM yanıtını parse edip logla"""
+        # JSON parse et
+        result = self._parse_json_response(response)
+        
+        logger.info(
+            "SQL generated successfully",
+            sql=result.get("sql", "")[:100],
+            confidence=result.get("confidence"),
+        )
+        
+        return result
+    
+    @staticmethod
+    def _sql_generation_failure(error: Exception) -> Dict[str, Any]:
+        """SQL oluşturma hatası için sonuç dict'i"""
+        logger.error("Failed to generate SQL", error=str(error))
+        return {
+            "sql": None,
+            "explanation": f"SQL oluşturma hatası: {str(error)}",
+            "confidence": 0.0,
+            "tables_used": [],
+            "error": str(error),
+        }
     
     def explain_results(
         self,
         question: str,
         sql: str,
-        results: list,
+        results: Iterable,
     ) -> str:
         """
         Sorgu sonuçlarını doğal dilde açıkla
@@ -165,21 +214,36 @@ class LLMChainManager:
             Türkçe açıklama
         """
         try:
-            # Sonuçları formatla (çok uzunsa kısalt)
-            results_text = self._format_results_for_llm(results)
-            
-            prompt_template = PromptTemplate(
-                input_variables=["question", "sql", "results"],
-                template=RESULT_EXPLANATION_PROMPT,
-            )
+            chain, inputs = self._explanation_chain(question, sql, results)
+            explanation = chain.invoke(inputs)
             
-            chain = prompt_template | self.llm | StrOutputParser()
+            logger.info("Results explained successfully")
+            return explanation.strip()
             
-            explanation = chain.invoke({
-                "question": question,
-                "sql": sql,
-                "results": results_text,
-            })
+        except Exception as e:
+            logger.error("Failed to explain results", error=str(e))
+            return f"Sonuç açıklama hatası: {str(e)}"
+    
+    async def aexplain_results(
+        self,
+        question: str,
+        sql: str,
+        results: Iterable,
+    ) -> str:
+        """
+        Sorgu sonuçlarını doğal dilde açıkla (asyncio)
+        
+        Args:
+            question: Kullanıcının sorusu
+            sql: Çalıştırılan SQL
+            results: Sorgu sonuçları
+        
+        Returns:
+            Türkçe açıklama
+        """
+        try:
+            chain, inputs = self._explanation_chain(question, sql, results)
+            explanation = await chain.ainvoke(inputs)
             
             logger.info("Results explained successfully")
             return explanation.strip()
@@ -188,6 +252,24 @@ class LLMChainManager:
             logger.error("Failed to explain results", error=str(e))
             return f"Sonuç açıklama hatası: {str(e)}"
     
+    def _explanation_chain(self, question: str, sql: str, results: Iterable) -> tuple:
+        """Sonuç açıklama zincirini ve girdilerini hazırla"""
+        # Sonuçları formatla (çok uzunsa kısalt)
+        results_text = self._format_results_for_llm(results)
+        
+        prompt_template = PromptTemplate(
+            input_variables=["question", "sql", "results"],
+            template=RESULT_EXPLANATION_PROMPT,
+        )
+        
+        chain = prompt_template | self.llm | StrOutputParser()
+        
+        return chain, {
+            "question": question,
+            "sql": sql,
+            "results": results_text,
+        }
+    
     def explain_error(
         self,
         question: str,
@@ -206,18 +288,35 @@ class LLMChainManager:
             Türkçe hata açıklaması
         """
         try:
-            prompt_template = PromptTemplate(
-                input_variables=["question", "sql", "error"],
-                template=ERROR_EXPLANATION_PROMPT,
-            )
+            chain, inputs = self._error_chain(question, sql, error)
+            explanation = chain.invoke(inputs)
             
-            chain = prompt_template | self.llm | StrOutputParser()
+            return explanation.strip()
             
-            explanation = chain.invoke({
-                "question": question,
-                "sql": sql,
-                "error": error,
-            })
+        except Exception as e:
+            logger.error("Failed to explain error", error=str(e))
+            return f"Bir hata oluştu: {error}"
+    
+    async def aexplain_error(
+        self,
+        question: str,
+        sql: str,
+        error: str,
+    ) -> str:
+        """
+        Hata mesajını kullanıcı dostu şekilde açıkla (asyncio)
+        
+        Args:
+            question: Kullanıcının sorusu
+            sql: Hatalı SQL
+            error: Hata mesajı
+        
+        Returns:
+            Türkçe hata açıklaması
+        """
+        try:
+            chain, inputs = self._error_chain(question, sql, error)
+            explanation = await chain.ainvoke(inputs)
             
             return explanation.strip()
             
@@ -225,6 +324,21 @@ class LLMChainManager:
             logger.error("Failed to explain error", error=str(e))
             return f"Bir hata oluştu: {error}"
     
+    def _error_chain(self, question: str, sql: str, error: str) -> tuple:
+        """Hata açıklama zincirini ve girdilerini hazırla"""
+        prompt_template = PromptTemplate(
+            input_variables=["question", "sql", "error"],
+            template=ERROR_EXPLANATION_PROMPT,
+        )
+        
+        chain = prompt_template | self.llm | StrOutputParser()
+        
+        return chain, {
+            "question": question,
+            "sql": sql,
+            "error": error,
+        }
+    
     def request_clarification(
         self,
         question: str,
@@ -329,28 +443,35 @@ class LLMChainManager:
             "error": "Could not parse response",
         }
     
-    def _format_results_for_llm(self, results: list, max_rows: int = 10) -> str:
+    def _format_results_for_llm(self, results: Iterable, max_rows: int = 10) -> str:
         """
         Sonuçları LLM için formatla
         
         Args:
-            results: Sorgu sonuçları
+            results: Sorgu sonuçları (liste veya stream_query gibi bir iterator;
+                iterator ise sadece ilk satırlar bellekte tutulur)
             max_rows: Maksimum gösterilecek satır sayısı
         
         Returns:
             Formatlanmış sonuç metni
         """
-        if not results:
-            return "Sonuç bulunamadı."
+        rows = iter(results)
         
-        # İlk N satırı al
-        limited_results = results[:max_rows]
+        # İlk N satırı al (sadece bu satırlar dict'e çevrilir)
+        limited_results = [dict(row) for row in islice(rows, max_rows)]
+        if not limited_results:
+            return "Sonuç bulunamadı."
         
         # JSON formatında string'e çevir
         results_text = json.dumps(limited_results, ensure_ascii=False, indent=2)
         
-        if len(results) > max_rows:
-            results_text += f"\n\n... ve {len(results) - max_rows} satır daha."
+        if hasattr(results, "__len__"):
+            remaining = len(results) - len(limited_results)
+        else:
+            remaining = sum(1 for _ in rows)
+        
+        if remaining > 0:
+            results_text += f"\n\n... ve {remaining} satır daha."
         
         return results_text
 
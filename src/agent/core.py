@@ -1,11 +1,21 @@
 """Ana AI Agent sınıfı"""
 
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Set
 from ..database.connection import DatabaseConnection
 from ..database.schema_manager import SchemaManager
+from ..database.schema_cache import SchemaCache
+from ..database.schema_listener import SchemaChangeListener
 from ..database.executor import QueryExecutor
+from ..database.async_executor import AsyncQueryExecutor
+from ..database.admission import AdmissionController
+from ..database.plan_store import SlowQueryLog
+from ..database.result_cache import ResultCache, TableChangeTracker
+from ..database.scheduler import QueryScheduler
 from ..validation.sql_validator import SQLValidator, ValidationError
+from ..validation.validation_cache import ValidationCache
 from .chain import LLMChainManager
+from ..config import settings
 from ..utils.logger import logger
 
 
@@ -16,6 +26,7 @@ class QueryAgent:
         self,
         db_connection: DatabaseConnection,
         temperature: float = 0.1,
+        schema_top_k: Optional[int] = None,
     ):
         """
         Query agent'ı başlat
@@ -23,15 +34,57 @@ class QueryAgent:
         Args:
             db_connection: Veritabanı bağlantısı
             temperature: LLM yaratıcılık seviyesi
+            schema_top_k: Prompt'a sadece en ilgili bu kadar tabloyu (ve FK
+                komşularını) koy; 0 ise tüm schema gönderilir
+                (None ise ayarlardaki değer kullanılır)
         """
         self.db = db_connection
-        self.schema_manager = SchemaManager(db_connection)
-        self.validator = SQLValidator(strict_mode=True)
-        self.executor = QueryExecutor(db_connection, self.validator)
+        self.schema_top_k = (
+            schema_top_k if schema_top_k is not None else settings.schema_prune_top_k
+        )
+        schema_cache = SchemaCache.from_settings() if settings.schema_cache_enabled else None
+        self.schema_manager = SchemaManager(db_connection, cache=schema_cache)
+        # Aynı SQL tekrar geldiğinde validasyon ve analiz önbellekten okunur
+        validation_cache = (
+            ValidationCache.from_settings() if settings.validation_cache_max_entries else None
+        )
+        # Açıksa LLM'in uydurduğu tablo/kolon adları çalıştırmadan önce yakalanır
+        schema_provider = self.schema_manager.get_full_schema if settings.schema_check_enabled else None
+        self.validator = SQLValidator(
+            strict_mode=True, cache=validation_cache, schema_provider=schema_provider
+        )
+        self.result_cache = ResultCache.from_settings() if settings.result_cache_enabled else None
+        change_tracker = (
+            TableChangeTracker(db_connection, settings.result_cache_track_interval)
+            if self.result_cache is not None and settings.result_cache_track_changes
+            else None
+        )
+        admission = AdmissionController.from_settings() if settings.admission_enabled else None
+        self.slow_query_log = (
+            SlowQueryLog.from_settings(db_connection) if settings.slow_query_log_enabled else None
+        )
+        # Senkron ve async yollar aynı kotaları paylaşır
+        self.scheduler = QueryScheduler.from_settings() if settings.scheduler_enabled else None
+        self.executor = QueryExecutor(
+            db_connection, self.validator,
+            result_cache=self.result_cache, change_tracker=change_tracker,
+            admission=admission, slow_query_log=self.slow_query_log,
+            scheduler=self.scheduler, cost_model_provider=self.schema_manager.get_cost_model,
+        )
+        self.async_executor = AsyncQueryExecutor(
+            db_connection, self.validator,
+            result_cache=self.result_cache, change_tracker=change_tracker,
+            admission=admission, slow_query_log=self.slow_query_log,
+            scheduler=self.scheduler, cost_model_provider=self.schema_manager.get_cost_model,
+        )
         self.llm_chain = LLMChainManager(temperature=temperature)
         
         # Schema'yı önbellekte tut
         self._cached_schema: Optional[str] = None
+        self._schema_listener: Optional[SchemaChangeListener] = None
+        
+        if settings.schema_listen_enabled:
+            self.start_schema_listener()
         
         logger.info("QueryAgent initialized")
     
@@ -40,6 +93,8 @@ class QueryAgent:
         question: str,
         explain_results: bool = True,
         return_raw: bool = False,
+        user: Optional[str] = None,
+        priority: str = "interactive",
     ) -> Dict[str, Any]:
         """
         Doğal dil sorusunu işle ve cevapla
@@ -48,6 +103,8 @@ class QueryAgent:
             question: Kullanıcının Türkçe sorusu
             explain_results: Sonuçları LLM ile açıkla
             return_raw: Ham sonuçları da döndür
+            user: Kullanıcı veya tenant kimliği (zamanlayıcı kotaları için)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
         
         Returns:
             Sorgu sonuçları ve metadata
@@ -66,7 +123,7 @@ class QueryAgent:
         
         try:
             # 1. Schema bilgisini al
-            schema = self._get_schema()
+            schema = self._get_schema(question)
             
             # 2. SQL oluştur
             sql_result = self.llm_chain.generate_sql(
@@ -83,8 +140,10 @@ class QueryAgent:
             result["metadata"]["confidence"] = sql_result.get("confidence", 0.0)
             result["metadata"]["tables_used"] = sql_result.get("tables_used", [])
             
-            # 3. SQL'i valide et
+            # 3. SQL'i valide et (yanlış yazılmış adlar yerelde düzeltilebilir)
             is_valid, error_msg = self.validator.validate(sql_result["sql"])
+            if not is_valid:
+                is_valid = self._apply_schema_repair(sql_result, result)
             if not is_valid:
                 result["error"] = error_msg
                 result["explanation"] = self.llm_chain.explain_error(
@@ -99,11 +158,15 @@ class QueryAgent:
                 query_results = self.executor.execute_query(
                     sql=sql_result["sql"],
                     validate=False,  # Zaten valide ettik
+                    question=question,
+                    user=user,
+                    priority=priority,
                 )
                 
                 result["results"] = query_results
                 result["success"] = True
                 result["metadata"]["row_count"] = len(query_results)
+                result["metadata"].update(query_results.metadata)
                 
                 # 5. Sonuçları açıkla
                 if explain_results and query_results:
@@ -133,13 +196,174 @@ class QueryAgent:
         
         return result
     
-    def _get_schema(self) -> str:
+    async def aquery(
+        self,
+        question: str,
+        explain_results: bool = True,
+        return_raw: bool = False,
+        user: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> Dict[str, Any]:
+        """
+        Doğal dil sorusunu event loop'u bloklamadan işle ve cevapla
+        
+        LLM çağrıları ainvoke ile, sorgu psycopg 3 async havuzu ile yapılır;
+        böylece tek bir event loop aynı anda çok sayıda soruyu bekletebilir.
+        
+        Args:
+            question: Kullanıcının Türkçe sorusu
+            explain_results: Sonuçları LLM ile açıkla
+            return_raw: Ham sonuçları da döndür
+            user: Kullanıcı veya tenant kimliği (zamanlayıcı kotaları için)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
+        
+        Returns:
+            Sorgu sonuçları ve metadata
+        """
+        logger.info("Processing query (async)", question=question)
+        
+        result = {
+            "question": question,
+            "sql": None,
+            "results": None,
+            "explanation": None,
+            "success": False,
+            "error": None,
+            "metadata": {},
+        }
+        
+        try:
+            # 1. Schema bilgisini al (ilk yükleme katalog sorgusu yapar)
+            schema = await asyncio.to_thread(self._get_schema, question)
+            
+            # 2. SQL oluştur
+            sql_result = await self.llm_chain.agenerate_sql(
+                question=question,
+                schema=schema,
+                include_examples=True,
+            )
+            
+            if not sql_result.get("sql"):
+                result["error"] = sql_result.get("explanation", "SQL oluşturulamadı")
+                return result
+            
+            result["sql"] = sql_result["sql"]
+            result["metadata"]["confidence"] = sql_result.get("confidence", 0.0)
+            result["metadata"]["tables_used"] = sql_result.get("tables_used", [])
+            
+            # 3. SQL'i valide et (yanlış yazılmış adlar yerelde düzeltilebilir)
+            is_valid, error_msg = self.validator.validate(sql_result["sql"])
+            if not is_valid:
+                is_valid = self._apply_schema_repair(sql_result, result)
+            if not is_valid:
+                result["error"] = error_msg
+                result["explanation"] = await self.llm_chain.aexplain_error(
+                    question=question,
+                    sql=sql_result["sql"],
+                    error=error_msg,
+                )
+                return result
+            
+            # 4. SQL'i çalıştır
+            try:
+                query_results = await self.async_executor.aexecute_query(
+                    sql=sql_result["sql"],
+                    validate=False,  # Zaten valide ettik
+                    question=question,
+                    user=user,
+                    priority=priority,
+                )
+                
+                result["results"] = query_results
+                result["success"] = True
+                result["metadata"]["row_count"] = len(query_results)
+                result["metadata"].update(query_results.metadata)
+                
+                # 5. Sonuçları açıkla
+                if explain_results and query_results:
+                    result["explanation"] = await self.llm_chain.aexplain_results(
+                        question=question,
+                        sql=sql_result["sql"],
+                        results=query_results,
+                    )
+                elif not query_results:
+                    result["explanation"] = "Sorgunuz için sonuç bulunamadı."
+                else:
+                    result["explanation"] = sql_result.get("explanation", "")
+                
+            except Exception as e:
+                result["error"] = str(e)
+                result["explanation"] = await self.llm_chain.aexplain_error(
+                    question=question,
+                    sql=sql_result["sql"],
+                    error=str(e),
+                )
+                logger.error("Query execution failed", error=str(e))
+            
+        except Exception as e:
+            result["error"] = str(e)
+            result["explanation"] = f"Beklenmeyen bir hata oluştu: {str(e)}"
+            logger.error("Query processing failed", error=str(e))
+        
+        return result
+    
+    async def aclose(self):
+        """Async bağlantı havuzunu kapat"""
+        await self.async_executor.aclose()
+    
+    def _apply_schema_repair(self, sql_result: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """
+        Schema'da bulunamayan adların tek ve açık karşılığı varsa SQL'i düzelt
+        
+        Böylece uydurulmuş bir kolon için ne veritabanı hatası ne de ek bir
+        LLM turu harcanır.
+        
+        Args:
+            sql_result: LLM'in ürettiği SQL sonucu (düzeltilirse güncellenir)
+            result: Cevap sözlüğü (sql ve metadata güncellenir)
+        
+        Returns:
+            True ise düzeltilmiş SQL validasyondan geçti
+        """
+        repair = self.validator.suggest_repair(sql_result["sql"])
+        if repair is None:
+            return False
+        
+        sql_result["sql"], replacements = repair
+        result["sql"] = sql_result["sql"]
+        result["metadata"]["sql_repaired"] = replacements
+        return True
+    
+    def _get_schema(self, question: Optional[str] = None) -> str:
         """
         Veritabanı schema'sını al (cache'den veya yeniden)
         
+        Budama açıksa ve soru verilmişse sadece soruyla ilgili tablolar döner;
+        hiçbir tablo eşleşmezse tüm schema'ya düşülür. Token bütçesi varsa
+        metin bütçeye sığacak şekilde küçültülür.
+        
+        Args:
+            question: Kullanıcının sorusu
+        
         Returns:
             LLM için formatlanmış schema
         """
+        budget = settings.schema_token_budget or None
+        level = settings.schema_render_level
+        
+        if question and self.schema_top_k > 0:
+            tables = self.schema_manager.find_relevant_tables(question, self.schema_top_k)
+            if tables:
+                return self.schema_manager.get_schema_for_llm(
+                    tables=tables, budget=budget, level=level, question=question
+                )
+        
+        if budget is not None or level != "full":
+            # Parçalar önbellekte; bütçeli metni her soru için birleştirmek ucuz
+            return self.schema_manager.get_schema_for_llm(
+                budget=budget, level=level, question=question
+            )
+        
         if self._cached_schema is None:
             logger.info("Loading database schema")
             self._cached_schema = self.schema_manager.get_schema_for_llm()
@@ -149,9 +373,50 @@ class QueryAgent:
     def refresh_schema(self):
         """Schema cache'ini yenile"""
         logger.info("Refreshing schema cache")
-        self.schema_manager.clear_cache()
+        self.schema_manager.clear_cache(persistent=True)
         self._cached_schema = None
     
+    def start_schema_listener(self, install_trigger: bool = False):
+        """
+        DDL değişikliklerini dinleyip schema'yı arka planda artımlı yenile
+        
+        Args:
+            install_trigger: True ise event trigger'ı da kur (superuser gerekir)
+        """
+        if self._schema_listener is None:
+            self._schema_listener = SchemaChangeListener(
+                self.db,
+                on_change=self._on_schema_change,
+                schemas=None if self.schema_manager.all_schemas else self.schema_manager.schemas,
+                qualify_names=self.schema_manager.qualify_names,
+            )
+        
+        if install_trigger:
+            self._schema_listener.install_trigger()
+        
+        self._schema_listener.start()
+    
+    def stop_schema_listener(self):
+        """Schema değişiklik dinleyicisini durdur"""
+        if self._schema_listener is not None:
+            self._schema_listener.stop()
+            self._schema_listener = None
+    
+    def _on_schema_change(self, tables: Set[str]):
+        """
+        Değişen tabloları yenile ve LLM schema metnini güncelle
+        
+        Args:
+            tables: Değişen tablo adları
+        """
+        logger.info("Schema change detected", tables=sorted(tables))
+        self.schema_manager.refresh_tables(tables)
+        if self.result_cache is not None:
+            self.result_cache.invalidate_tables(tables)
+        
+        if self._cached_schema is not None:
+            self._cached_schema = self.schema_manager.get_schema_for_llm()
+    
     def test_query(self, question: str) -> Dict[str, Any]:
         """
         Sorguyu test et (çalıştırmadan)
@@ -164,7 +429,7 @@ class QueryAgent:
         """
         logger.info("Testing query", question=question)
         
-        schema = self._get_schema()
+        schema = self._get_schema(question)
         sql_result = self.llm_chain.generate_sql(
             question=question,
             schema=schema,
@@ -280,5 +545,18 @@ class QueryAgent:
                 "has_foreign_keys": len(table_info.get("foreign_keys", [])) > 0,
             }
         
+        pool_stats = self.db.get_pool_stats()
+        if pool_stats is not None:
+            stats["pool"] = pool_stats
+        
+        if self.result_cache is not None:
+            stats["result_cache"] = self.result_cache.get_stats()
+        
+        if self.scheduler is not None:
+            stats["scheduler"] = self.scheduler.get_stats()
+        
+        if self.validator.cache is not None:
+            stats["validation_cache"] = self.validator.cache.get_stats()
+        
         return stats
 
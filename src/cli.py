@@ -7,8 +7,10 @@ from rich.table import Table
 from rich.markdown import Markdown
 from rich import box
 from .database.connection import DatabaseConnection
+from .database.export import EXPORT_FORMATS, export_format_for
+from .database.plan_store import PlanStore, dominant_nodes
 from .agent.core import QueryAgent
-from .utils.formatters import format_table
+from .utils.formatters import format_table, json_default
 from .utils.logger import logger
 from .config import settings
 
@@ -75,7 +77,10 @@ def print_schema(agent: QueryAgent):
                 table_header += f" - {table_info['comment']}"
             
             console.print(f"\n[bold cyan]{table_header}[/bold cyan]")
-            console.print(f"Satır sayısı: {table_info.get('row_count', 0)}")
+            if table_info.get("row_count_estimated"):
+                console.print(f"Satır sayısı: ~{table_info.get('row_count', 0)} (tahmini)")
+            else:
+                console.print(f"Satır sayısı: {table_info.get('row_count', 0)}")
             
             # Kolonlar tablosu
             col_table = Table(show_header=True, box=box.SIMPLE)
@@ -136,6 +141,25 @@ def print_stats(agent: QueryAgent):
             )
         
         console.print(stats_table)
+        
+        # Bağlantı havuzu
+        if stats.get("pool"):
+            pool = stats["pool"]
+            console.print(
+                f"\nBağlantı havuzu: {pool['in_use']}/{pool['max_size']} kullanımda "
+                f"(%{pool['utilization'] * 100:.0f}), boşta {pool['idle']}, "
+                f"ort. bekleme {pool['wait_time_avg'] * 1000:.1f} ms, "
+                f"zaman aşımı {pool['timeouts']}"
+            )
+        
+        # Sorgu zamanlayıcı
+        if stats.get("scheduler"):
+            scheduler = stats["scheduler"]
+            console.print(
+                f"Zamanlayıcı: {scheduler['running']}/{scheduler['max_concurrent']} çalışıyor, "
+                f"{scheduler['queued']} sırada, ort. bekleme {scheduler['wait_time_avg'] * 1000:.1f} ms, "
+                f"reddedilen {scheduler['rejected']}, zaman aşımı {scheduler['timeouts']}"
+            )
     
     except Exception as e:
         console.print(f"[red]İstatistikler gösterilirken hata: {str(e)}[/red]")
@@ -243,9 +267,19 @@ def interactive():
                 # Metadata
                 if result.get("metadata"):
                     meta = result["metadata"]
+                    notes = " | Önbellekten" if meta.get("cache") == "hit" else ""
+                    if meta.get("truncated"):
+                        notes += " | Sonuç kısaltıldı (MAX_RESULT_ROWS)"
+                    if meta.get("admission") == "sampled":
+                        notes += f" | %{meta.get('sample_percent')} örneklem (tahmini sonuç)"
+                    if meta.get("queue_wait_ms"):
+                        notes += f" | Sırada {meta['queue_wait_ms']:.0f} ms beklendi"
+                    if meta.get("sql_repaired"):
+                        fixes = ", ".join(f"{bad} → {good}" for bad, good in meta["sql_repaired"].items())
+                        notes += f" | SQL düzeltildi ({fixes})"
                     console.print(
                         f"\n[dim]Güven: {meta.get('confidence', 0):.0%} | "
-                        f"Satır: {meta.get('row_count', 0)}[/dim]"
+                        f"Satır: {meta.get('row_count', 0)}{notes}[/dim]"
                     )
             else:
                 console.print("\n[bold red]❌ Hata![/bold red]")
@@ -267,13 +301,17 @@ def interactive():
 @click.argument('question')
 @click.option('--raw', is_flag=True, help='Ham sonuçları göster')
 @click.option('--no-explain', is_flag=True, help='Açıklama yapma')
-def query(question: str, raw: bool, no_explain: bool):
+@click.option('--stream', is_flag=True, help='Sonuçları parça parça akıt (büyük sonuçlar için)')
+def query(question: str, raw: bool, no_explain: bool, stream: bool):
     """Tek bir sorgu çalıştır"""
     try:
         # Bağlantı ve agent
         db = DatabaseConnection()
         agent = QueryAgent(db)
         
+        if stream:
+            return stream_query(agent, question, raw)
+        
         # Sorguyu çalıştır
         result = agent.query(question, explain_results=not no_explain)
         
@@ -281,7 +319,7 @@ def query(question: str, raw: bool, no_explain: bool):
             if raw:
                 # Ham JSON çıktısı
                 import json
-                console.print(json.dumps(result, ensure_ascii=False, indent=2))
+                console.print(json.dumps(result, ensure_ascii=False, indent=2, default=json_default))
             else:
                 # Formatlanmış çıktı
                 if result.get("explanation"):
@@ -302,6 +340,124 @@ def query(question: str, raw: bool, no_explain: bool):
     return 0
 
 
+def stream_query(agent: QueryAgent, question: str, raw: bool) -> int:
+    """Soruyu SQL'e çevir ve sonuçları server-side cursor ile parça parça yazdır"""
+    test_result = agent.test_query(question)
+    if not test_result.get("valid"):
+        console.print(f"[red]Hata: {test_result.get('error') or 'SQL oluşturulamadı'}[/red]")
+        return 1
+    
+    sql = test_result["generated_sql"]
+    console.print(f"[dim]SQL:[/dim] [cyan]{sql}[/cyan]")
+    
+    row_count = 0
+    batches = agent.executor.stream_batches(sql, validate=False)
+    for batch in batches:
+        if raw:
+            import json
+            for row in batch:
+                console.print(json.dumps(row, ensure_ascii=False, default=str))
+        else:
+            console.print(format_table(batch, title=f"Satır {row_count + 1}-{row_count + len(batch)}"))
+        row_count += len(batch)
+    
+    console.print(f"\n[dim]Toplam {row_count} satır[/dim]")
+    if batches.truncated:
+        console.print("[yellow]Sonuç kısaltıldı (MAX_RESULT_ROWS)[/yellow]")
+    return 0
+
+
+@cli.command()
+@click.argument('question')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option(
+    '--format', 'export_format', type=click.Choice(EXPORT_FORMATS), default=None,
+    help='Çıktı formatı (varsayılan: dosya uzantısından)',
+)
+def export(question: str, output: str, export_format: str):
+    """Soru sonucunun tamamını dosyaya aktar (COPY ile, sabit bellek)"""
+    export_format = export_format or export_format_for(output)
+    if export_format is None:
+        console.print("[red]Hata: Format belirlenemedi; --format csv|jsonl|parquet verin[/red]")
+        return 1
+    
+    try:
+        db = DatabaseConnection()
+        agent = QueryAgent(db)
+        
+        test_result = agent.test_query(question)
+        if not test_result.get("valid"):
+            console.print(f"[red]Hata: {test_result.get('error') or 'SQL oluşturulamadı'}[/red]")
+            return 1
+        
+        sql = test_result["generated_sql"]
+        console.print(f"[dim]SQL:[/dim] [cyan]{sql}[/cyan]")
+        
+        stats = agent.executor.export_query(sql, output, export_format=export_format, validate=False)
+        size = f", {stats['bytes'] / 1024 / 1024:.1f} MB" if "bytes" in stats else ""
+        console.print(
+            f"[green]✓ {stats['rows']} satır {output} dosyasına yazıldı "
+            f"({stats['duration_ms'] / 1000:.1f} sn{size})[/green]"
+        )
+    
+    except Exception as e:
+        console.print(f"[red]Hata: {str(e)}[/red]")
+        return 1
+    
+    return 0
+
+
+@cli.command(name="slow-queries")
+@click.option('--limit', default=10, show_default=True, help='Gösterilecek sorgu sayısı')
+@click.option(
+    '--order', type=click.Choice(['max', 'total', 'calls']), default='max', show_default=True,
+    help='Sıralama: en uzun süre, toplam süre veya çalıştırma sayısı',
+)
+@click.option('--sql', 'show_sql', is_flag=True, help='SQL metinlerini tam göster')
+def slow_queries(limit: int, order: str, show_sql: bool):
+    """Yavaş sorgu raporu (SLOW_QUERY_LOG_ENABLED ile toplanan planlar)"""
+    store = PlanStore.from_settings()
+    try:
+        records = store.worst(limit=limit, order_by=order)
+    finally:
+        store.close()
+    
+    if not records:
+        console.print("[yellow]Kayıtlı yavaş sorgu yok.[/yellow]")
+        return 0
+    
+    report = Table(title="🐢 Yavaş Sorgular", show_header=True, box=box.ROUNDED)
+    report.add_column("Parmak izi", style="dim")
+    report.add_column("Çağrı", justify="right")
+    report.add_column("Maks ms", style="red", justify="right")
+    report.add_column("Ort ms", justify="right")
+    report.add_column("Soru / SQL", style="cyan")
+    report.add_column("Baskın düğümler", style="magenta")
+    
+    for record in records:
+        sql = record["sql"] if show_sql else record["sql"][:80]
+        text = f"{record['question']}\n[dim]{sql}[/dim]" if record["question"] else sql
+        
+        if record["plan"]:
+            nodes = "\n".join(dominant_nodes(record["plan"]["Plan"]))
+            if record["plan_kind"] == "estimate":
+                nodes += "\n[dim](tahmini plan)[/dim]"
+        else:
+            nodes = "[dim]plan yakalanmadı[/dim]"
+        
+        report.add_row(
+            record["fingerprint"],
+            str(record["calls"]),
+            f"{record['max_ms']:.0f}",
+            f"{record['avg_ms']:.0f}",
+            text,
+            nodes,
+        )
+    
+    console.print(report)
+    return 0
+
+
 @cli.command()
 def test():
     """Bağlantıyı test et"""
@@ -24,10 +24,70 @@ class Settings(BaseSettings):
     db_name: str = Field(..., alias="DB_NAME")
     db_user: str = Field(..., alias="DB_USER")
     db_password: str = Field(..., alias="DB_PASSWORD")
+    db_schemas: str = Field(default="public", alias="DB_SCHEMAS")  # "public,sales" veya "*" (tümü)
+    
+    # Bağlantı Havuzu Ayarları
+    db_pool_enabled: bool = Field(default=False, alias="DB_POOL_ENABLED")
+    db_pool_min_size: int = Field(default=1, alias="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(default=10, alias="DB_POOL_MAX_SIZE")
+    db_pool_max_lifetime: float = Field(default=3600.0, alias="DB_POOL_MAX_LIFETIME")  # saniye
+    db_pool_idle_timeout: float = Field(default=600.0, alias="DB_POOL_IDLE_TIMEOUT")  # saniye
+    db_pool_checkout_timeout: float = Field(default=30.0, alias="DB_POOL_CHECKOUT_TIMEOUT")  # saniye
+    
+    # Oturum Ayarları (bağlantı açılırken uygulanır)
+    db_read_only: bool = Field(default=True, alias="DB_READ_ONLY")  # default_transaction_read_only
+    db_idle_in_transaction_timeout: int = Field(default=60, alias="DB_IDLE_IN_TRANSACTION_TIMEOUT")  # saniye, 0: kapalı
+    db_work_mem: Optional[str] = Field(default=None, alias="DB_WORK_MEM")  # örn. "64MB" (None: sunucu varsayılanı)
     
     # Güvenlik Ayarları
     max_query_timeout: int = Field(default=30, alias="MAX_QUERY_TIMEOUT")
     max_result_rows: int = Field(default=1000, alias="MAX_RESULT_ROWS")
+    stream_batch_size: int = Field(default=1000, alias="STREAM_BATCH_SIZE")  # server-side cursor fetchmany boyutu
+    export_max_rows: int = Field(default=0, alias="EXPORT_MAX_ROWS")  # dışa aktarma satır sınırı, 0: sınırsız
+    export_timeout: int = Field(default=600, alias="EXPORT_TIMEOUT")  # saniye
+    validation_cache_max_entries: int = Field(default=1024, alias="VALIDATION_CACHE_MAX_ENTRIES")  # 0: kapalı
+    
+    # Sonuç Önbelleği Ayarları
+    result_cache_enabled: bool = Field(default=False, alias="RESULT_CACHE_ENABLED")
+    result_cache_max_entries: int = Field(default=256, alias="RESULT_CACHE_MAX_ENTRIES")
+    result_cache_ttl: float = Field(default=300.0, alias="RESULT_CACHE_TTL")  # saniye
+    result_cache_track_changes: bool = Field(default=False, alias="RESULT_CACHE_TRACK_CHANGES")  # pg_stat_user_tables
+    result_cache_track_interval: float = Field(default=5.0, alias="RESULT_CACHE_TRACK_INTERVAL")  # saniye
+    
+    # Kabul Kontrolü (EXPLAIN) Ayarları
+    admission_enabled: bool = Field(default=False, alias="ADMISSION_ENABLED")
+    admission_max_cost: float = Field(default=1e7, alias="ADMISSION_MAX_COST")  # planner toplam maliyeti
+    admission_max_rows: int = Field(default=10_000_000, alias="ADMISSION_MAX_ROWS")  # plan düğümü başına tahmini satır
+    admission_action: str = Field(default="reject", alias="ADMISSION_ACTION")  # "reject" veya "sample"
+    admission_sample_percent: float = Field(default=1.0, alias="ADMISSION_SAMPLE_PERCENT")  # TABLESAMPLE SYSTEM yüzdesi
+    
+    # Sorgu Zamanlayıcı Ayarları
+    scheduler_enabled: bool = Field(default=False, alias="SCHEDULER_ENABLED")
+    scheduler_max_concurrent: int = Field(default=10, alias="SCHEDULER_MAX_CONCURRENT")  # havuz boyutunu aşmamalı
+    scheduler_user_concurrency: int = Field(default=2, alias="SCHEDULER_USER_CONCURRENCY")
+    scheduler_user_queue_depth: int = Field(default=10, alias="SCHEDULER_USER_QUEUE_DEPTH")
+    scheduler_batch_max_concurrent: int = Field(default=0, alias="SCHEDULER_BATCH_MAX_CONCURRENT")  # 0: toplamın yarısı
+    scheduler_queue_timeout: float = Field(default=60.0, alias="SCHEDULER_QUEUE_TIMEOUT")  # saniye
+    scheduler_batch_cost_threshold: float = Field(default=0, alias="SCHEDULER_BATCH_COST_THRESHOLD")  # statik maliyet; 0: kapalı
+    
+    # Yavaş Sorgu Kaydı Ayarları
+    slow_query_log_enabled: bool = Field(default=False, alias="SLOW_QUERY_LOG_ENABLED")
+    slow_query_threshold_ms: float = Field(default=1000.0, alias="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_analyze_budget_ms: int = Field(default=10000, alias="SLOW_QUERY_ANALYZE_BUDGET_MS")  # EXPLAIN ANALYZE statement_timeout
+    slow_query_store_path: str = Field(default=".cache/slow_queries.sqlite3", alias="SLOW_QUERY_STORE_PATH")
+    
+    # Schema Ayarları
+    schema_bulk_introspection: bool = Field(default=True, alias="SCHEMA_BULK_INTROSPECTION")
+    schema_introspection_workers: int = Field(default=4, alias="SCHEMA_INTROSPECTION_WORKERS")
+    schema_row_count_mode: str = Field(default="estimate", alias="SCHEMA_ROW_COUNT_MODE")  # "estimate" veya "exact"
+    schema_exact_count_threshold: int = Field(default=100000, alias="SCHEMA_EXACT_COUNT_THRESHOLD")
+    schema_cache_enabled: bool = Field(default=True, alias="SCHEMA_CACHE_ENABLED")
+    schema_cache_dir: str = Field(default=".cache", alias="SCHEMA_CACHE_DIR")
+    schema_listen_enabled: bool = Field(default=False, alias="SCHEMA_LISTEN_ENABLED")
+    schema_prune_top_k: int = Field(default=0, alias="SCHEMA_PRUNE_TOP_K")  # 0: tüm schema gönderilir
+    schema_token_budget: int = Field(default=0, alias="SCHEMA_TOKEN_BUDGET")  # 0: sınırsız
+    schema_render_level: str = Field(default="full", alias="SCHEMA_RENDER_LEVEL")  # full, compact, names
+    schema_check_enabled: bool = Field(default=False, alias="SCHEMA_CHECK_ENABLED")  # tablo/kolon adlarını çalıştırmadan kontrol et
     
     # Loglama
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
@@ -1,8 +1,32 @@
 """Veritabanı modülü"""
 
 from .connection import DatabaseConnection
+from .pool import ConnectionPool
 from .schema_manager import SchemaManager
 from .executor import QueryExecutor
+from .result import QueryResult
+from .result_cache import ResultCache
+from .admission import AdmissionController
+from .scheduler import QueryScheduler
+from .async_executor import AsyncQueryExecutor
+from .schema_cache import SchemaCache
+from .schema_listener import SchemaChangeListener
+from .schema_index import SchemaIndex
+from .join_graph import JoinGraph
 
-__all__ = ["DatabaseConnection", "SchemaManager", "QueryExecutor"]
+__all__ = [
+    "DatabaseConnection",
+    "ConnectionPool",
+    "SchemaManager",
+    "QueryExecutor",
+    "QueryResult",
+    "ResultCache",
+    "AdmissionController",
+    "QueryScheduler",
+    "AsyncQueryExecutor",
+    "SchemaCache",
+    "SchemaChangeListener",
+    "SchemaIndex",
+    "JoinGraph",
+]
 
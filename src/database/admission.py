@@ -0,0 +1,229 @@
+"""EXPLAIN planına göre sorgu kabul kontrolü"""
+
+from typing import Dict, Any, Optional, Iterator, List, Set, Tuple
+import sqlparse
+from ..validation.analyzer import iter_table_identifiers
+from ..config import settings
+from ..utils.logger import logger
+
+
+ADMISSION_ACTIONS = ("reject", "sample")
+
+# Çıktı vermeden önce girdisinin tamamını okuyan düğümler; üstlerindeki Limit
+# bu düğümlerin ve altlarının taradığı satırı azaltmaz
+BLOCKING_NODE_TYPES = frozenset({"Sort", "Incremental Sort", "Hash", "Aggregate", "SetOp"})
+
+
+class QueryRejectedError(Exception):
+    """Planlanan maliyeti eşikleri aştığı için reddedilen sorgu hatası"""
+    pass
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Plan ağacındaki tüm düğümleri gez
+    
+    Args:
+        plan: EXPLAIN (FORMAT JSON) çıktısındaki "Plan" düğümü
+    
+    Yields:
+        Plan düğümleri
+    """
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get("Plans", []))
+
+
+def summarize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Plan ağacının kabul kontrolü ve metadata için özetini çıkar
+    
+    Limit altındaki düğümler erken durur; satır tahminleri bloklayan bir
+    düğüme (Sort, Hash, Aggregate) kadar Limit oranıyla küçültülür.
+    
+    Args:
+        plan: EXPLAIN (FORMAT JSON) çıktısındaki "Plan" düğümü
+    
+    Returns:
+        Toplam maliyet, tahmini satır ve en büyük taramalar
+    """
+    scans = {}
+    lookups = set()
+    max_rows = 0
+    stack = [(plan, 1.0)]
+    while stack:
+        node, fraction = stack.pop()
+        node_type = node.get("Node Type", "")
+        if node_type in BLOCKING_NODE_TYPES:
+            fraction = 1.0
+        for child in node.get("Plans", []):
+            child_fraction = fraction
+            if node_type == "Limit" and child.get("Plan Rows"):
+                child_fraction *= min(1.0, node.get("Plan Rows", 0) / child["Plan Rows"])
+            stack.append((child, child_fraction))
+        
+        rows = node.get("Plan Rows", 0) * fraction
+        max_rows = max(max_rows, rows)
+        relation = node.get("Relation Name")
+        if relation and node_type.endswith("Scan"):
+            scans[relation] = max(scans.get(relation, 0), rows)
+            # Nested loop'un iç tarafındaki index taraması FK -> PK aramasıdır
+            if node.get("Parent Relationship") == "Inner" and "Index Cond" in node:
+                lookups.add(relation)
+    
+    return {
+        "node_type": plan.get("Node Type"),
+        "total_cost": plan.get("Total Cost", 0.0),
+        "plan_rows": plan.get("Plan Rows", 0),
+        "max_node_rows": round(max_rows),
+        "scans": scans,
+        "lookups": lookups,
+    }
+
+
+def apply_table_sampling(sql: str, relations: Set[str], percent: float) -> Tuple[str, List[str]]:
+    """
+    Verilen tablolara TABLESAMPLE SYSTEM ekleyerek sorguyu örneklemeli hale getir
+    
+    Args:
+        sql: SELECT sorgusu
+        relations: Örneklenecek tablo adları (küçük harf)
+        percent: Örnekleme yüzdesi
+    
+    Returns:
+        (yeni SQL, örneklenen tablolar)
+    """
+    statement = sqlparse.parse(sql)[0]
+    sampled = []
+    for identifier in iter_table_identifiers(statement):
+        name = (identifier.get_real_name() or "").lower()
+        if name in relations:
+            leaf = list(identifier.flatten())[-1]
+            leaf.value = f"{leaf.value} TABLESAMPLE SYSTEM ({percent:g})"
+            sampled.append(name)
+    return "".join(t.value for t in statement.flatten()), sampled
+
+
+class AdmissionController:
+    """
+    Sorguları çalıştırmadan önce planlanan maliyet ve satır sayısına göre
+    kabul eden, reddeden veya örneklemeli moda düşüren kontrol
+    """
+    
+    def __init__(
+        self,
+        max_cost: float = 1e7,
+        max_rows: int = 10_000_000,
+        action: str = "reject",
+        sample_percent: float = 1.0,
+    ):
+        """
+        Kabul kontrolünü oluştur
+        
+        Args:
+            max_cost: İzin verilen maksimum planner toplam maliyeti
+            max_rows: Herhangi bir plan düğümünde izin verilen maksimum tahmini satır
+            action: Eşik aşılınca "reject" (reddet) veya "sample" (örnekle)
+            sample_percent: Örnekleme modunda TABLESAMPLE yüzdesi
+        """
+        if action not in ADMISSION_ACTIONS:
+            raise ValueError(f"Geçersiz kabul kontrolü aksiyonu: {action}")
+        
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.action = action
+        self.sample_percent = sample_percent
+    
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        """
+        Ayarlardaki eşiklerle kabul kontrolü oluştur
+        
+        Returns:
+            AdmissionController instance
+        """
+        return cls(
+            max_cost=settings.admission_max_cost,
+            max_rows=settings.admission_max_rows,
+            action=settings.admission_action,
+            sample_percent=settings.admission_sample_percent,
+        )
+    
+    def evaluate(self, sql: str, plan: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Planı eşiklerle karşılaştır ve çalıştırılacak SQL'i belirle
+        
+        Args:
+            sql: Çalıştırılacak SQL
+            plan: EXPLAIN (FORMAT JSON) çıktısındaki "Plan" düğümü
+        
+        Returns:
+            (çalıştırılacak SQL, result metadata'sına eklenecek bilgiler)
+        
+        Raises:
+            QueryRejectedError: Eşik aşıldıysa ve örnekleme uygulanamıyorsa
+        """
+        summary = summarize_plan(plan)
+        metadata = {
+            "plan": {
+                key: value for key, value in summary.items() if key not in ("scans", "lookups")
+            },
+            "admission": "admitted",
+        }
+        
+        reason = self._violation(summary)
+        if reason is None:
+            return sql, metadata
+        
+        if self.action == "sample":
+            sampled_sql, sampled = apply_table_sampling(
+                sql, self._sample_relations(summary), self.sample_percent
+            )
+            if sampled:
+                logger.warning(
+                    "Query downgraded to sampled mode",
+                    reason=reason, tables=sampled, percent=self.sample_percent,
+                )
+                metadata.update(
+                    admission="sampled",
+                    sampled_tables=sampled,
+                    sample_percent=self.sample_percent,
+                )
+                return sampled_sql, metadata
+        
+        logger.warning("Query rejected by admission control", reason=reason)
+        raise QueryRejectedError(
+            f"Sorgu çok maliyetli olduğu için çalıştırılmadı: {reason}. "
+            "Lütfen soruyu daraltın (filtre, tarih aralığı veya limit ekleyin)."
+        )
+    
+    def _sample_relations(self, summary: Dict[str, Any]) -> Set[str]:
+        """
+        Örneklenecek tabloyu seç: FK -> PK aramasında olmayan en büyük tarama
+        
+        Birden fazla tabloyu örneklemek join sonucunu yüzdenin karesine indirir,
+        arama tarafındaki tabloyu örneklemek ise eşleşen satırları kaybettirir.
+        
+        Args:
+            summary: summarize_plan çıktısı
+        
+        Returns:
+            Küçük harfli tablo adı (uygun tarama yoksa boş küme)
+        """
+        scans = {
+            relation: rows for relation, rows in summary["scans"].items()
+            if relation not in summary["lookups"]
+        }
+        if not scans:
+            return set()
+        return {max(scans, key=scans.get).lower()}
+    
+    def _violation(self, summary: Dict[str, Any]) -> Optional[str]:
+        """Aşılan eşiğin açıklaması (aşılmadıysa None)"""
+        if summary["total_cost"] > self.max_cost:
+            return f"tahmini maliyet {summary['total_cost']:.0f} > {self.max_cost:.0f}"
+        if summary["max_node_rows"] > self.max_rows:
+            return f"tahmini {summary['max_node_rows']} satır taranacak (sınır {self.max_rows})"
+        return None
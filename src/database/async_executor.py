@@ -0,0 +1,265 @@
+"""asyncio ile güvenli SQL sorgu çalıştırma (psycopg 3)"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, AsyncIterator
+from .admission import AdmissionController
+from .connection import DatabaseConnection
+from .cost_model import CostModel
+from .executor import QueryExecutor, QueryExecutionError, TimeoutError
+from .result import QueryResult
+from .plan_store import SlowQueryLog
+from .result_cache import ResultCache, TableChangeTracker
+from .scheduler import QueryScheduler
+from ..validation.sql_validator import SQLValidator
+from ..config import settings
+from ..utils.logger import logger
+
+
+class AsyncQueryExecutor(QueryExecutor):
+    """
+    Sorguları psycopg 3 AsyncConnectionPool üzerinden çalıştıran executor
+    
+    Validasyon, LIMIT ekleme ve analiz QueryExecutor ile aynıdır; sadece
+    veritabanı çağrıları event loop'u bloklamadan yapılır. Havuz her event
+    loop'ta ilk sorguda açılır; ardışık asyncio.run çağrıları kendi havuzlarını
+    kullanır.
+    """
+    
+    def __init__(
+        self,
+        db_connection: DatabaseConnection,
+        validator: Optional[SQLValidator] = None,
+        timeout: int = None,
+        max_rows: int = None,
+        pool: Any = None,
+        result_cache: Optional[ResultCache] = None,
+        change_tracker: Optional[TableChangeTracker] = None,
+        admission: Optional[AdmissionController] = None,
+        slow_query_log: Optional[SlowQueryLog] = None,
+        scheduler: Optional[QueryScheduler] = None,
+        cost_model_provider: Optional[Callable[[], CostModel]] = None,
+    ):
+        """
+        Async query executor'ı başlat
+        
+        Args:
+            db_connection: Bağlantı parametrelerinin alınacağı veritabanı bağlantısı
+            validator: SQL validator (None ise yeni oluşturulur)
+            timeout: Sorgu zaman aşımı (saniye)
+            max_rows: Maksimum döndürülecek satır sayısı
+            pool: Hazır bir psycopg_pool.AsyncConnectionPool (None ise ayarlardan oluşturulur)
+            result_cache: Sonuç önbelleği (senkron executor ile paylaşılabilir)
+            change_tracker: Değişen tabloları pg_stat_user_tables'tan bulan yardımcı
+            admission: EXPLAIN maliyetine göre kabul kontrolü (None ise kapalı)
+            slow_query_log: Eşikten yavaş sorguların planını yakalayan kayıt
+            scheduler: Öncelik ve kullanıcı kotalarıyla sıra veren zamanlayıcı
+                (senkron executor ile paylaşılabilir)
+            cost_model_provider: Schema istatistikleriyle kurulan maliyet modelini
+                döndüren fonksiyon (statik maliyet tahmini ve batch yönlendirme için)
+        """
+        super().__init__(
+            db_connection, validator, timeout, max_rows,
+            result_cache=result_cache, change_tracker=change_tracker,
+            admission=admission, slow_query_log=slow_query_log, scheduler=scheduler,
+            cost_model_provider=cost_model_provider,
+        )
+        self.pool = pool
+        # Havuz ve kilit oluşturuldukları event loop'a bağlıdır; loop başına tutulur
+        self._loop_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._pool_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+    
+    async def aexecute_query(
+        self,
+        sql: str,
+        validate: bool = True,
+        question: Optional[str] = None,
+        user: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> QueryResult:
+        """
+        SQL sorgusunu güvenli şekilde çalıştır (asyncio)
+        
+        Args:
+            sql: Çalıştırılacak SQL sorgusu
+            validate: True ise önce validasyon yap
+            question: Sorguyu üreten kullanıcı sorusu (yavaş sorgu kaydı için)
+            user: Kullanıcı veya tenant kimliği (zamanlayıcı kotaları için)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
+        
+        Returns:
+            Sorgu sonuçları (kolon bazlı sonuç)
+        
+        Raises:
+            ValidationError: Validasyon hatası
+            QueryExecutionError: Sorgu çalıştırma hatası
+            QueryRejectedError: Planlanan maliyet kabul eşiklerini aştı
+            QueueFullError: Kullanıcının bekleyen sorgu kotası dolu
+            QueueTimeoutError: Sırada beklerken zaman aşımı
+            TimeoutError: Zaman aşımı hatası
+        """
+        # Tek parse ile validasyon, temizleme ve tablo çıkarma
+        analysis = self._prepare(sql, validate)
+        sql = analysis.sanitized
+        
+        # LIMIT ekle (yoksa)
+        sql = self._ensure_limit(sql)
+        
+        # Önbellekte varsa veritabanına gitme (sayaç okuması psycopg2 ile yapılır)
+        if self.result_cache is not None and self.change_tracker is not None:
+            await asyncio.to_thread(self._invalidate_changed_tables)
+        cached, generation = self._cache_lookup(sql)
+        if cached is not None:
+            return cached
+        
+        # Statik maliyeti yüksek etkileşimli sorgular batch sınıfında sıraya girer
+        # (soğuk schema önbelleğinde introspection psycopg2 ile ayrı thread'de yapılır)
+        priority, cost_info = await asyncio.to_thread(self._route, sql, priority)
+        
+        # Zamanlayıcıdan yer al; kabul kontrolü ve sorgu bu yerde çalışır
+        async with self._aschedule(user, priority) as queue_info:
+            # Kabul kontrolü (EXPLAIN psycopg2 ile ayrı thread'de yapılır)
+            executed_sql, admission_info = sql, {}
+            if self.admission is not None:
+                executed_sql, admission_info = await asyncio.to_thread(self._admit, sql)
+            
+            logger.info("Executing query (async)", sql=executed_sql[:200])
+            
+            try:
+                # Zaman aşımı ve hatalar da kayda geçer
+                started = time.perf_counter()
+                try:
+                    results = self._apply_truncation(await self._aexecute_with_timeout(executed_sql))
+                finally:
+                    duration_ms = (time.perf_counter() - started) * 1000
+                    # Yavaş sorgu kaydı SQLite'a yazar; event loop'u bloklamamalı
+                    await asyncio.to_thread(self._observe_duration, executed_sql, duration_ms, question)
+                results = results.with_metadata(
+                    duration_ms=round(duration_ms, 1), **queue_info, **admission_info, **cost_info
+                )
+                
+                logger.info("Query executed successfully", row_count=len(results))
+                return self._cache_store(sql, results, generation, analysis.tables)
+            
+            except Exception as e:
+                logger.error("Query execution failed", error=str(e), sql=sql[:200])
+                raise QueryExecutionError(f"Sorgu çalıştırma hatası: {str(e)}")
+    
+    @asynccontextmanager
+    async def _aschedule(self, user: Optional[str], priority: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Zamanlayıcı varsa event loop'u bloklamadan sıra bekle ve yeri tut
+        
+        Yields:
+            Result metadata'sına eklenecek sıra bekleme bilgisi
+        """
+        if self.scheduler is None:
+            yield {}
+            return
+        
+        async with self.scheduler.aslot(user, priority) as wait:
+            yield {"queue_wait_ms": round(wait * 1000, 1)}
+    
+    async def _aexecute_with_timeout(self, sql: str) -> QueryResult:
+        """
+        Sorguyu timeout ile çalıştır
+        
+        Args:
+            sql: SQL sorgusu
+        
+        Returns:
+            Sorgu sonuçları
+        
+        Raises:
+            TimeoutError: Zaman aşımı durumunda
+        """
+        pool = await self._get_pool()
+        
+        try:
+            async with pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    # Oturum varsayılanından farklıysa sadece bu işlem için timeout ayarla
+                    if self._needs_timeout_override():
+                        await cursor.execute(f"SET LOCAL statement_timeout = {self.timeout * 1000};")
+                    
+                    # Sorguyu çalıştır
+                    await cursor.execute(sql)
+                    
+                    # Satır başına dict yerine kolon bazlı sonuca çevir
+                    columns = [column.name for column in cursor.description or ()]
+                    return QueryResult.from_rows(columns, await cursor.fetchall())
+        
+        except Exception as e:
+            error_msg = str(e).lower()
+            
+            # Timeout hatası kontrolü
+            if 'timeout' in error_msg or 'canceling statement' in error_msg:
+                raise TimeoutError(
+                    f"Sorgu {self.timeout} saniye içinde tamamlanamadı."
+                )
+            
+            # Diğer hatalar
+            raise
+    
+    async def _get_pool(self):
+        """Çalışan event loop'un async bağlantı havuzunu getir (ilk çağrıda oluşturulup açılır)"""
+        if self.pool is not None:
+            return self.pool
+        
+        loop = asyncio.get_running_loop()
+        pool = self._loop_pools.get(loop)
+        if pool is not None:
+            return pool
+        
+        lock = self._pool_locks.get(loop)
+        if lock is None:
+            lock = self._pool_locks[loop] = asyncio.Lock()
+        async with lock:
+            pool = self._loop_pools.get(loop)
+            if pool is None:
+                pool = self._loop_pools[loop] = await self._create_pool()
+        return pool
+    
+    async def _create_pool(self):
+        """Ayarlardaki havuz parametreleriyle psycopg 3 AsyncConnectionPool oluştur"""
+        try:
+            from psycopg.conninfo import make_conninfo
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError:
+            raise ImportError(
+                "Async sorgu yolu için psycopg ve psycopg-pool gerekli: "
+                "pip install 'psycopg[binary]' psycopg-pool"
+            )
+        
+        params = dict(self.db.connection_params)
+        if "database" in params:
+            params["dbname"] = params.pop("database")
+        
+        pool = AsyncConnectionPool(
+            make_conninfo(**params),
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_lifetime=settings.db_pool_max_lifetime,
+            max_idle=settings.db_pool_idle_timeout,
+            timeout=settings.db_pool_checkout_timeout,
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        await pool.open()
+        logger.info("Async connection pool opened", max_size=settings.db_pool_max_size)
+        return pool
+    
+    async def aclose(self):
+        """Verilen havuzu ve çalışan event loop'ta açılan havuzu kapat"""
+        pools = [self.pool, self._loop_pools.pop(asyncio.get_running_loop(), None)]
+        self.pool = None
+        for pool in pools:
+            if pool is not None:
+                await pool.close()
+                logger.info("Async connection pool closed")
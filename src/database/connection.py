@@ -3,28 +3,94 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
-from typing import Optional, Generator
+from typing import Optional, Generator, Dict, Any
+from .pool import ConnectionPool
 from ..config import settings
 from ..utils.logger import logger
 
 
+def build_session_settings() -> Dict[str, str]:
+    """
+    Her bağlantı açılırken uygulanacak oturum parametrelerini ayarlardan oluştur
+    
+    Returns:
+        PostgreSQL parametre adı -> değer
+    """
+    session = {"statement_timeout": str(settings.max_query_timeout * 1000)}
+    if settings.db_read_only:
+        session["default_transaction_read_only"] = "on"
+    if settings.db_idle_in_transaction_timeout:
+        session["idle_in_transaction_session_timeout"] = str(
+            settings.db_idle_in_transaction_timeout * 1000
+        )
+    if settings.db_work_mem:
+        session["work_mem"] = settings.db_work_mem
+    return session
+
+
+def session_options(session: Dict[str, str]) -> str:
+    """
+    Oturum parametrelerini libpq "options" metnine çevir
+    
+    Parametreler bağlantı kurulurken sunucuya iletildiği için ek sorgu gerekmez.
+    
+    Args:
+        session: Parametre adı -> değer
+    
+    Returns:
+        "-c ad=değer" biçiminde options metni
+    """
+    options = []
+    for name, value in session.items():
+        # libpq options içinde boşluklar ters bölü ile kaçırılır
+        escaped = value.replace("\\", "\\\\").replace(" ", "\\ ")
+        options.append(f"-c {name}={escaped}")
+    return " ".join(options)
+
+
 class DatabaseConnection:
     """PostgreSQL veritabanı bağlantı yöneticisi"""
     
-    def __init__(self):
-        """Bağlantı parametrelerini ayarla"""
-        self.connection_params = {
+    def __init__(
+        self,
+        connection_params: Optional[Dict[str, Any]] = None,
+        pooled: Optional[bool] = None,
+        session: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Bağlantı parametrelerini ayarla
+        
+        Args:
+            connection_params: psycopg2.connect parametreleri (None ise ayarlardan alınır)
+            pooled: True ise her get_cursor() çağrısı havuzdan ayrı bir bağlantı
+                kullanır (None ise ayarlardaki DB_POOL_ENABLED kullanılır)
+            session: Bağlantı açılırken bir kez uygulanacak oturum parametreleri
+                (None ise ayarlardan oluşturulur; connection_params içinde
+                "options" verilmişse uygulanmaz)
+        """
+        self.connection_params = dict(connection_params) if connection_params else {
             "host": settings.db_host,
             "port": settings.db_port,
             "database": settings.db_name,
             "user": settings.db_user,
             "password": settings.db_password,
         }
+        if "options" in self.connection_params:
+            self.session: Dict[str, str] = dict(session or {})
+        else:
+            self.session = dict(session) if session is not None else build_session_settings()
+            if self.session:
+                self.connection_params["options"] = session_options(self.session)
         self._connection: Optional[psycopg2.extensions.connection] = None
-        logger.info("DatabaseConnection initialized", params={
-            "host": settings.db_host,
-            "port": settings.db_port,
-            "database": settings.db_name,
+        if pooled is None:
+            pooled = settings.db_pool_enabled
+        self.pool: Optional[ConnectionPool] = (
+            ConnectionPool.from_settings(self.connection_params) if pooled else None
+        )
+        logger.info("DatabaseConnection initialized", pooled=pooled, params={
+            "host": self.connection_params.get("host"),
+            "port": self.connection_params.get("port"),
+            "database": self.connection_params.get("database"),
         })
     
     def connect(self) -> psycopg2.extensions.connection:
@@ -46,8 +112,24 @@ class DatabaseConnection:
             logger.error("Database connection failed", error=str(e))
             raise
     
+    def spawn(self) -> "DatabaseConnection":
+        """
+        Aynı parametrelerle bağımsız bir bağlantı yöneticisi oluştur
+        
+        Paralel işçilerin tek bağlantıyı paylaşmaması için kullanılır. Havuz
+        modunda her get_cursor() zaten ayrı bağlantı aldığından kendisini döndürür.
+        
+        Returns:
+            Yeni DatabaseConnection instance
+        """
+        if self.pool is not None:
+            return self
+        return DatabaseConnection(self.connection_params, pooled=False, session=self.session)
+    
     def disconnect(self):
-        """Veritabanı bağlantısını kapat"""
+        """Veritabanı bağlantısını (havuz modunda havuzu) kapat"""
+        if self.pool is not None:
+            self.pool.close()
         if self._connection and not self._connection.closed:
             self._connection.close()
             logger.info("Database connection closed")
@@ -64,19 +146,86 @@ class DatabaseConnection:
         Yields:
             PostgreSQL cursor nesnesi
         """
-        conn = self.connect()
-        cursor_factory = RealDictCursor if dict_cursor else None
-        cursor = conn.cursor(cursor_factory=cursor_factory)
+        with self.transaction() as conn:
+            cursor_factory = RealDictCursor if dict_cursor else None
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def transaction(self) -> Generator:
+        """
+        Tek bir işlem için bağlantı veren context manager
+        
+        Blok başarıyla biterse commit, hata olursa rollback yapılır. Blok bir
+        generator içinde yarıda bırakılırsa (GeneratorExit) işlem sessizce
+        geri alınır.
+        
+        Yields:
+            PostgreSQL bağlantı nesnesi
+        """
+        with self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error("Database operation failed, rolled back", error=str(e))
+                raise
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    @contextmanager
+    def connection(self) -> Generator:
+        """
+        Bir işlem boyunca kullanılacak bağlantı için context manager
         
+        Havuz modunda bağlantı havuzdan alınır ve blok bitince iade edilir;
+        bağlantı koparsa havuza geri konmaz.
+        
+        Yields:
+            PostgreSQL bağlantı nesnesi
+        """
+        if self.pool is None:
+            yield self.connect()
+            return
+        
+        conn = self.pool.getconn()
+        discard = False
         try:
-            yield cursor
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            logger.error("Database operation failed, rolled back", error=str(e))
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
             raise
         finally:
-            cursor.close()
+            self.pool.putconn(conn, discard=discard)
+    
+    def session_setting(self, name: str) -> Optional[str]:
+        """
+        Bağlantı açılırken uygulanan oturum parametresinin değerini getir
+        
+        Args:
+            name: PostgreSQL parametre adı (örn. "statement_timeout")
+        
+        Returns:
+            Parametre değeri (uygulanmadıysa None)
+        """
+        return self.session.get(name)
+    
+    def get_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Bağlantı havuzu istatistiklerini getir
+        
+        Returns:
+            Havuz istatistikleri (havuz modu kapalıysa None)
+        """
+        if self.pool is None:
+            return None
+        return self.pool.get_stats()
     
     def test_connection(self) -> bool:
         """
@@ -97,7 +246,10 @@ class DatabaseConnection:
     
     def __enter__(self):
         """Context manager entry"""
-        self.connect()
+        if self.pool is not None:
+            self.pool.open()
+        else:
+            self.connect()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -0,0 +1,391 @@
+"""Schema istatistikleriyle veritabanına gitmeden statik sorgu maliyeti tahmini"""
+
+import math
+from typing import Dict, Any, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from ..validation.analyzer import ColumnRef, Predicate, QueryScope, SQLAnalysis, TableRef
+
+
+# İstatistik yokken PostgreSQL planner'ının kullandığı varsayılanlar (utils/selfuncs.h)
+EQ_SELECTIVITY = 0.005
+INEQ_SELECTIVITY = 1 / 3
+RANGE_SELECTIVITY = 0.005
+MATCH_SELECTIVITY = 0.005
+DEFAULT_NUM_DISTINCT = 200
+
+# IN listesi veya alt sorgusu birkaç eşitliğin toplamı kabul edilir
+IN_SELECTIVITY = 0.05
+
+# Schema'da bulunamayan tablo veya kaynak için varsayılan satır sayısı
+DEFAULT_TABLE_ROWS = 1000
+
+OPERATOR_SELECTIVITY = {
+    "=": EQ_SELECTIVITY,
+    "<>": 1 - EQ_SELECTIVITY,
+    "!=": 1 - EQ_SELECTIVITY,
+    "<": INEQ_SELECTIVITY,
+    ">": INEQ_SELECTIVITY,
+    "<=": INEQ_SELECTIVITY,
+    ">=": INEQ_SELECTIVITY,
+    "BETWEEN": RANGE_SELECTIVITY,
+    "IN": IN_SELECTIVITY,
+    "LIKE": MATCH_SELECTIVITY,
+    "ILIKE": MATCH_SELECTIVITY,
+    "NOT LIKE": 1 - MATCH_SELECTIVITY,
+    "NOT ILIKE": 1 - MATCH_SELECTIVITY,
+}
+
+# B-tree index ile aranabilen operatörler
+INDEX_OPERATORS = frozenset({"=", "<", ">", "<=", ">=", "BETWEEN", "IN"})
+
+# Maliyet (işlenen tahmini satır) üst sınırı -> karmaşıklık seviyesi
+COMPLEXITY_LEVELS = ((1e4, "low"), (1e6, "medium"))
+
+
+class TableStats(NamedTuple):
+    """Bir tablonun maliyet tahmininde kullanılan istatistikleri"""
+    
+    key: str  # Schema sözlüğündeki anahtar
+    rows: int
+    columns: FrozenSet[str]
+    # Bir index'in ilk kolonu olan kolonlar (primary key dahil)
+    indexed: FrozenSet[str]
+    # Tek kolonluk unique index veya primary key kolonları
+    unique: FrozenSet[str]
+
+
+class CostEstimate(NamedTuple):
+    """Statik maliyet tahmini"""
+    
+    cost: float  # Taranan, birleştirilen ve gruplanan tahmini satır toplamı
+    rows: float  # Tahmini sonuç satırı
+    scans: Dict[str, float]  # Tablo anahtarı -> tahmini okunacak satır
+    
+    @property
+    def level(self) -> str:
+        """Maliyetin karmaşıklık seviyesi ("low", "medium", "high")"""
+        for limit, level in COMPLEXITY_LEVELS:
+            if self.cost <= limit:
+                return level
+        return "high"
+
+
+def _table_stats(key: str, table_info: Dict[str, Any]) -> TableStats:
+    """get_full_schema tablo bilgisinden istatistikleri çıkar"""
+    primary_key = table_info.get("primary_key")
+    indexes = table_info.get("indexes")
+    if indexes is None:
+        # Index bilgisi olmayan eski önbellek girdisi: sadece primary key bilinir
+        indexes = [{"columns": [primary_key], "unique": True}] if primary_key else []
+    
+    unique = {
+        index["columns"][0].lower() for index in indexes
+        if index.get("unique") and len(index["columns"]) == 1
+    }
+    if primary_key:
+        unique.add(primary_key.lower())
+    indexed = {index["columns"][0].lower() for index in indexes if index.get("columns")}
+    
+    return TableStats(
+        key=key,
+        rows=max(0, int(table_info.get("row_count") or 0)),
+        columns=frozenset(column["name"].lower() for column in table_info.get("columns", [])),
+        indexed=frozenset(indexed | unique),
+        unique=frozenset(unique),
+    )
+
+
+class CostModel:
+    """
+    SchemaManager'ın topladığı satır sayıları ve index'lerle statik maliyet modeli
+    
+    Her SELECT kapsamında tablo taraması filtrelerin seçiciliği ve index
+    kullanımıyla, JOIN çıktısı |R|·|S| / max(V(R,a), V(S,b)) formülüyle tahmin
+    edilir. Birim, işlenen tahmini satır sayısıdır; EXPLAIN maliyetiyle aynı
+    ölçekte değildir ama sorgular arasında karşılaştırılabilir.
+    """
+    
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Modeli oluştur
+        
+        Args:
+            schema: SchemaManager.get_full_schema çıktısı (boşsa tüm tablolar
+                varsayılan boyutta kabul edilir)
+        """
+        self._tables: Dict[str, TableStats] = {}
+        self._by_name: Dict[str, str] = {}
+        
+        for key, table_info in schema.items():
+            key = key.lower()
+            self._tables[key] = _table_stats(key, table_info)
+            table_name = (table_info.get("name") or key.rsplit(".", 1)[-1]).lower()
+            self._by_name.setdefault(table_name, key)
+            schema_name = table_info.get("schema")
+            if schema_name:
+                self._by_name.setdefault(f"{schema_name.lower()}.{table_name}", key)
+    
+    def table_stats(self, ref: TableRef) -> Optional[TableStats]:
+        """
+        Sorgudaki tablo referansının istatistiklerini getir
+        
+        Args:
+            ref: Analizdeki tablo referansı
+        
+        Returns:
+            TableStats (schema'da yoksa None)
+        """
+        name = f"{ref.schema}.{ref.name}" if ref.schema else ref.name
+        key = name if name in self._tables else self._by_name.get(name)
+        return self._tables.get(key) if key else None
+    
+    def estimate(self, analysis: SQLAnalysis) -> CostEstimate:
+        """
+        Analiz edilmiş sorgunun maliyetini tahmin et
+        
+        Args:
+            analysis: SQLValidator.analyze çıktısı
+        
+        Returns:
+            Maliyet, sonuç satırı ve tablo bazında taranacak satır tahmini
+        """
+        return _Estimation(self, analysis.scopes).run()
+
+
+class _Source:
+    """Bir kapsamdaki FROM/JOIN kaynağı ve üzerindeki filtreler"""
+    
+    __slots__ = ("names", "stats", "base_rows", "selectivity", "index_selectivity")
+    
+    def __init__(self, ref: TableRef, stats: Optional[TableStats], base_rows: float):
+        self.names = {ref.alias} if ref.alias else {ref.name}
+        self.stats = stats
+        self.base_rows = base_rows
+        self.selectivity = 1.0
+        self.index_selectivity: Optional[float] = None
+    
+    @property
+    def rows(self) -> float:
+        """Filtrelerden sonra kalan tahmini satır"""
+        return max(1.0, self.base_rows * self.selectivity)
+    
+    def apply_filter(self, column: str, operator: str):
+        """Kolon ile sabit (veya dış sorgu kolonu) arasındaki koşulu uygula"""
+        selectivity = OPERATOR_SELECTIVITY.get(operator)
+        if selectivity is None:
+            return
+        
+        stats = self.stats
+        if stats is not None and operator == "=" and column in stats.unique:
+            selectivity = 1.0 / max(1.0, self.base_rows)
+        self.selectivity *= selectivity
+        
+        if stats is not None and column in stats.indexed and operator in INDEX_OPERATORS:
+            self.index_selectivity = min(selectivity, self.index_selectivity or 1.0)
+    
+    def distinct(self, column: str) -> float:
+        """JOIN kolonundaki tahmini farklı değer sayısı"""
+        if self.stats is not None and column in self.stats.unique:
+            return max(1.0, self.base_rows)
+        return max(1.0, min(DEFAULT_NUM_DISTINCT, self.base_rows))
+    
+    def scan_cost(self, lookups: Optional[float] = None) -> float:
+        """
+        Tabloyu okumanın maliyeti
+        
+        Args:
+            lookups: Index'li JOIN kolonunda dış taraftan gelen arama sayısı
+                (None ise tablo filtreleriyle tek başına taranır)
+        """
+        depth = math.log2(self.base_rows + 1)
+        cost = self.base_rows
+        if self.index_selectivity is not None:
+            cost = depth + self.base_rows * self.index_selectivity
+        if lookups is not None:
+            cost = min(cost, lookups * (depth + 1))
+        return cost
+
+
+_Join = Tuple[_Source, str, _Source, str, str]
+
+
+class _Estimation:
+    """Tek bir analizin kapsamlarını maliyetlendiren yardımcı"""
+    
+    def __init__(self, model: CostModel, scopes: Iterable[QueryScope]):
+        self.model = model
+        self.scopes = list(scopes)
+        self.named: Dict[str, List[QueryScope]] = {}
+        for scope in self.scopes:
+            if scope.name is not None:
+                self.named.setdefault(scope.name, []).append(scope)
+        self.outputs: Dict[str, float] = {}
+        self.cost = 0.0
+        self.scans: Dict[str, float] = {}
+    
+    def run(self) -> CostEstimate:
+        """
+        Adsız kapsamları (dış sorgu ve WHERE alt sorguları) maliyetlendir
+        
+        CTE ve FROM alt sorguları okundukları yerde bir kez hesaplanır; hiç
+        okunmayan CTE PostgreSQL'de de çalışmaz. Alt sorgular bir kez
+        çalışmış kabul edilir.
+        """
+        rows = 0.0
+        for scope in self.scopes:
+            if scope.name is None:
+                scope_rows = self._scope_rows(scope)
+                if scope.top_level:
+                    rows += scope_rows
+        top_level = [scope for scope in self.scopes if scope.top_level]
+        return CostEstimate(cost=self.cost, rows=self._limited(rows, top_level), scans=self.scans)
+    
+    @staticmethod
+    def _limited(rows: float, branches: List[QueryScope]) -> float:
+        """Kolların toplam çıktısını birleşimin LIMIT'iyle sınırla"""
+        limit = branches[0].limit if branches else None
+        return rows if limit is None else min(rows, float(limit))
+    
+    def _named_rows(self, name: str) -> Optional[float]:
+        """CTE veya FROM alt sorgusunun çıktı satırı (öyle bir kapsam yoksa None)"""
+        if name in self.outputs:
+            return self.outputs[name]
+        # Kendini okuyan recursive CTE, okunduğu yerde tablo gibi ele alınır
+        branches = self.named.pop(name, None)
+        if branches is None:
+            return None
+        self.outputs[name] = self._limited(
+            sum(self._scope_rows(branch) for branch in branches), branches
+        )
+        return self.outputs[name]
+    
+    def _source(self, ref: TableRef) -> _Source:
+        """Kaynağı tablo istatistiği veya CTE/alt sorgu çıktısıyla oluştur"""
+        if ref.schema is None:
+            named_rows = self._named_rows(ref.name)
+            if named_rows is not None:
+                return _Source(ref, None, named_rows)
+        
+        stats = self.model.table_stats(ref)
+        return _Source(ref, stats, stats.rows if stats is not None else DEFAULT_TABLE_ROWS)
+    
+    @staticmethod
+    def _find(
+        sources: List[_Source], column: ColumnRef, exclude: Optional[_Source] = None
+    ) -> Optional[_Source]:
+        """Kolonun ait olduğu kaynağı bul (dış sorguya aitse None)"""
+        if column.qualifier is not None:
+            return next((source for source in sources if column.qualifier in source.names), None)
+        if len(sources) == 1 and exclude is None:
+            return sources[0]
+        return next((
+            source for source in sources
+            if source is not exclude
+            and source.stats is not None
+            and column.name in source.stats.columns
+        ), None)
+    
+    def _scan(self, source: _Source, lookups: Optional[float] = None) -> float:
+        """Kaynağın okunma maliyetini ekle ve döndür (CTE/alt sorgu kendi kapsamında sayıldı)"""
+        if source.stats is None:
+            self.cost += source.base_rows
+            return source.base_rows
+        
+        cost = source.scan_cost(lookups)
+        self.cost += cost
+        key = source.stats.key
+        self.scans[key] = self.scans.get(key, 0.0) + cost
+        return cost
+    
+    def _discount(self, streamed: List[Tuple[_Source, float]], join_cost: float, fraction: float):
+        """LIMIT'e ulaşınca yapılmayan tarama ve JOIN işini maliyetten düş"""
+        self.cost -= join_cost * fraction
+        for source, cost in streamed:
+            self.cost -= cost * fraction
+            if source.stats is not None:
+                self.scans[source.stats.key] -= cost * fraction
+    
+    def _scope_rows(self, scope: QueryScope) -> float:
+        """
+        Kapsamın maliyetini ekle ve çıktı satırını döndür
+        
+        Filtrelendikten sonra en küçük kalan kaynaktan başlanır; sonraki kaynak
+        olarak önce JOIN koşuluyla bağlı olanlar seçilir, bağlı kaynak yoksa
+        kartezyen çarpım olur. JOIN kolonu index'liyse iç taraf tam taranmak
+        yerine dış satır sayısı kadar index araması yapar.
+        
+        ORDER BY, GROUP BY veya aggregate olmayan kapsam LIMIT kadar satır
+        ürettiğinde durur; dış tarama, index aramaları ve JOIN işi bu oranla
+        azaltılır. Hash JOIN'in iç tarafı yine de tamamen okunur.
+        """
+        sources = [self._source(ref) for ref in scope.tables]
+        if not sources:
+            return 1.0
+        
+        joins: List[_Join] = []
+        for predicate in scope.predicates:
+            self._apply(sources, predicate, joins)
+        
+        remaining = sorted(sources, key=lambda source: source.rows)
+        current = remaining.pop(0)
+        streamed = [(current, self._scan(current))]
+        joined = [current]
+        rows = current.rows
+        join_cost = 0.0
+        
+        while remaining:
+            conditions: Dict[int, List[_Join]] = {
+                id(source): [
+                    join for join in joins
+                    if (join[0] is source and join[2] in joined)
+                    or (join[2] is source and join[0] in joined)
+                ]
+                for source in remaining
+            }
+            source = next((s for s in remaining if conditions[id(s)]), remaining[0])
+            remaining.remove(source)
+            
+            selectivity = 1.0
+            lookup = False
+            for left, left_column, right, right_column, operator in conditions[id(source)]:
+                if left is source:
+                    inner, other, outer = left_column, right, right_column
+                else:
+                    inner, other, outer = right_column, left, left_column
+                if operator == "=":
+                    selectivity /= max(source.distinct(inner), other.distinct(outer))
+                    lookup = lookup or (source.stats is not None and inner in source.stats.indexed)
+                else:
+                    selectivity *= OPERATOR_SELECTIVITY.get(operator, 1.0)
+            
+            scan_cost = self._scan(source, rows if lookup else None)
+            if lookup:
+                streamed.append((source, scan_cost))
+            rows = max(1.0, rows * source.rows * selectivity)
+            self.cost += rows
+            join_cost += rows
+            joined.append(source)
+        
+        streaming = not (scope.grouped or scope.aggregated or scope.ordered)
+        if streaming and scope.limit is not None and rows > scope.limit:
+            self._discount(streamed, join_cost, 1 - scope.limit / rows)
+        
+        if scope.grouped:
+            self.cost += rows
+            rows = min(rows, DEFAULT_NUM_DISTINCT)
+        elif scope.aggregated:
+            # GROUP BY olmayan aggregate tek satır döndürür
+            rows = 1.0
+        return rows
+    
+    def _apply(self, sources: List[_Source], predicate: Predicate, joins: List[_Join]):
+        """Koşulu kaynak filtresi veya JOIN koşulu olarak kaydet"""
+        right = self._find(sources, predicate.right) if predicate.right is not None else None
+        left = self._find(sources, predicate.left, exclude=right)
+        if left is None:
+            return
+        
+        if right is None:
+            # Sabit, parametre veya dış sorgu kolonu: her çalıştırmada tek değer
+            left.apply_filter(predicate.left.name, predicate.operator)
+        elif right is not left:
+            joins.append((left, predicate.left.name, right, predicate.right.name, predicate.operator))
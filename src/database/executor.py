@@ -1,14 +1,37 @@
 """Güvenli SQL sorgu çalıştırma"""
 
+import json
+import os
 import signal
-from typing import List, Dict, Any, Optional
+import time
+import uuid
+from typing import List, Dict, Any, Callable, Optional, Iterator, Sequence
+import sqlparse
+from sqlparse.sql import Parenthesis, Token, TokenList
+from sqlparse.tokens import Comment, Keyword, Number
+from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
 from .connection import DatabaseConnection
+from .admission import AdmissionController
+from .cost_model import CostEstimate, CostModel
+from .export import (
+    EXPORT_FORMATS, ByteCounter, CopyTextDecoder, arrow_schema, copy_statement, load_arrow,
+    rows_to_arrow,
+)
+from .result import QueryResult, ResultStream
+from .plan_store import SlowQueryLog
+from .result_cache import ResultCache, TableChangeTracker
+from .scheduler import QueryScheduler
+from ..validation.analyzer import SQLAnalysis
 from ..validation.sql_validator import SQLValidator, ValidationError
 from ..config import settings
 from ..utils.logger import logger
 
 
+# Önbellekten dönen sonuçta anlamı olmayan, tek çalıştırmaya ait metadata alanları
+EXECUTION_METADATA_KEYS = ("duration_ms", "queue_wait_ms", "plan", "admission", "routed_to_batch")
+
+
 class QueryExecutionError(Exception):
     """Sorgu çalıştırma hatası"""
     pass
@@ -19,6 +42,58 @@ class TimeoutError(Exception):
     pass
 
 
+def _outer_tokens(token_list: TokenList) -> Iterator[Token]:
+    """Dış sorgu seviyesindeki token'ları gez (parantez içindeki alt sorgular atlanır)"""
+    for token in token_list.tokens:
+        if isinstance(token, Parenthesis):
+            continue
+        if token.is_group:
+            yield from _outer_tokens(token)
+        else:
+            yield token
+
+
+def apply_row_cap(sql: str, cap: int) -> str:
+    """
+    Sorgunun en dış seviyesine satır sınırı uygula
+    
+    Dış seviyede sayısal LIMIT varsa min(LIMIT, cap) olarak yeniden yazılır;
+    LIMIT yoksa sona eklenir. LIMIT ALL, parametreli LIMIT veya FETCH FIRST
+    gibi sayıya çevrilemeyen durumlarda sorgu alt sorgu olarak sarılır.
+    
+    Args:
+        sql: Tek bir SELECT sorgusu
+        cap: Maksimum satır sayısı
+    
+    Returns:
+        Sınır uygulanmış SQL
+    """
+    body = sql.strip().rstrip(';').rstrip()
+    statement = sqlparse.parse(body)[0]
+    tokens = [t for t in _outer_tokens(statement) if not t.is_whitespace and t.ttype not in Comment]
+    
+    limit_token = None
+    wrap = False
+    for i, token in enumerate(tokens):
+        if token.ttype in Keyword and token.normalized == 'FETCH':
+            wrap = True
+        elif token.ttype in Keyword and token.normalized == 'LIMIT':
+            value = tokens[i + 1] if i + 1 < len(tokens) else None
+            if value is not None and value.ttype in Number.Integer:
+                limit_token = value
+            else:
+                wrap = True
+    
+    if wrap:
+        return f"SELECT * FROM (\n{body}\n) AS capped_query\nLIMIT {cap};"
+    
+    if limit_token is not None:
+        limit_token.value = str(min(int(limit_token.value), cap))
+        return "".join(t.value for t in statement.flatten()) + ";"
+    
+    return f"{body} LIMIT {cap};"
+
+
 class QueryExecutor:
     """Güvenli SQL sorgu çalıştırıcı"""
     
@@ -28,6 +103,12 @@ class QueryExecutor:
         validator: Optional[SQLValidator] = None,
         timeout: int = None,
         max_rows: int = None,
+        result_cache: Optional[ResultCache] = None,
+        change_tracker: Optional[TableChangeTracker] = None,
+        admission: Optional[AdmissionController] = None,
+        slow_query_log: Optional[SlowQueryLog] = None,
+        scheduler: Optional[QueryScheduler] = None,
+        cost_model_provider: Optional[Callable[[], CostModel]] = None,
     ):
         """
         Query executor'ı başlat
@@ -37,11 +118,29 @@ class QueryExecutor:
             validator: SQL validator (None ise yeni oluşturulur)
             timeout: Sorgu zaman aşımı (saniye)
             max_rows: Maksimum döndürülecek satır sayısı
+            result_cache: Sonuç önbelleği (None ise sonuçlar önbelleğe alınmaz)
+            change_tracker: Önbellekten okumadan önce değişen tabloları
+                pg_stat_user_tables sayaçlarından bulan yardımcı
+            admission: Sorguyu çalıştırmadan önce EXPLAIN maliyetine göre
+                reddeden veya örneklemeye düşüren kontrol (None ise kapalı)
+            slow_query_log: Eşikten yavaş sorguların planını yakalayan kayıt
+            scheduler: Öncelik ve kullanıcı kotalarıyla sıra veren zamanlayıcı
+                (None ise sorgular beklemeden çalışır)
+            cost_model_provider: Schema istatistikleriyle kurulan maliyet modelini
+                döndüren fonksiyon; verilirse sorgular çalıştırılmadan önce
+                statik maliyetleri tahmin edilir
         """
         self.db = db_connection
         self.validator = validator or SQLValidator(strict_mode=True)
         self.timeout = timeout or settings.max_query_timeout
         self.max_rows = max_rows or settings.max_result_rows
+        self.result_cache = result_cache
+        self.change_tracker = change_tracker
+        self.admission = admission
+        self.slow_query_log = slow_query_log
+        self.scheduler = scheduler
+        self.cost_model_provider = cost_model_provider
+        self.batch_cost_threshold = settings.scheduler_batch_cost_threshold
         logger.info(
             "QueryExecutor initialized",
             timeout=self.timeout,
@@ -52,68 +151,288 @@ class QueryExecutor:
         self,
         sql: str,
         validate: bool = True,
-    ) -> List[Dict[str, Any]]:
+        question: Optional[str] = None,
+        user: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> QueryResult:
         """
         SQL sorgusunu güvenli şekilde çalıştır
         
         Args:
             sql: Çalıştırılacak SQL sorgusu
             validate: True ise önce validasyon yap
+            question: Sorguyu üreten kullanıcı sorusu (yavaş sorgu kaydı için)
+            user: Kullanıcı veya tenant kimliği (zamanlayıcı kotaları için)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
         
         Returns:
-            Sorgu sonuçları (dict listesi)
+            Sorgu sonuçları (satırları dict gibi okunabilen kolon bazlı sonuç)
         
         Raises:
             ValidationError: Validasyon hatası
             QueryExecutionError: Sorgu çalıştırma hatası
+            QueryRejectedError: Planlanan maliyet kabul eşiklerini aştı
+            QueueFullError: Kullanıcının bekleyen sorgu kotası dolu
+            QueueTimeoutError: Sırada beklerken zaman aşımı
             TimeoutError: Zaman aşımı hatası
         """
-        # Validasyon
+        # Tek parse ile validasyon, temizleme ve tablo çıkarma
+        analysis = self._prepare(sql, validate)
+        sql = analysis.sanitized
+        
+        # LIMIT ekle (yoksa)
+        sql = self._ensure_limit(sql)
+        
+        # Önbellekte varsa veritabanına gitme
+        if self.result_cache is not None and self.change_tracker is not None:
+            self._invalidate_changed_tables()
+        cached, generation = self._cache_lookup(sql)
+        if cached is not None:
+            return cached
+        
+        # Statik maliyeti yüksek etkileşimli sorgular batch sınıfında sıraya girer
+        priority, cost_info = self._route(sql, priority)
+        
+        # Zamanlayıcıdan yer al; kabul kontrolü ve sorgu bu yerde çalışır
+        with self._schedule(user, priority) as queue_info:
+            # Pahalı sorguları çalıştırmadan önce planına göre reddet veya örnekle
+            executed_sql, admission_info = sql, {}
+            if self.admission is not None:
+                executed_sql, admission_info = self._admit(sql)
+            
+            logger.info("Executing query", sql=executed_sql[:200])
+            
+            try:
+                # Sorguyu çalıştır (timeout ile); zaman aşımı ve hatalar da kayda geçer
+                started = time.perf_counter()
+                try:
+                    results = self._apply_truncation(self._execute_with_timeout(executed_sql))
+                finally:
+                    duration_ms = (time.perf_counter() - started) * 1000
+                    self._observe_duration(executed_sql, duration_ms, question)
+                results = results.with_metadata(
+                    duration_ms=round(duration_ms, 1), **queue_info, **admission_info, **cost_info
+                )
+                
+                logger.info("Query executed successfully", row_count=len(results))
+                return self._cache_store(sql, results, generation, analysis.tables)
+                
+            except Exception as e:
+                logger.error("Query execution failed", error=str(e), sql=sql[:200])
+                raise QueryExecutionError(f"Sorgu çalıştırma hatası: {str(e)}")
+    
+    def _prepare(self, sql: str, validate: bool) -> SQLAnalysis:
+        """
+        SQL'i bir kez analiz et ve istenirse aynı analizle doğrula
+        
+        Args:
+            sql: Ham SQL sorgusu
+            validate: True ise validasyon yap
+        
+        Returns:
+            Temizlenmiş SQL ve tabloları içeren analiz
+        
+        Raises:
+            ValidationError: Validasyon hatası
+        """
+        analysis = self.validator.analyze(sql)
         if validate:
-            is_valid, error_msg = self.validator.validate(sql)
+            is_valid, error_msg = self.validator.validate(sql, analysis)
             if not is_valid:
                 logger.warning("Query validation failed", error=error_msg)
                 raise ValidationError(error_msg)
+        return analysis
+    
+    def estimate_cost(self, analysis: SQLAnalysis) -> CostEstimate:
+        """
+        Sorgunun maliyetini veritabanına gitmeden tahmin et
         
-        # SQL'i temizle ve formatla
-        sql = self.validator.sanitize_sql(sql)
+        Args:
+            analysis: SQLValidator.analyze ile üretilen analiz
         
-        # LIMIT ekle (yoksa)
-        sql = self._ensure_limit(sql)
+        Returns:
+            Maliyet tahmini (model yoksa tablolar varsayılan boyutta kabul edilir)
+        """
+        model = None
+        if self.cost_model_provider is not None:
+            try:
+                model = self.cost_model_provider()
+            except Exception as e:
+                logger.warning("Cost model unavailable", error=str(e))
+        if model is None:
+            model = CostModel({})
+        return model.estimate(analysis)
+    
+    def _route(self, sql: str, priority: str) -> tuple:
+        """
+        Statik maliyet tahminine göre öncelik sınıfını belirle
+        
+        Args:
+            sql: Satır sınırı eklenmiş, çalıştırılacak SQL
+            priority: İstenen öncelik sınıfı
+        
+        Returns:
+            (öncelik sınıfı, result metadata'sına eklenecek maliyet tahmini)
+        """
+        if self.cost_model_provider is None:
+            return priority, {}
+        
+        # Eklenen LIMIT taramayı da sınırlar; maliyet çalışacak sorgu üzerinden hesaplanır
+        estimate = self.estimate_cost(self.validator.analyze(sql))
+        cost_info = {
+            "estimated_cost": round(estimate.cost),
+            "estimated_rows": round(estimate.rows),
+        }
+        if (
+            priority == "interactive"
+            and self.batch_cost_threshold
+            and estimate.cost > self.batch_cost_threshold
+        ):
+            logger.info("Query routed to batch class", estimated_cost=estimate.cost)
+            priority = "batch"
+            cost_info["routed_to_batch"] = True
+        return priority, cost_info
+    
+    @contextmanager
+    def _schedule(self, user: Optional[str], priority: str) -> Iterator[Dict[str, Any]]:
+        """
+        Zamanlayıcı varsa sıra bekle ve çalışma yerini tut
         
-        logger.info("Executing query", sql=sql[:200])
+        Yields:
+            Result metadata'sına eklenecek sıra bekleme bilgisi
+        """
+        if self.scheduler is None:
+            yield {}
+            return
         
+        with self.scheduler.slot(user, priority) as wait:
+            yield {"queue_wait_ms": round(wait * 1000, 1)}
+    
+    def _observe_duration(self, sql: str, duration_ms: float, question: Optional[str]):
+        """Süreyi yavaş sorgu kaydına bildir (kayıt hatası sorguyu bozmaz)"""
+        if self.slow_query_log is None:
+            return
         try:
-            # Sorguyu çalıştır (timeout ile)
-            results = self._execute_with_timeout(sql)
-            
-            logger.info("Query executed successfully", row_count=len(results))
-            return results
-            
+            self.slow_query_log.observe(sql, duration_ms, question=question)
+        except Exception as e:
+            logger.warning("Slow query log failed", error=str(e))
+    
+    def _admit(self, sql: str) -> tuple:
+        """
+        Sorgunun planını al ve kabul kontrolünden geçir
+        
+        Args:
+            sql: Çalıştırılacak SQL
+        
+        Returns:
+            (çalıştırılacak SQL, result metadata'sına eklenecek plan özeti)
+        
+        Raises:
+            QueryRejectedError: Planlanan maliyet eşikleri aştı
+            QueryExecutionError: EXPLAIN çalıştırılamadı
+        """
+        try:
+            plan = self.explain_plan(sql)
         except Exception as e:
-            logger.error("Query execution failed", error=str(e), sql=sql[:200])
+            logger.error("EXPLAIN failed", error=str(e), sql=sql[:200])
             raise QueryExecutionError(f"Sorgu çalıştırma hatası: {str(e)}")
+        return self.admission.evaluate(sql, plan)
     
-    def _ensure_limit(self, sql: str) -> str:
+    def explain_plan(self, sql: str) -> Dict[str, Any]:
         """
-        SQL sorgusuna LIMIT ekle (yoksa)
+        Sorgunun tahmini planını getir (çalıştırmadan, EXPLAIN (FORMAT JSON))
         
         Args:
             sql: SQL sorgusu
         
         Returns:
-            LIMIT eklenmiş SQL
+            Planın kök düğümü ("Node Type", "Total Cost", "Plan Rows", "Plans", ...)
         """
-        sql_upper = sql.upper()
+        with self.db.get_cursor(dict_cursor=False) as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            document = cursor.fetchone()[0]
+        
+        # psycopg2 json tipini çözer; metin dönerse elle çöz
+        if isinstance(document, str):
+            document = json.loads(document)
+        return document[0]["Plan"]
+    
+    def _invalidate_changed_tables(self):
+        """pg_stat_user_tables sayaçları değişen tabloların önbellek girdilerini sil"""
+        changed = self.change_tracker.poll()
+        if changed:
+            self.result_cache.invalidate_tables(changed)
+    
+    def _cache_lookup(self, sql: str) -> tuple:
+        """
+        Normalleştirilmiş SQL için önbellekteki sonucu getir
         
-        # Zaten LIMIT varsa dokunma
-        if 'LIMIT' in sql_upper:
-            return sql
+        Returns:
+            (önbellekteki sonuç veya None, sorgu öncesi önbellek generation'ı)
+        """
+        if self.result_cache is None:
+            return None, None
+        
+        generation = self.result_cache.generation
+        cached = self.result_cache.get(sql)
+        if cached is None:
+            return None, generation
         
-        # LIMIT ekle
-        return f"{sql.rstrip(';')} LIMIT {self.max_rows};"
+        logger.info("Query result served from cache", sql=sql[:200])
+        return cached.with_metadata(cache="hit", cache_stats=self.result_cache.get_stats()), generation
     
-    def _execute_with_timeout(self, sql: str) -> List[Dict[str, Any]]:
+    def _cache_store(
+        self,
+        sql: str,
+        results: QueryResult,
+        generation: Optional[int],
+        tables: Sequence[str],
+    ) -> QueryResult:
+        """Sonucu okuduğu tablolarla birlikte önbelleğe koy ve metadata ekle"""
+        # Örneklenmiş sonuç yaklaşıktır; örneklenmemiş SQL'in anahtarıyla saklanmamalı
+        if self.result_cache is None or results.metadata.get("admission") == "sampled":
+            return results
+        
+        # Süre, sıra ve plan bilgisi bu çalıştırmaya aittir; isabette gösterilmemeli
+        stored = results.without_metadata(*EXECUTION_METADATA_KEYS)
+        self.result_cache.put(sql, stored, list(tables), generation=generation)
+        return results.with_metadata(cache="miss", cache_stats=self.result_cache.get_stats())
+    
+    def _ensure_limit(self, sql: str, cap: Optional[int] = None) -> str:
+        """
+        Dış sorgunun satır sayısını yapısal olarak sınırla
+        
+        Sadece en dış seviyedeki LIMIT dikkate alınır; alt sorgu, string veya
+        kolon adı içindeki "LIMIT" sınırı atlatmaz.
+        
+        Args:
+            sql: SQL sorgusu
+            cap: Maksimum satır sayısı (None ise max_rows + 1; fazladan gelen
+                satır sonucun kısaltıldığını gösterir)
+        
+        Returns:
+            Sınır uygulanmış SQL
+        """
+        if cap is None:
+            cap = self.max_rows + 1
+        return apply_row_cap(sql, cap)
+    
+    def _apply_truncation(self, results: QueryResult) -> QueryResult:
+        """
+        Sınırın üstünde gelen fazladan satırı at ve truncated bilgisini ekle
+        
+        Args:
+            results: max_rows + 1 satırla sınırlanmış sorgu sonucu
+        
+        Returns:
+            En fazla max_rows satırlık sonuç
+        """
+        if len(results) > self.max_rows:
+            logger.warning("Query result truncated", max_rows=self.max_rows)
+            return results[:self.max_rows].with_metadata(truncated=True)
+        return results.with_metadata(truncated=False)
+    
+    def _execute_with_timeout(self, sql: str) -> QueryResult:
         """
         Sorguyu timeout ile çalıştır
         
@@ -127,16 +446,17 @@ class QueryExecutor:
             TimeoutError: Zaman aşımı durumunda
         """
         try:
-            with self.db.get_cursor() as cursor:
-                # PostgreSQL statement timeout ayarla
-                cursor.execute(f"SET statement_timeout = {self.timeout * 1000};")
+            with self.db.get_cursor(dict_cursor=False) as cursor:
+                # Oturum varsayılanından farklıysa sadece bu işlem için timeout ayarla
+                if self._needs_timeout_override():
+                    cursor.execute(f"SET LOCAL statement_timeout = {self.timeout * 1000};")
                 
                 # Sorguyu çalıştır
                 cursor.execute(sql)
-                results = cursor.fetchall()
                 
-                # Dict listesine çevir
-                return [dict(row) for row in results]
+                # Satır başına dict yerine kolon bazlı sonuca çevir
+                columns = [column[0] for column in cursor.description or ()]
+                return QueryResult.from_rows(columns, cursor.fetchall())
                 
         except Exception as e:
             error_msg = str(e).lower()
@@ -150,6 +470,260 @@ class QueryExecutor:
             # Diğer hatalar
             raise
     
+    def stream_query(
+        self,
+        sql: str,
+        validate: bool = True,
+        batch_size: Optional[int] = None,
+    ) -> ResultStream:
+        """
+        Sorgu sonuçlarını satır satır akıt (server-side cursor ile)
+        
+        Args:
+            sql: Çalıştırılacak SQL sorgusu
+            validate: True ise önce validasyon yap
+            batch_size: Sunucudan tek seferde çekilecek satır sayısı
+        
+        Returns:
+            Satırları (dict) üreten akış; max_rows'a takıldıysa truncated True olur
+        """
+        def rows(stream: ResultStream) -> Iterator[Dict[str, Any]]:
+            batches = self.stream_batches(sql, validate=validate, batch_size=batch_size)
+            try:
+                for batch in batches:
+                    yield from batch
+            finally:
+                batches.close()
+                stream.truncated = batches.truncated
+        
+        return ResultStream(rows)
+    
+    def stream_batches(
+        self,
+        sql: str,
+        validate: bool = True,
+        batch_size: Optional[int] = None,
+    ) -> ResultStream:
+        """
+        Sorgu sonuçlarını parça parça akıt
+        
+        Sonuçlar isimli (server-side) cursor üzerinden fetchmany ile çekilir;
+        bellekte aynı anda en fazla bir parça tutulur. Akış yarıda bırakılırsa
+        cursor kapanır ve işlem geri alınır. Sorgu max_rows + 1 sınırıyla
+        çalışır; fazladan satır gelirse atılır ve akışın truncated alanı
+        True olur.
+        
+        Args:
+            sql: Çalıştırılacak SQL sorgusu
+            validate: True ise önce validasyon yap
+            batch_size: Parça başına satır sayısı (None ise ayarlardaki değer)
+        
+        Returns:
+            Satır listelerini üreten akış
+        
+        Raises:
+            ValidationError: Validasyon hatası
+            QueryExecutionError: Sorgu çalıştırma hatası
+            TimeoutError: Zaman aşımı hatası
+        """
+        return ResultStream(lambda stream: self._stream_batches(stream, sql, validate, batch_size))
+    
+    def _stream_batches(
+        self,
+        stream: ResultStream,
+        sql: str,
+        validate: bool,
+        batch_size: Optional[int],
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """stream_batches gövdesi; sınıra takılınca stream.truncated işaretlenir"""
+        sql = self._ensure_limit(self._prepare(sql, validate).sanitized)
+        batch_size = batch_size or settings.stream_batch_size
+        
+        logger.info("Streaming query", sql=sql[:200], batch_size=batch_size)
+        
+        row_count = 0
+        try:
+            with self.db.transaction() as conn:
+                if self._needs_timeout_override():
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"SET LOCAL statement_timeout = {self.timeout * 1000};")
+                
+                cursor = conn.cursor(
+                    name=f"dbqa_stream_{uuid.uuid4().hex}",
+                    cursor_factory=RealDictCursor,
+                )
+                try:
+                    cursor.itersize = batch_size
+                    cursor.execute(sql)
+                    while True:
+                        batch = cursor.fetchmany(batch_size)
+                        if not batch:
+                            break
+                        # Fazladan gelen satır sonucun kısaltıldığını gösterir
+                        if row_count + len(batch) > self.max_rows:
+                            batch = batch[:self.max_rows - row_count]
+                            stream.truncated = True
+                            logger.warning("Query stream truncated", max_rows=self.max_rows)
+                        if batch:
+                            row_count += len(batch)
+                            yield batch
+                        if stream.truncated:
+                            break
+                finally:
+                    cursor.close()
+        
+        except (ValidationError, TimeoutError):
+            raise
+        except Exception as e:
+            error_msg = str(e).lower()
+            if 'timeout' in error_msg or 'canceling statement' in error_msg:
+                raise TimeoutError(
+                    f"Sorgu {self.timeout} saniye içinde tamamlanamadı."
+                )
+            logger.error("Query streaming failed", error=str(e), sql=sql[:200])
+            raise QueryExecutionError(f"Sorgu çalıştırma hatası: {str(e)}")
+        
+        logger.info("Query streamed successfully", row_count=row_count)
+    
+    def export_query(
+        self,
+        sql: str,
+        destination: Any,
+        export_format: str = "csv",
+        validate: bool = True,
+        user: Optional[str] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Sorgu sonucunu dosyaya toplu aktar
+        
+        CSV ve JSONL sunucuda COPY (...) TO STDOUT ile serileştirilip dosyaya
+        doğrudan akıtılır; Python tarafında satır nesnesi oluşturulmaz.
+        Parquet, server-side cursor parçalarından pyarrow ile yazılır. Her
+        iki yolda da bellek kullanımı sonuç boyutundan bağımsızdır.
+        
+        Args:
+            sql: Çalıştırılacak SELECT sorgusu
+            destination: Dosya yolu veya binary dosya nesnesi
+            export_format: "csv", "jsonl" veya "parquet"
+            validate: True ise önce validasyon yap
+            user: Kullanıcı veya tenant kimliği (zamanlayıcı kotaları için)
+            batch_size: Parquet için parça başına satır sayısı
+        
+        Returns:
+            Yazılan satır ve bayt sayısı ile süre bilgileri
+        
+        Raises:
+            ValidationError: Validasyon hatası
+            QueryExecutionError: Sorgu çalıştırma hatası
+            TimeoutError: Zaman aşımı hatası
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Geçersiz dışa aktarma formatı: {export_format}")
+        
+        sql = self._prepare(sql, validate).sanitized
+        if settings.export_max_rows:
+            sql = self._ensure_limit(sql, cap=settings.export_max_rows)
+        
+        logger.info("Exporting query", sql=sql[:200], format=export_format)
+        
+        started = time.perf_counter()
+        try:
+            # Toplu aktarımlar batch sınıfında sıraya girer
+            with self._schedule(user, "batch") as queue_info:
+                if export_format == "parquet":
+                    stats = self._export_parquet(sql, destination, batch_size or settings.stream_batch_size)
+                else:
+                    stats = self._export_copy(sql, destination, export_format)
+        
+        except (ValidationError, TimeoutError, ImportError):
+            raise
+        except Exception as e:
+            error_msg = str(e).lower()
+            if 'timeout' in error_msg or 'canceling statement' in error_msg:
+                raise TimeoutError(
+                    f"Dışa aktarma {settings.export_timeout} saniye içinde tamamlanamadı."
+                )
+            logger.error("Query export failed", error=str(e), sql=sql[:200])
+            raise QueryExecutionError(f"Dışa aktarma hatası: {str(e)}")
+        
+        stats.update(
+            format=export_format,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            **queue_info,
+        )
+        logger.info("Query exported successfully", **stats)
+        return stats
+    
+    @contextmanager
+    def _open_destination(self, destination: Any) -> Iterator[Any]:
+        """
+        Hedef dosya yolunu binary yazma için aç (dosya nesnesi olduğu gibi kullanılır)
+        
+        Çıktı aynı dizindeki geçici dosyaya yazılır ve sadece aktarım başarılı
+        olursa hedefin yerine konur; hata durumunda var olan dosya korunur ve
+        yarım dosya kalmaz.
+        """
+        if hasattr(destination, "write"):
+            yield destination
+            return
+        
+        temp_path = f"{os.fspath(destination)}.{uuid.uuid4().hex}.part"
+        try:
+            with open(temp_path, "xb") as f:
+                yield f
+            os.replace(temp_path, destination)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def _export_copy(self, sql: str, destination: Any, export_format: str) -> Dict[str, Any]:
+        """COPY TO STDOUT çıktısını hedefe akıt"""
+        with self._open_destination(destination) as f, \
+                self.db.get_cursor(dict_cursor=False) as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {settings.export_timeout * 1000};")
+            target = ByteCounter(f)
+            sink = CopyTextDecoder(target) if export_format == "jsonl" else target
+            cursor.copy_expert(copy_statement(sql, export_format), sink)
+            return {"rows": cursor.rowcount, "bytes": target.bytes_written}
+    
+    def _export_parquet(self, sql: str, destination: Any, batch_size: int) -> Dict[str, Any]:
+        """Server-side cursor parçalarını Parquet row group'ları olarak yaz"""
+        _, parquet = load_arrow()
+        
+        rows = 0
+        with self.db.transaction() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SET LOCAL statement_timeout = {settings.export_timeout * 1000};")
+            
+            cursor = conn.cursor(name=f"dbqa_export_{uuid.uuid4().hex}")
+            try:
+                cursor.itersize = batch_size
+                cursor.execute(sql)
+                batch = cursor.fetchmany(batch_size)
+                schema = arrow_schema(cursor.description)
+                
+                with self._open_destination(destination) as f, \
+                        parquet.ParquetWriter(f, schema) as writer:
+                    while batch:
+                        writer.write_table(rows_to_arrow(batch, schema))
+                        rows += len(batch)
+                        batch = cursor.fetchmany(batch_size)
+            finally:
+                cursor.close()
+        
+        return {"rows": rows}
+    
+    def _needs_timeout_override(self) -> bool:
+        """
+        Executor timeout'u bağlantı açılırken uygulanan statement_timeout'tan farklı mı
+        
+        Returns:
+            True ise sorgudan önce SET LOCAL gerekir
+        """
+        return self.db.session_setting("statement_timeout") != str(self.timeout * 1000)
+    
     def execute_and_format(
         self,
         sql: str,
@@ -171,7 +745,7 @@ class QueryExecutor:
             return results
         elif format_type == "list":
             # Sadece değerleri döndür
-            return [list(row.values()) for row in results]
+            return [list(row) for row in results.rows()]
         elif format_type == "count":
             return len(results)
         else:
@@ -192,60 +766,32 @@ class QueryExecutor:
             "error": None,
             "sanitized_sql": None,
             "estimated_complexity": None,
+            "estimated_cost": None,
+            "estimated_rows": None,
             "tables": [],
         }
         
         # Validasyon
-        is_valid, error_msg = self.validator.validate(sql)
+        analysis = self.validator.analyze(sql)
+        is_valid, error_msg = self.validator.validate(sql, analysis)
         test_result["valid"] = is_valid
         test_result["error"] = error_msg
         
         if is_valid:
             # SQL'i temizle
-            test_result["sanitized_sql"] = self.validator.sanitize_sql(sql)
+            test_result["sanitized_sql"] = analysis.sanitized
             
             # Tablo isimlerini çıkar
-            test_result["tables"] = self.validator.extract_table_names(sql)
+            test_result["tables"] = list(analysis.tables)
             
-            # Karmaşıklık tahmini
-            test_result["estimated_complexity"] = self._estimate_complexity(sql)
+            # Schema istatistikleriyle, satır sınırı eklenmiş sorgunun statik maliyet tahmini
+            estimate = self.estimate_cost(self.validator.analyze(self._ensure_limit(analysis.sanitized)))
+            test_result["estimated_complexity"] = estimate.level
+            test_result["estimated_cost"] = round(estimate.cost)
+            test_result["estimated_rows"] = round(estimate.rows)
         
         return test_result
     
-    def _estimate_complexity(self, sql: str) -> str:
-        """
-        Sorgu karmaşıklığını tahmin et
-        
-        Args:
-            sql: SQL sorgusu
-        
-        Returns:
-            Karmaşıklık seviyesi ("low", "medium", "high")
-        """
-        sql_upper = sql.upper()
-        
-        complexity_score = 0
-        
-        # JOIN sayısı
-        complexity_score += sql_upper.count('JOIN') * 2
-        
-        # Alt sorgu sayısı
-        complexity_score += sql_upper.count('SELECT') - 1
-        
-        # Aggregate fonksiyonlar
-        complexity_score += sql_upper.count('GROUP BY')
-        complexity_score += sql_upper.count('HAVING')
-        
-        # UNION
-        complexity_score += sql_upper.count('UNION') * 3
-        
-        if complexity_score <= 2:
-            return "low"
-        elif complexity_score <= 6:
-            return "medium"
-        else:
-            return "high"
-    
     def get_query_stats(self, sql: str) -> Dict[str, Any]:
         """
         Sorgu istatistiklerini getir (EXPLAIN kullanarak)
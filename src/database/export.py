@@ -0,0 +1,177 @@
+"""COPY TO STDOUT ile toplu sonuç dışa aktarma"""
+
+import re
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# PostgreSQL tip OID'leri -> pyarrow tip adı (diğerleri metin olarak yazılır)
+ARROW_TYPE_NAMES = {
+    16: "bool_",
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    700: "float32",
+    701: "float64",
+    1700: "float64",
+    1082: "date32",
+    1114: "timestamp_us",
+    1184: "timestamp_us_tz",
+}
+
+# JSONL için COPY text kaçışlarının çözümü. Geçerli JSON'da ham satır sonu sadece
+# anlamsız boşluk olabilir (string içindekiler zaten \n olarak kaçırılır), bu
+# yüzden kaçırılmış satır sonları boşluğa çevrilir; kaçırılmamış satır sonu
+# kayıt ayırıcıdır ve her satır tek bir JSON kaydı olarak kalır.
+JSONL_COPY_ESCAPES = {b"n": b" ", b"r": b" ", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"v": b"\v"}
+
+_COPY_ESCAPE_PATTERN = re.compile(rb"\\(.)", re.S)
+
+
+def export_format_for(path: str) -> Optional[str]:
+    """
+    Dosya uzantısından dışa aktarma formatını bul
+    
+    Args:
+        path: Hedef dosya yolu
+    
+    Returns:
+        "csv", "jsonl", "parquet" veya tanınmayan uzantıda None
+    """
+    extension = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if extension in ("json", "ndjson"):
+        extension = "jsonl"
+    return extension if extension in EXPORT_FORMATS else None
+
+
+def copy_statement(sql: str, export_format: str) -> str:
+    """
+    Validasyondan geçmiş SELECT'i sunucu tarafında serileştiren COPY komutuna sar
+    
+    Bu komut sadece executor içinde üretilir; kullanıcı SQL'inde COPY
+    validator tarafından engellenmeye devam eder.
+    
+    Args:
+        sql: Tek bir SELECT sorgusu
+        export_format: "csv" veya "jsonl"
+    
+    Returns:
+        COPY (...) TO STDOUT komutu
+    """
+    body = sql.strip().rstrip(";").rstrip()
+    
+    if export_format == "csv":
+        return f"COPY (\n{body}\n) TO STDOUT WITH (FORMAT csv, HEADER true)"
+    
+    if export_format == "jsonl":
+        # Satırlar row_to_json ile JSON'a çevrilir; text formatındaki ters bölü
+        # kaçışları yazılırken CopyTextDecoder ile çözülür
+        return (
+            f"COPY (\nSELECT row_to_json(export_row)::text FROM (\n{body}\n) AS export_row\n) "
+            "TO STDOUT WITH (FORMAT text)"
+        )
+    
+    raise ValueError(f"COPY ile desteklenmeyen format: {export_format}")
+
+
+def load_arrow():
+    """pyarrow modüllerini yükle (Parquet için opsiyonel bağımlılık)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet dışa aktarma için pyarrow gerekli: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def arrow_schema(description: Sequence[Any]) -> Any:
+    """
+    Cursor açıklamasından (kolon adı ve tip OID'i) pyarrow şeması oluştur
+    
+    Tipler ilk parçadan tahmin edilmediği için tamamı NULL gelen kolonlar
+    da sonraki parçalarla aynı tipte kalır.
+    
+    Args:
+        description: cursor.description
+    
+    Returns:
+        pyarrow.Schema
+    """
+    pa, _ = load_arrow()
+    types = {
+        "bool_": pa.bool_(),
+        "int16": pa.int16(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float32": pa.float32(),
+        "float64": pa.float64(),
+        "date32": pa.date32(),
+        "timestamp_us": pa.timestamp("us"),
+        "timestamp_us_tz": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([
+        (column[0], types.get(ARROW_TYPE_NAMES.get(column[1]), pa.string()))
+        for column in description
+    ])
+
+
+def rows_to_arrow(rows: List[tuple], schema: Any) -> Any:
+    """
+    Tuple satır parçasını şemaya uygun pyarrow tablosuna çevir
+    
+    Args:
+        rows: fetchmany ile alınan satırlar
+        schema: arrow_schema ile oluşturulan şema
+    
+    Returns:
+        pyarrow.Table
+    """
+    pa, _ = load_arrow()
+    columns = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_floating(field.type):
+            values = [float(v) if isinstance(v, Decimal) else v for v in values]
+        elif pa.types.is_string(field.type):
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class ByteCounter:
+    """Yazılan bayt sayısını tutan dosya sarmalayıcısı (copy_expert hedefi)"""
+    
+    def __init__(self, target: Any):
+        self.target = target
+        self.bytes_written = 0
+    
+    def write(self, data: Any) -> int:
+        self.bytes_written += len(data)
+        return self.target.write(data)
+
+
+class CopyTextDecoder:
+    """
+    JSONL COPY çıktısının text formatı kaçışlarını çözerek yazan dosya sarmalayıcısı
+    
+    Kaçış dizisi iki write çağrısına bölünürse yarım kalan ters bölü bir
+    sonraki parçayla birlikte çözülür.
+    """
+    
+    def __init__(self, target: Any):
+        self.target = target
+        self._pending = b""
+    
+    def write(self, data: Any) -> int:
+        data = self._pending + bytes(data)
+        self._pending = b""
+        
+        trailing = len(data) - len(data.rstrip(b"\\"))
+        if trailing % 2:
+            data, self._pending = data[:-1], b"\\"
+        
+        return self.target.write(_COPY_ESCAPE_PATTERN.sub(
+            lambda match: JSONL_COPY_ESCAPES.get(match.group(1), match.group(1)), data
+        ))
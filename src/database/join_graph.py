@@ -0,0 +1,132 @@
+"""Foreign key ilişkilerinden oluşturulan JOIN grafiği"""
+
+from collections import deque
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, Iterable
+
+
+class JoinEdge(NamedTuple):
+    """İki tabloyu bağlayan tek bir foreign key"""
+    
+    table: str
+    column: str
+    foreign_table: str
+    foreign_column: str
+    
+    def condition(self) -> str:
+        """JOIN koşulunu metin olarak döndür"""
+        return f"{self.table}.{self.column} = {self.foreign_table}.{self.foreign_column}"
+    
+    def reversed(self) -> "JoinEdge":
+        """Aynı koşulu diğer tablodan bakarak ifade eden kenar"""
+        return JoinEdge(self.foreign_table, self.foreign_column, self.table, self.column)
+
+
+class JoinGraph:
+    """
+    Tablolar arası en kısa JOIN yollarını önceden hesaplayan graf
+    
+    Foreign key'ler yönsüz kenar kabul edilir. Schema yüklendiğinde her tablodan
+    BFS yapılarak tüm tablo çiftleri için en kısa yol saklanır; böylece sorgu
+    anında iki tablo arasındaki yol tek bir sözlük erişimiyle bulunur.
+    """
+    
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Grafı schema bilgisinden oluştur ve tüm en kısa yolları hesapla
+        
+        Args:
+            schema: get_full_schema çıktısı
+        """
+        self._adjacency: Dict[str, List[Tuple[str, JoinEdge]]] = {name: [] for name in schema}
+        
+        for table_name, table_info in schema.items():
+            for fk in table_info.get('foreign_keys', []):
+                foreign_table = fk['foreign_table_name']
+                if foreign_table == table_name or foreign_table not in self._adjacency:
+                    continue
+                edge = JoinEdge(
+                    table_name, fk['column_name'], foreign_table, fk['foreign_column_name']
+                )
+                self._adjacency[table_name].append((foreign_table, edge))
+                self._adjacency[foreign_table].append((table_name, edge))
+        
+        self._paths: Dict[str, Dict[str, Tuple[JoinEdge, ...]]] = {
+            source: self._shortest_paths_from(source) for source in self._adjacency
+        }
+    
+    def _shortest_paths_from(self, source: str) -> Dict[str, Tuple[JoinEdge, ...]]:
+        """Bir tablodan erişilebilen tüm tablolara en kısa kenar dizilerini bul"""
+        paths: Dict[str, Tuple[JoinEdge, ...]] = {source: ()}
+        queue = deque([source])
+        
+        while queue:
+            current = queue.popleft()
+            for neighbour, edge in self._adjacency[current]:
+                if neighbour not in paths:
+                    paths[neighbour] = paths[current] + (edge,)
+                    queue.append(neighbour)
+        
+        return paths
+    
+    def path(self, source: str, target: str) -> Optional[Tuple[JoinEdge, ...]]:
+        """
+        İki tablo arasındaki en kısa JOIN yolunu getir
+        
+        Args:
+            source: Başlangıç tablosu
+            target: Hedef tablo
+        
+        Returns:
+            Kenar dizisi (bağlantı yoksa None)
+        """
+        return self._paths.get(source, {}).get(target)
+    
+    def neighbours(self, table: str) -> List[str]:
+        """Bir tabloya doğrudan foreign key ile bağlı tablolar"""
+        return [neighbour for neighbour, _ in self._adjacency.get(table, [])]
+    
+    def connect(self, tables: Iterable[str]) -> Tuple[List[str], List[JoinEdge]]:
+        """
+        Verilen tabloları birbirine bağlamak için gereken ara tabloları bul
+        
+        Her yeni tablo, o ana kadar bağlanmış tablolardan kendisine en yakın
+        olanına en kısa yol ile eklenir (Steiner ağacı için açgözlü yaklaşım).
+        Dönen kenarlar JOIN sırasına göre yönlendirilir: edge.table JOIN ile
+        eklenen tablo, edge.foreign_table zaten bağlı olan tablodur.
+        
+        Args:
+            tables: Bağlanması istenen tablolar
+        
+        Returns:
+            (ara tablolar dahil tablo listesi, JOIN kenarları) tuple'ı
+        """
+        connected: List[str] = []
+        edges: List[JoinEdge] = []
+        
+        for table in tables:
+            if table not in self._adjacency or table in connected:
+                continue
+            
+            best: Optional[Tuple[JoinEdge, ...]] = None
+            best_anchor = table
+            for anchor in connected:
+                candidate = self.path(anchor, table)
+                if candidate is not None and (best is None or len(candidate) < len(best)):
+                    best, best_anchor = candidate, anchor
+            
+            if best is None:
+                connected.append(table)
+                continue
+            
+            # Yol bağlı tablodan yeni tabloya doğru yürünür
+            current = best_anchor
+            for edge in best:
+                if edge.table == current:
+                    edge = edge.reversed()
+                current = edge.table
+                if edge not in edges and edge.reversed() not in edges:
+                    edges.append(edge)
+                if current not in connected:
+                    connected.append(current)
+        
+        return connected, edges
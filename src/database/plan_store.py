@@ -0,0 +1,408 @@
+"""Yavaş sorguların EXPLAIN ANALYZE planlarını saklayan SQLite deposu"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Set, Tuple
+import sqlparse
+from sqlparse.tokens import Comment, Number, String
+from .admission import iter_plan_nodes
+from ..config import settings
+from ..utils.logger import logger
+
+
+# IN (?, ?, ?) listeleri eleman sayısından bağımsız tek parmak izi versin
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+ORDER_COLUMNS = {"max": "max_ms", "total": "total_ms", "calls": "calls"}
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Sorguyu literal değerlerinden arındırılmış şablona çevir
+    
+    Args:
+        sql: SQL sorgusu
+    
+    Returns:
+        Literal'leri "?" ile değiştirilmiş, küçük harfli, tek boşluklu SQL
+    """
+    parts = []
+    for token in sqlparse.parse(sql)[0].flatten():
+        if token.ttype in Comment:
+            continue
+        if token.is_whitespace:
+            parts.append(" ")
+        elif token.ttype in String or token.ttype in Number:
+            parts.append("?")
+        else:
+            parts.append(token.value.lower())
+    
+    text = re.sub(r"\s+", " ", "".join(parts)).strip().rstrip(";").strip()
+    return _PLACEHOLDER_LIST.sub("(?)", text)
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Aynı şablondaki sorgular için ortak parmak izi üret
+    
+    Args:
+        sql: SQL sorgusu
+    
+    Returns:
+        16 karakterlik hex parmak izi
+    """
+    return hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def dominant_nodes(plan: Dict[str, Any], limit: int = 3) -> List[str]:
+    """
+    Planda süreyi en çok harcayan ve diske taşan düğümleri açıkla
+    
+    ANALYZE planlarında düğümler kendi (alt düğümler hariç) süresine, tahmini
+    planlarda kendi maliyetine göre sıralanır.
+    
+    Args:
+        plan: EXPLAIN (FORMAT JSON) çıktısındaki "Plan" düğümü
+        limit: Döndürülecek maksimum düğüm sayısı
+    
+    Returns:
+        "Seq Scan on orders: 812.4 ms, 1200000 satır" gibi açıklamalar
+    """
+    analyzed = "Actual Total Time" in plan
+    measure = "Actual Total Time" if analyzed else "Total Cost"
+    
+    def inclusive(node: Dict[str, Any]) -> float:
+        loops = node.get("Actual Loops", 1) if analyzed else 1
+        return node.get(measure, 0.0) * loops
+    
+    ranked = []
+    for node in iter_plan_nodes(plan):
+        own = inclusive(node) - sum(inclusive(child) for child in node.get("Plans", []))
+        
+        label = node.get("Node Type", "?")
+        if node.get("Relation Name"):
+            label += f" on {node['Relation Name']}"
+        
+        details = [f"{own:.1f} ms" if analyzed else f"maliyet {own:.0f}"]
+        rows = node.get("Actual Rows", node.get("Plan Rows"))
+        if rows is not None:
+            details.append(f"{rows} satır")
+        
+        spilled = False
+        if node.get("Sort Space Type") == "Disk":
+            details.append(f"diske taştı ({node.get('Sort Space Used', 0)} kB)")
+            spilled = True
+        if node.get("Hash Batches", 1) > 1:
+            details.append(f"{node['Hash Batches']} hash batch (diske taştı)")
+            spilled = True
+        if node.get("Shared Read Blocks"):
+            details.append(f"{node['Shared Read Blocks']} blok diskten okundu")
+        
+        # Diske taşan düğümler süreleri küçük olsa da öne alınır
+        ranked.append((spilled, own, f"{label}: {', '.join(details)}"))
+    
+    ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [description for _, _, description in ranked[:limit]]
+
+
+class PlanStore:
+    """
+    Yavaş sorgu süreleri ve planlarını parmak izine göre tutan SQLite deposu
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS slow_queries (
+            fingerprint TEXT PRIMARY KEY,
+            sql TEXT NOT NULL,
+            question TEXT,
+            calls INTEGER NOT NULL DEFAULT 0,
+            total_ms REAL NOT NULL DEFAULT 0,
+            max_ms REAL NOT NULL DEFAULT 0,
+            last_ms REAL,
+            first_seen REAL,
+            last_seen REAL,
+            plan TEXT,
+            plan_kind TEXT,
+            plan_captured_at REAL
+        )
+    """
+    
+    def __init__(self, path: str):
+        """
+        Depoyu aç (dosya ve tablo yoksa oluşturulur)
+        
+        Args:
+            path: SQLite dosyasının yolu (":memory:" olabilir)
+        """
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(self.SCHEMA)
+    
+    @classmethod
+    def from_settings(cls) -> "PlanStore":
+        """
+        Ayarlardaki dosya yolu ile depo oluştur
+        
+        Returns:
+            PlanStore instance
+        """
+        return cls(settings.slow_query_store_path)
+    
+    def record_timing(
+        self,
+        fingerprint: str,
+        sql: str,
+        duration_ms: float,
+        question: Optional[str] = None,
+    ):
+        """
+        Yavaş bir çalıştırmanın süresini kaydet
+        
+        Args:
+            fingerprint: Sorgu parmak izi
+            sql: Çalıştırılan SQL (son örnek saklanır)
+            duration_ms: Süre (milisaniye)
+            question: Sorguyu üreten kullanıcı sorusu
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO slow_queries
+                    (fingerprint, sql, question, calls, total_ms, max_ms, last_ms, first_seen, last_seen)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    sql = excluded.sql,
+                    question = COALESCE(excluded.question, question),
+                    calls = calls + 1,
+                    total_ms = total_ms + excluded.total_ms,
+                    max_ms = MAX(max_ms, excluded.max_ms),
+                    last_ms = excluded.last_ms,
+                    last_seen = excluded.last_seen
+                """,
+                (fingerprint, sql, question, duration_ms, duration_ms, duration_ms, now, now),
+            )
+    
+    def save_plan(self, fingerprint: str, plan: Dict[str, Any], kind: str):
+        """
+        Sorgu planını kaydet
+        
+        Args:
+            fingerprint: Sorgu parmak izi
+            plan: EXPLAIN (FORMAT JSON) çıktısının ilk elemanı
+            kind: "analyze" (gerçek süreler) veya "estimate" (sadece tahmin)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE slow_queries SET plan = ?, plan_kind = ?, plan_captured_at = ? "
+                "WHERE fingerprint = ?",
+                (json.dumps(plan), kind, time.time(), fingerprint),
+            )
+    
+    def needs_plan(self, fingerprint: str) -> bool:
+        """
+        Parmak izi için henüz plan yakalanmadı mı
+        
+        Tahmini (ANALYZE bütçesini aşan) planlar da yeterli sayılır; aynı
+        pahalı sorgu her yavaş çalıştırmada yeniden analiz edilmez.
+        
+        Args:
+            fingerprint: Sorgu parmak izi
+        
+        Returns:
+            True ise plan yakalanmalı
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan IS NULL FROM slow_queries WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return row is None or bool(row[0])
+    
+    def worst(self, limit: int = 10, order_by: str = "max") -> List[Dict[str, Any]]:
+        """
+        En yavaş sorguları planlarıyla getir
+        
+        Args:
+            limit: Maksimum kayıt sayısı
+            order_by: Sıralama ölçütü ("max", "total" veya "calls")
+        
+        Returns:
+            Sorgu kayıtları (plan çözülmüş dict olarak, yoksa None)
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Geçersiz sıralama: {order_by}")
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM slow_queries ORDER BY {ORDER_COLUMNS[order_by]} DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        
+        records = []
+        for row in rows:
+            record = dict(row)
+            record["avg_ms"] = record["total_ms"] / record["calls"] if record["calls"] else 0.0
+            record["plan"] = json.loads(record["plan"]) if record["plan"] else None
+            records.append(record)
+        return records
+    
+    def clear(self):
+        """Tüm kayıtları sil"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM slow_queries")
+    
+    def close(self):
+        """SQLite bağlantısını kapat"""
+        with self._lock:
+            self._conn.close()
+
+
+class SlowQueryLog:
+    """
+    Eşikten yavaş sorguları kaydedip planlarını arka planda yakalayan yardımcı
+    
+    Plan, sorgu cevabını geciktirmemek için tek işçili bir thread'de ve
+    statement_timeout bütçesiyle EXPLAIN (ANALYZE, BUFFERS) çalıştırılarak
+    alınır. Bütçe aşılırsa sadece tahmini plan saklanır.
+    """
+    
+    def __init__(
+        self,
+        db_connection,
+        store: PlanStore,
+        threshold_ms: float = 1000.0,
+        analyze_budget_ms: int = 10000,
+    ):
+        """
+        Yavaş sorgu kaydını oluştur
+        
+        Args:
+            db_connection: Veritabanı bağlantısı (işçi için ayrı kopyası açılır)
+            store: Planların yazılacağı depo
+            threshold_ms: Bu süreyi aşan sorgular kaydedilir (milisaniye)
+            analyze_budget_ms: EXPLAIN ANALYZE için statement_timeout (milisaniye)
+        """
+        self.db = db_connection.spawn()
+        self._owns_db = self.db is not db_connection
+        self.store = store
+        self.threshold_ms = threshold_ms
+        self.analyze_budget_ms = analyze_budget_ms
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-plan")
+    
+    @classmethod
+    def from_settings(cls, db_connection) -> "SlowQueryLog":
+        """
+        Ayarlardaki eşik, bütçe ve depo ile yavaş sorgu kaydı oluştur
+        
+        Args:
+            db_connection: Veritabanı bağlantısı
+        
+        Returns:
+            SlowQueryLog instance
+        """
+        return cls(
+            db_connection,
+            PlanStore.from_settings(),
+            threshold_ms=settings.slow_query_threshold_ms,
+            analyze_budget_ms=settings.slow_query_analyze_budget_ms,
+        )
+    
+    def observe(self, sql: str, duration_ms: float, question: Optional[str] = None) -> bool:
+        """
+        Çalıştırma süresini değerlendir; eşiği aşıyorsa kaydet ve plan yakala
+        
+        Args:
+            sql: Çalıştırılan SQL
+            duration_ms: Süre (milisaniye)
+            question: Sorguyu üreten kullanıcı sorusu
+        
+        Returns:
+            True ise sorgu yavaş olarak kaydedildi
+        """
+        if duration_ms < self.threshold_ms:
+            return False
+        
+        fingerprint = fingerprint_sql(sql)
+        try:
+            self.store.record_timing(fingerprint, sql, duration_ms, question=question)
+            needs_plan = self.store.needs_plan(fingerprint)
+        except sqlite3.Error as e:
+            logger.warning("Failed to record slow query", error=str(e))
+            return False
+        
+        logger.warning("Slow query", fingerprint=fingerprint, duration_ms=round(duration_ms, 1))
+        
+        with self._pending_lock:
+            if needs_plan and fingerprint not in self._pending:
+                self._pending.add(fingerprint)
+                self._worker.submit(self._capture, fingerprint, sql)
+        return True
+    
+    def _capture(self, fingerprint: str, sql: str):
+        """Planı yakala ve depoya yaz (işçi thread'inde çalışır)"""
+        try:
+            plan, kind = self.capture_plan(sql)
+            self.store.save_plan(fingerprint, plan, kind)
+            logger.info("Slow query plan captured", fingerprint=fingerprint, kind=kind)
+        except Exception as e:
+            logger.warning("Failed to capture slow query plan", fingerprint=fingerprint, error=str(e))
+        finally:
+            with self._pending_lock:
+                self._pending.discard(fingerprint)
+    
+    def capture_plan(self, sql: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Sorgunun planını bütçe içinde EXPLAIN ANALYZE ile, olmazsa tahmini olarak al
+        
+        Args:
+            sql: SQL sorgusu
+        
+        Returns:
+            (EXPLAIN çıktısının ilk elemanı, "analyze" veya "estimate")
+        """
+        try:
+            return self._explain(sql, "ANALYZE, BUFFERS, FORMAT JSON", self.analyze_budget_ms), "analyze"
+        except Exception as e:
+            error_msg = str(e).lower()
+            if 'timeout' not in error_msg and 'canceling statement' not in error_msg:
+                raise
+            logger.info("EXPLAIN ANALYZE exceeded budget, storing estimated plan")
+        return self._explain(sql, "FORMAT JSON"), "estimate"
+    
+    def _explain(self, sql: str, options: str, budget_ms: Optional[int] = None) -> Dict[str, Any]:
+        """EXPLAIN çalıştır ve JSON çıktısının ilk elemanını döndür"""
+        with self.db.get_cursor(dict_cursor=False) as cursor:
+            if budget_ms:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(budget_ms)};")
+            cursor.execute(f"EXPLAIN ({options}) {sql}")
+            document = cursor.fetchone()[0]
+        
+        if isinstance(document, str):
+            document = json.loads(document)
+        return document[0]
+    
+    def close(self, wait: bool = True):
+        """
+        Bekleyen plan yakalamalarını bitir ve kaynakları kapat
+        
+        Args:
+            wait: True ise kuyruktaki yakalamaların bitmesini bekle
+        """
+        self._worker.shutdown(wait=wait)
+        if self._owns_db:
+            self.db.disconnect()
+        self.store.close()
@@ -0,0 +1,332 @@
+"""Thread-safe PostgreSQL bağlantı havuzu"""
+
+import threading
+import time
+from typing import Dict, Any, List
+import psycopg2
+from psycopg2 import extensions
+from ..config import settings
+from ..utils.logger import logger
+
+
+class PoolTimeoutError(Exception):
+    """Havuzdan zamanında bağlantı alınamadığında fırlatılan hata"""
+    pass
+
+
+class PoolClosedError(Exception):
+    """Kapatılmış havuzdan bağlantı istendiğinde fırlatılan hata"""
+    pass
+
+
+class ConnectionPool:
+    """
+    Ömür, boşta kalma süresi ve sağlık kontrolü destekli bağlantı havuzu
+    
+    Boştaki bağlantılar son kullanılan önce verilecek şekilde (LIFO) tutulur;
+    böylece az kullanılan fazlalık bağlantılar boşta kalma süresini doldurup
+    kapanır ve havuz minimum boyuta geri iner.
+    """
+    
+    def __init__(
+        self,
+        connection_params: Dict[str, Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 3600.0,
+        idle_timeout: float = 600.0,
+        checkout_timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+    ):
+        """
+        Havuzu oluştur (bağlantılar open() veya ilk istekte açılır)
+        
+        Args:
+            connection_params: psycopg2.connect parametreleri
+            min_size: Açık tutulacak minimum bağlantı sayısı
+            max_size: Maksimum bağlantı sayısı
+            max_lifetime: Bir bağlantının saniye cinsinden maksimum ömrü
+            idle_timeout: Minimumun üstündeki bağlantıların boşta kalabileceği süre
+            checkout_timeout: Boş bağlantı için maksimum bekleme süresi
+            health_check_interval: Bu süreden uzun boşta kalan bağlantı verilmeden
+                önce "SELECT 1" ile kontrol edilir (0 ise her seferinde)
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Geçersiz havuz boyutu: min={min_size}, max={max_size}")
+        
+        self.connection_params = connection_params
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        
+        self._cond = threading.Condition()
+        # Boştaki bağlantılar: (bağlantı, son kullanım zamanı); sonda en yenisi
+        self._idle: List[tuple] = []
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._peak_in_use = 0
+    
+    @classmethod
+    def from_settings(cls, connection_params: Dict[str, Any]) -> "ConnectionPool":
+        """
+        Ayarlardaki havuz parametreleriyle havuz oluştur
+        
+        Args:
+            connection_params: psycopg2.connect parametreleri
+        
+        Returns:
+            ConnectionPool instance
+        """
+        return cls(
+            connection_params,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_lifetime=settings.db_pool_max_lifetime,
+            idle_timeout=settings.db_pool_idle_timeout,
+            checkout_timeout=settings.db_pool_checkout_timeout,
+        )
+    
+    def open(self):
+        """Havuzu minimum boyuta kadar doldur"""
+        with self._cond:
+            self._closed = False
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        
+        for _ in range(max(missing, 0)):
+            try:
+                conn = self._create()
+            except psycopg2.Error:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+        
+        logger.info("Connection pool opened", min_size=self.min_size, max_size=self.max_size)
+    
+    def getconn(self) -> extensions.connection:
+        """
+        Havuzdan bir bağlantı al
+        
+        Returns:
+            Sağlıklı bir PostgreSQL bağlantısı
+        
+        Raises:
+            PoolTimeoutError: checkout_timeout içinde bağlantı bulunamazsa
+            PoolClosedError: Havuz kapatılmışsa
+        """
+        started = time.monotonic()
+        
+        while True:
+            conn, idle_since = self._acquire(started)
+            
+            if conn is None:
+                # Boş yer ayrıldı; bağlantı kilit dışında açılır
+                try:
+                    conn = self._create()
+                except psycopg2.Error:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, time.monotonic() - idle_since):
+                self._discard(conn, in_use=True)
+                continue
+            
+            self._record_wait(time.monotonic() - started)
+            return conn
+    
+    def putconn(self, conn: extensions.connection, discard: bool = False):
+        """
+        Bağlantıyı havuza geri ver
+        
+        Args:
+            conn: Havuzdan alınmış bağlantı
+            discard: True ise bağlantı kapatılıp havuzdan çıkarılır
+        """
+        if not discard and not conn.closed:
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+        
+        now = time.monotonic()
+        expired = now - self._created_at.get(id(conn), now) >= self.max_lifetime
+        
+        with self._cond:
+            if discard or expired or conn.closed or self._closed:
+                self._in_use -= 1
+                self._size -= 1
+                self._discarded += 1
+                self._created_at.pop(id(conn), None)
+                close = True
+            else:
+                self._in_use -= 1
+                self._idle.append((conn, now))
+                close = False
+            self._cond.notify()
+        
+        if close:
+            self._close_quietly(conn)
+    
+    def close(self):
+        """Havuzu kapat; boştaki bağlantılar hemen, kullanımdakiler iade edilince kapanır"""
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            for conn, _ in idle:
+                self._created_at.pop(id(conn), None)
+            self._cond.notify_all()
+        
+        for conn, _ in idle:
+            self._close_quietly(conn)
+        logger.info("Connection pool closed")
+    
+    @property
+    def closed(self) -> bool:
+        """Havuz kapatılmış mı"""
+        return self._closed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Havuz kullanım istatistiklerini getir
+        
+        Returns:
+            Boyut, kullanım oranı ve bekleme süresi bilgileri
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "utilization": self._in_use / self.max_size,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_time_total": self._wait_total,
+                "wait_time_max": self._wait_max,
+                "wait_time_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+    
+    def _acquire(self, started: float) -> tuple:
+        """
+        Boştaki bir bağlantıyı veya yeni bağlantı için yer ayır
+        
+        Returns:
+            (bağlantı, boşta kalmaya başladığı an); yeni bağlantı açılacaksa (None, 0)
+        """
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Bağlantı havuzu kapatılmış")
+                    
+                    now = time.monotonic()
+                    while self._idle:
+                        conn, idle_since = self._idle.pop()
+                        if self._is_expired(conn, idle_since, now):
+                            self._size -= 1
+                            self._discarded += 1
+                            self._created_at.pop(id(conn), None)
+                            expired.append(conn)
+                            continue
+                        self._in_use += 1
+                        return conn, idle_since
+                    
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        return None, 0.0
+                    
+                    remaining = self.checkout_timeout - (now - started)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"{self.checkout_timeout} saniye içinde boş bağlantı bulunamadı "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            for conn in expired:
+                self._close_quietly(conn)
+    
+    def _is_expired(self, conn: extensions.connection, idle_since: float, now: float) -> bool:
+        """Bağlantının ömrü veya boşta kalma süresi dolmuş mu (kilit altında çağrılır)"""
+        if conn.closed:
+            return True
+        if now - self._created_at.get(id(conn), now) >= self.max_lifetime:
+            return True
+        # Minimum boyutun altına inmemek için sadece fazlalık bağlantılar kapanır
+        return self._size > self.min_size and now - idle_since >= self.idle_timeout
+    
+    def _is_healthy(self, conn: extensions.connection, idle_for: float) -> bool:
+        """Bağlantıyı kullanıcıya vermeden önce kontrol et"""
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning("Pooled connection failed health check", error=str(e))
+            return False
+    
+    def _discard(self, conn: extensions.connection, in_use: bool = False):
+        """Bağlantıyı kapatıp havuzdan çıkar"""
+        with self._cond:
+            self._size -= 1
+            if in_use:
+                self._in_use -= 1
+            self._discarded += 1
+            self._created_at.pop(id(conn), None)
+            self._cond.notify()
+        self._close_quietly(conn)
+    
+    def _create(self) -> extensions.connection:
+        """Yeni bir fiziksel bağlantı aç"""
+        conn = psycopg2.connect(**self.connection_params)
+        self._created_at[id(conn)] = time.monotonic()
+        logger.debug("Pooled connection created")
+        return conn
+    
+    def _record_wait(self, waited: float):
+        """Bekleme süresi istatistiklerini güncelle"""
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+    
+    @staticmethod
+    def _close_quietly(conn: extensions.connection):
+        """Bağlantıyı hata fırlatmadan kapat"""
+        try:
+            conn.close()
+        except Exception:
+            pass
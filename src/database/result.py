@@ -0,0 +1,261 @@
+"""Kolon bazlı (columnar) sorgu sonucu"""
+
+import datetime
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Any, Callable, Optional, Iterator, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy opsiyonel
+    np = None
+
+
+# NumPy dizisine çevrilebilecek Python tipleri -> dtype
+NUMPY_DTYPES = {
+    bool: "bool",
+    int: "int64",
+    float: "float64",
+    datetime.date: "datetime64[D]",
+    datetime.datetime: "datetime64[us]",
+}
+
+
+def to_column_array(values: List[Any]) -> Any:
+    """
+    Bir kolonun değerlerini mümkünse NumPy dizisine çevir
+    
+    Sadece tüm değerler aynı tipte ve NULL içermiyorsa çevrilir; timezone'lu
+    zamanlar, Decimal ve metinler Python listesi olarak kalır.
+    
+    Args:
+        values: Kolon değerleri
+    
+    Returns:
+        NumPy dizisi veya liste
+    """
+    if np is None or not values:
+        return values
+    
+    value_type = type(values[0])
+    dtype = NUMPY_DTYPES.get(value_type)
+    if dtype is None or any(type(v) is not value_type for v in values):
+        return values
+    if value_type is datetime.datetime and values[0].tzinfo is not None:
+        return values
+    
+    try:
+        return np.array(values, dtype=dtype)
+    except (OverflowError, ValueError, TypeError):
+        return values
+
+
+class RowView(Mapping):
+    """QueryResult içindeki bir satırın dict benzeri, kopyasız görünümü"""
+    
+    __slots__ = ("_result", "_row")
+    
+    def __init__(self, result: "QueryResult", row: int):
+        self._result = result
+        self._row = row
+    
+    def __getitem__(self, column: str) -> Any:
+        return self._result.value(self._result.column_index[column], self._row)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.column_index)
+    
+    def __len__(self) -> int:
+        return len(self._result.column_index)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class QueryResult(Sequence):
+    """
+    Sorgu sonucunu kolon dizileri olarak tutan sonuç nesnesi
+    
+    Kolon adları bir kez saklanır, değerler kolon başına bir dizide tutulur.
+    Geriye uyumluluk için satırlar dict gibi davranan RowView olarak okunur;
+    dict listesiyle karşılaştırılabilir.
+    """
+    
+    def __init__(
+        self,
+        columns: List[str],
+        data: List[Any],
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Sonucu oluştur
+        
+        Args:
+            columns: Kolon adları
+            data: Kolon başına değer dizisi (NumPy dizisi veya liste)
+            metadata: Çalıştırma bilgileri (önbellek durumu vb.)
+        """
+        self.columns = list(columns)
+        self._data = data
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self.column_index: Dict[str, int] = {name: i for i, name in enumerate(self.columns)}
+        self._length = len(data[0]) if data else 0
+    
+    def with_metadata(self, **metadata: Any) -> "QueryResult":
+        """
+        Aynı kolon dizilerini paylaşan, metadata'sı güncellenmiş kopya döndür
+        
+        Args:
+            **metadata: Eklenecek metadata alanları
+        
+        Returns:
+            Yeni QueryResult instance
+        """
+        return QueryResult(self.columns, self._data, {**self.metadata, **metadata})
+    
+    def without_metadata(self, *keys: str) -> "QueryResult":
+        """
+        Aynı kolon dizilerini paylaşan, verilen metadata alanları çıkarılmış kopya döndür
+        
+        Args:
+            *keys: Çıkarılacak metadata alanları
+        
+        Returns:
+            Yeni QueryResult instance
+        """
+        metadata = {key: value for key, value in self.metadata.items() if key not in keys}
+        return QueryResult(self.columns, self._data, metadata)
+    
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: Iterable[tuple]) -> "QueryResult":
+        """
+        Tuple satırlardan kolon bazlı sonuç oluştur
+        
+        Args:
+            columns: Kolon adları
+            rows: Satırlar (kolon sırasıyla tuple)
+        
+        Returns:
+            QueryResult instance
+        """
+        transposed = list(zip(*rows))
+        if not transposed:
+            return cls(columns, [[] for _ in columns])
+        return cls(columns, [to_column_array(list(values)) for values in transposed])
+    
+    @classmethod
+    def from_dicts(cls, rows: List[Dict[str, Any]]) -> "QueryResult":
+        """
+        Dict satır listesinden kolon bazlı sonuç oluştur
+        
+        Args:
+            rows: Dict satırlar
+        
+        Returns:
+            QueryResult instance
+        """
+        if not rows:
+            return cls([], [])
+        columns = list(rows[0].keys())
+        return cls.from_rows(columns, (tuple(row.values()) for row in rows))
+    
+    def value(self, column: int, row: int) -> Any:
+        """
+        Tek bir hücrenin değerini Python tipinde getir
+        
+        Args:
+            column: Kolon sırası
+            row: Satır sırası
+        
+        Returns:
+            Hücre değeri
+        """
+        value = self._data[column][row]
+        if np is not None and isinstance(value, np.generic):
+            return value.item()
+        return value
+    
+    def column(self, name: str) -> Any:
+        """
+        Bir kolonun tüm değerlerini getir
+        
+        Args:
+            name: Kolon adı
+        
+        Returns:
+            NumPy dizisi veya liste
+        """
+        return self._data[self.column_index[name]]
+    
+    def rows(self) -> Iterator[tuple]:
+        """
+        Satırları dict oluşturmadan tuple olarak gez
+        
+        Yields:
+            Kolon sırasıyla satır değerleri
+        """
+        columns = [
+            column.tolist() if np is not None and isinstance(column, np.ndarray) else column
+            for column in self._data
+        ]
+        return zip(*columns)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Sonucu dict listesine çevir
+        
+        Returns:
+            Dict satırlar
+        """
+        return [dict(zip(self.columns, row)) for row in self.rows()]
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, i) for i in range(self._length))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return QueryResult(self.columns, [column[index] for column in self._data])
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("QueryResult index out of range")
+        return RowView(self, index)
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, QueryResult):
+            return self.columns == other.columns and self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"QueryResult(columns={self.columns!r}, rows={self._length})"
+
+
+class ResultStream(Iterator):
+    """
+    Akıtılan sorgu sonucu; generator gibi tüketilir ve kapatılır
+    
+    Sonuç satır sınırına takıldıysa son satır okunduktan sonra truncated
+    True olur (tüketim bitmeden değeri kesin değildir).
+    """
+    
+    def __init__(self, produce: Callable[["ResultStream"], Iterator[Any]]):
+        """
+        Akışı oluştur
+        
+        Args:
+            produce: Bu akışı alıp öğeleri üreten generator fonksiyonu;
+                sınıra takılınca akışın truncated alanını işaretler
+        """
+        self.truncated = False
+        self._iterator = produce(self)
+    
+    def __next__(self) -> Any:
+        return next(self._iterator)
+    
+    def close(self):
+        """Akışı erken bırak (cursor kapanır, işlem geri alınır)"""
+        self._iterator.close()
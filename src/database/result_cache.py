@@ -0,0 +1,267 @@
+"""Çalıştırılan SQL sonuçları için TTL ve LRU destekli önbellek"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterable, Set, NamedTuple
+from ..config import settings
+from ..utils.logger import logger
+
+
+def normalize_table_name(name: str) -> str:
+    """
+    Tablo adını önbellek anahtarı için normalleştir ("Public"."Orders" -> orders)
+    
+    Args:
+        name: Tablo adı (schema ile nitelikli olabilir)
+    
+    Returns:
+        Küçük harfli, schema'sız tablo adı
+    """
+    return name.rsplit(".", 1)[-1].strip('`"[]').lower()
+
+
+class CacheEntry(NamedTuple):
+    """Önbellekteki bir sorgu sonucu"""
+    
+    result: Any
+    expires_at: float
+    tables: frozenset
+
+
+class ResultCache:
+    """
+    Normalleştirilmiş SQL metnine göre sonuç önbelleği
+    
+    Boyut sınırı aşılınca en uzun süredir kullanılmayan girdi atılır; her girdi
+    TTL sonunda geçersiz olur. Bir tablo değiştiğinde o tabloyu okuyan tüm
+    girdiler invalidate_tables ile silinir.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        """
+        Önbelleği oluştur
+        
+        Args:
+            max_entries: Maksimum girdi sayısı
+            ttl: Girdi ömrü (saniye)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._by_table: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Her geçersiz kılmada artar; çalışırken tablosu değişen sorgunun
+        # sonucu önbelleğe yazılmaz
+        self._generation = 0
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+    
+    @classmethod
+    def from_settings(cls) -> "ResultCache":
+        """
+        Ayarlardaki boyut ve TTL ile önbellek oluştur
+        
+        Returns:
+            ResultCache instance
+        """
+        return cls(
+            max_entries=settings.result_cache_max_entries,
+            ttl=settings.result_cache_ttl,
+        )
+    
+    def get(self, sql: str) -> Optional[Any]:
+        """
+        SQL için önbellekteki sonucu getir
+        
+        Args:
+            sql: sanitize_sql ile normalleştirilmiş SQL
+        
+        Returns:
+            Önbellekteki sonuç (yoksa veya süresi dolmuşsa None)
+        """
+        with self._lock:
+            entry = self._entries.get(sql)
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            if entry.expires_at <= time.monotonic():
+                self._remove(sql)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            
+            self._entries.move_to_end(sql)
+            self._hits += 1
+            return entry.result
+    
+    @property
+    def generation(self) -> int:
+        """Geçersiz kılma sayacı (sorgu başlamadan önce okunup put'a verilir)"""
+        return self._generation
+    
+    def put(
+        self,
+        sql: str,
+        result: Any,
+        tables: Iterable[str],
+        generation: Optional[int] = None,
+    ):
+        """
+        Sonucu önbelleğe koy
+        
+        Args:
+            sql: sanitize_sql ile normalleştirilmiş SQL
+            result: Sorgu sonucu
+            tables: Sorgunun okuduğu tablolar (geçersiz kılma için)
+            generation: Sorgu başlarken okunan generation; o zamandan beri
+                geçersiz kılma olduysa sonuç önbelleğe yazılmaz
+        """
+        table_names = frozenset(normalize_table_name(t) for t in tables)
+        
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            
+            if sql in self._entries:
+                self._remove(sql)
+            
+            self._entries[sql] = CacheEntry(result, time.monotonic() + self.ttl, table_names)
+            for table in table_names:
+                self._by_table.setdefault(table, set()).add(sql)
+            
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+    
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Verilen tabloları okuyan tüm girdileri sil
+        
+        Args:
+            tables: Değişen tablo adları
+        
+        Returns:
+            Silinen girdi sayısı
+        """
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for table in {normalize_table_name(t) for t in tables}:
+                for sql in list(self._by_table.get(table, ())):
+                    self._remove(sql)
+                    removed += 1
+            self._invalidations += removed
+        
+        if removed:
+            logger.info("Result cache invalidated", tables=sorted(tables), entries=removed)
+        return removed
+    
+    def clear(self):
+        """Tüm girdileri sil"""
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Önbellek istatistiklerini getir
+        
+        Returns:
+            İsabet, ıska ve silinme sayıları
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+    
+    def _remove(self, sql: str):
+        """Girdiyi ve tablo indeksindeki referanslarını sil (kilit altında çağrılır)"""
+        entry = self._entries.pop(sql)
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(sql)
+                if not keys:
+                    del self._by_table[table]
+
+
+class TableChangeTracker:
+    """
+    pg_stat_user_tables değişiklik sayaçlarıyla değişen tabloları bulan yardımcı
+    
+    Sayaçlar istatistik toplayıcısı tarafından gecikmeli güncellendiği için
+    TTL'nin yerine değil, ona ek olarak kullanılır.
+    """
+    
+    QUERY = """
+        SELECT relname AS table_name,
+               n_tup_ins + n_tup_upd + n_tup_del AS changes
+        FROM pg_stat_user_tables
+    """
+    
+    def __init__(self, db_connection, interval: float = 5.0):
+        """
+        Tracker'ı oluştur
+        
+        Args:
+            db_connection: Veritabanı bağlantısı
+            interval: İki sayaç okuması arasındaki minimum süre (saniye)
+        """
+        self.db = db_connection
+        self.interval = interval
+        self._counters: Optional[Dict[str, int]] = None
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+    
+    def poll(self) -> Set[str]:
+        """
+        Son okumadan beri sayacı değişen tabloları getir
+        
+        interval dolmadıysa veritabanına gitmeden boş küme döner. İlk okuma
+        sadece referans değerleri kaydeder.
+        
+        Returns:
+            Değişen tablo adları
+        """
+        now = time.monotonic()
+        if not self._lock.acquire(blocking=False):
+            return set()
+        try:
+            if self._counters is not None and now - self._last_poll < self.interval:
+                return set()
+            self._last_poll = now
+            
+            try:
+                with self.db.get_cursor() as cursor:
+                    cursor.execute(self.QUERY)
+                    counters = {row['table_name']: row['changes'] for row in cursor.fetchall()}
+            except Exception as e:
+                logger.warning("Failed to read table change counters", error=str(e))
+                return set()
+            
+            previous = self._counters
+            self._counters = counters
+            if previous is None:
+                return set()
+            
+            return {
+                table for table, changes in counters.items()
+                if previous.get(table) != changes
+            } | (set(previous) - set(counters))
+        finally:
+            self._lock.release()
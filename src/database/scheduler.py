@@ -0,0 +1,312 @@
+"""Öncelik sınıfları ve kullanıcı kotalarıyla sorgu zamanlayıcı"""
+
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Optional, Callable, List, Iterator, AsyncIterator
+from ..config import settings
+from ..utils.logger import logger
+
+
+# Küçük değer önce çalışır
+PRIORITY_CLASSES = {"interactive": 0, "batch": 1}
+
+DEFAULT_USER = "anonymous"
+
+
+class QueueFullError(Exception):
+    """Kullanıcının bekleyen sorgu kotası dolduğunda fırlatılan hata"""
+    pass
+
+
+class QueueTimeoutError(Exception):
+    """Sorgu sırası zamanında gelmediğinde fırlatılan hata"""
+    pass
+
+
+class _Waiter:
+    """Sırada bekleyen bir sorgu isteği"""
+    
+    __slots__ = ("user", "priority", "seq", "enqueued_at", "granted", "wake")
+    
+    def __init__(self, user: str, priority: str, seq: int, wake: Callable[[], None]):
+        self.user = user
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.wake = wake
+
+
+class QueryScheduler:
+    """
+    Veritabanına aynı anda giden sorguları sınırlayan adil zamanlayıcı
+    
+    Boş yer açıldığında bekleyenler arasından önce öncelik sınıfına
+    (interactive, batch), sonra o an en az sorgusu çalışan kullanıcıya, son olarak
+    geliş sırasına göre seçim yapılır. Böylece aynı anda çok soru gönderen bir
+    kullanıcı diğerlerini aç bırakmaz. Thread'lerden slot(), asyncio'dan
+    aslot() ile kullanılır; ikisi aynı kotaları paylaşır.
+    """
+    
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        per_user_concurrency: int = 2,
+        per_user_queue_depth: int = 10,
+        batch_max_concurrent: Optional[int] = None,
+        queue_timeout: float = 60.0,
+    ):
+        """
+        Zamanlayıcıyı oluştur
+        
+        Args:
+            max_concurrent: Aynı anda çalışabilecek toplam sorgu sayısı
+                (bağlantı havuzunun maksimum boyutunu aşmamalı)
+            per_user_concurrency: Bir kullanıcının aynı anda çalışan sorgu sınırı
+            per_user_queue_depth: Bir kullanıcının sırada bekleyebilecek sorgu sınırı
+            batch_max_concurrent: Batch sınıfının aynı anda kullanabileceği yer
+                (None ise toplamın yarısı; interaktif sorgulara yer kalır)
+            queue_timeout: Sırada maksimum bekleme süresi (saniye)
+        """
+        if max_concurrent < 1 or per_user_concurrency < 1:
+            raise ValueError(
+                f"Geçersiz eşzamanlılık: toplam={max_concurrent}, kullanıcı={per_user_concurrency}"
+            )
+        
+        self.max_concurrent = max_concurrent
+        self.per_user_concurrency = per_user_concurrency
+        self.per_user_queue_depth = per_user_queue_depth
+        self.batch_max_concurrent = (
+            batch_max_concurrent if batch_max_concurrent is not None
+            else max(1, max_concurrent // 2)
+        )
+        self.queue_timeout = queue_timeout
+        
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._running_by_user: Dict[str, int] = {}
+        self._running_by_class: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+        self._queued_by_user: Dict[str, int] = {}
+        
+        self._granted = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+    
+    @classmethod
+    def from_settings(cls) -> "QueryScheduler":
+        """
+        Ayarlardaki kotalarla zamanlayıcı oluştur
+        
+        Returns:
+            QueryScheduler instance
+        """
+        return cls(
+            max_concurrent=settings.scheduler_max_concurrent,
+            per_user_concurrency=settings.scheduler_user_concurrency,
+            per_user_queue_depth=settings.scheduler_user_queue_depth,
+            batch_max_concurrent=settings.scheduler_batch_max_concurrent or None,
+            queue_timeout=settings.scheduler_queue_timeout,
+        )
+    
+    @contextmanager
+    def slot(self, user: Optional[str] = None, priority: str = "interactive") -> Iterator[float]:
+        """
+        Sorgu için sıra bekle ve çalışma yeri al (thread'ler için)
+        
+        Args:
+            user: Kullanıcı veya tenant kimliği (None ise ortak anonim kullanıcı)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
+        
+        Yields:
+            Sırada beklenen süre (saniye)
+        
+        Raises:
+            QueueFullError: Kullanıcının bekleme kotası doluysa
+            QueueTimeoutError: queue_timeout içinde sıra gelmezse
+        """
+        event = threading.Event()
+        waiter = self._enqueue(user, priority, event.set)
+        
+        try:
+            granted = event.wait(self.queue_timeout)
+        except BaseException:
+            self._cancel(waiter)
+            raise
+        if not granted:
+            self._abandon(waiter)
+        
+        wait = self._granted_wait(waiter)
+        try:
+            yield wait
+        finally:
+            self._release(waiter)
+    
+    @asynccontextmanager
+    async def aslot(self, user: Optional[str] = None, priority: str = "interactive") -> AsyncIterator[float]:
+        """
+        Sorgu için sıra bekle ve çalışma yeri al (asyncio)
+        
+        Args:
+            user: Kullanıcı veya tenant kimliği (None ise ortak anonim kullanıcı)
+            priority: Öncelik sınıfı ("interactive" veya "batch")
+        
+        Yields:
+            Sırada beklenen süre (saniye)
+        
+        Raises:
+            QueueFullError: Kullanıcının bekleme kotası doluysa
+            QueueTimeoutError: queue_timeout içinde sıra gelmezse
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        
+        waiter = self._enqueue(user, priority, wake)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+        
+        wait = self._granted_wait(waiter)
+        try:
+            yield wait
+        finally:
+            self._release(waiter)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Zamanlayıcı istatistiklerini getir
+        
+        Returns:
+            Çalışan/bekleyen sorgu sayıları ve bekleme süresi bilgileri
+        """
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "running_by_class": dict(self._running_by_class),
+                "running_by_user": dict(self._running_by_user),
+                "queued_by_user": dict(self._queued_by_user),
+                "granted": self._granted,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "wait_time_total": self._wait_total,
+                "wait_time_max": self._wait_max,
+                "wait_time_avg": self._wait_total / self._granted if self._granted else 0.0,
+            }
+    
+    def _enqueue(self, user: Optional[str], priority: str, wake: Callable[[], None]) -> _Waiter:
+        """İsteği sıraya ekle ve uygun yer varsa hemen ver"""
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Geçersiz öncelik sınıfı: {priority}")
+        user = user or DEFAULT_USER
+        
+        with self._lock:
+            if self._queued_by_user.get(user, 0) >= self.per_user_queue_depth:
+                self._rejected += 1
+                logger.warning("Query queue full", user=user, depth=self.per_user_queue_depth)
+                raise QueueFullError(
+                    f"Çok fazla bekleyen sorgunuz var (en fazla {self.per_user_queue_depth}). "
+                    "Lütfen öncekilerin bitmesini bekleyin."
+                )
+            
+            waiter = _Waiter(user, priority, next(self._seq), wake)
+            self._waiters.append(waiter)
+            self._queued_by_user[user] = self._queued_by_user.get(user, 0) + 1
+            self._dispatch()
+        return waiter
+    
+    def _abandon(self, waiter: _Waiter):
+        """Süresi dolan isteği sıradan çıkar (bu arada yer verildiyse devam et)"""
+        with self._lock:
+            if waiter.granted:
+                return
+            self._remove_waiter(waiter)
+            self._timeouts += 1
+        
+        logger.warning("Query queue timeout", user=waiter.user, timeout=self.queue_timeout)
+        raise QueueTimeoutError(
+            f"Sorgu {self.queue_timeout:.0f} saniye içinde sıraya giremedi; sistem yoğun."
+        )
+    
+    def _cancel(self, waiter: _Waiter):
+        """Vazgeçilen isteği sıradan çıkar; bu arada yer verildiyse geri bırak"""
+        with self._lock:
+            granted = waiter.granted
+            if not granted:
+                self._remove_waiter(waiter)
+        if granted:
+            self._release(waiter)
+    
+    def _granted_wait(self, waiter: _Waiter) -> float:
+        """Verilen yer için bekleme süresini hesapla ve istatistiğe ekle"""
+        wait = time.monotonic() - waiter.enqueued_at
+        with self._lock:
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return wait
+    
+    def _release(self, waiter: _Waiter):
+        """Çalışma yerini bırak ve sıradaki isteklere dağıt"""
+        with self._lock:
+            self._running -= 1
+            self._running_by_class[waiter.priority] -= 1
+            remaining = self._running_by_user[waiter.user] - 1
+            if remaining:
+                self._running_by_user[waiter.user] = remaining
+            else:
+                del self._running_by_user[waiter.user]
+            self._dispatch()
+    
+    def _remove_waiter(self, waiter: _Waiter):
+        """Bekleyeni sıradan çıkar (kilit altında çağrılır)"""
+        self._waiters.remove(waiter)
+        remaining = self._queued_by_user[waiter.user] - 1
+        if remaining:
+            self._queued_by_user[waiter.user] = remaining
+        else:
+            del self._queued_by_user[waiter.user]
+    
+    def _eligible(self, waiter: _Waiter) -> bool:
+        """Bekleyenin kullanıcı ve sınıf kotası yer veriyor mu (kilit altında çağrılır)"""
+        if self._running_by_user.get(waiter.user, 0) >= self.per_user_concurrency:
+            return False
+        if waiter.priority == "batch" and self._running_by_class["batch"] >= self.batch_max_concurrent:
+            return False
+        return True
+    
+    def _dispatch(self):
+        """Boş yerleri en uygun bekleyenlere ver (kilit altında çağrılır)"""
+        while self._running < self.max_concurrent:
+            candidates = [w for w in self._waiters if self._eligible(w)]
+            if not candidates:
+                return
+            
+            waiter = min(
+                candidates,
+                key=lambda w: (
+                    PRIORITY_CLASSES[w.priority],
+                    self._running_by_user.get(w.user, 0),
+                    w.seq,
+                ),
+            )
+            self._remove_waiter(waiter)
+            waiter.granted = True
+            self._running += 1
+            self._running_by_class[waiter.priority] += 1
+            self._running_by_user[waiter.user] = self._running_by_user.get(waiter.user, 0) + 1
+            self._granted += 1
+            waiter.wake()
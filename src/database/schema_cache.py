@@ -0,0 +1,121 @@
+"""Schema bilgisinin disk üzerinde kalıcı önbelleği"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+from ..config import settings
+from ..utils.logger import logger
+
+
+# Dosya formatı değiştiğinde artırılır; eski dosyalar yok sayılır
+CACHE_FORMAT_VERSION = 1
+
+
+class SchemaCache:
+    """
+    Schema ve LLM schema metnini katalog parmak izine göre diskte saklayan önbellek
+    
+    Her giriş, üretildiği andaki katalog parmak izi ile birlikte yazılır.
+    Parmak izi değişmediği sürece CLI'ın soğuk başlangıcında schema tek bir
+    sorgu ile doğrulanıp dosyadan okunur.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Schema cache'i başlat
+        
+        Args:
+            path: Önbellek dosyasının yolu
+        """
+        self.path = path
+        logger.info("SchemaCache initialized", path=path)
+    
+    @classmethod
+    def from_settings(cls) -> "SchemaCache":
+        """
+        Ayarlardaki dizinde, bağlanılan veritabanına özgü bir önbellek oluştur
+        
+        Returns:
+            SchemaCache instance
+        """
+        key = f"{settings.db_host}:{settings.db_port}/{settings.db_name}@{settings.db_user}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return cls(os.path.join(settings.schema_cache_dir, f"schema_{digest}.json"))
+    
+    def load(self, fingerprint: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Parmak izi eşleşiyorsa önbellek girişini oku
+        
+        Args:
+            fingerprint: Güncel katalog parmak izi
+            variant: Schema'nın üretildiği seçenekleri tanımlayan anahtar
+        
+        Returns:
+            {"schema": ..., "llm_text": ...} veya eşleşme yoksa None
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read schema cache", path=self.path, error=str(e))
+            return None
+        
+        if (
+            entry.get("version") != CACHE_FORMAT_VERSION
+            or entry.get("fingerprint") != fingerprint
+            or entry.get("variant") != variant
+        ):
+            logger.info("Schema cache is stale", path=self.path)
+            return None
+        
+        logger.info("Schema cache hit", path=self.path)
+        return entry
+    
+    def save(
+        self,
+        fingerprint: str,
+        schema: Dict[str, Any],
+        llm_text: Optional[str] = None,
+        variant: str = "",
+    ):
+        """
+        Schema'yı (ve varsa LLM metnini) atomik olarak diske yaz
+        
+        Args:
+            fingerprint: Schema'nın üretildiği andaki katalog parmak izi
+            schema: get_full_schema çıktısı
+            llm_text: get_schema_for_llm çıktısı
+            variant: Schema'nın üretildiği seçenekleri tanımlayan anahtar
+        """
+        entry = {
+            "version": CACHE_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "variant": variant,
+            "created_at": time.time(),
+            "schema": schema,
+            "llm_text": llm_text,
+        }
+        
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+            logger.info("Schema cache written", path=self.path)
+        except OSError as e:
+            logger.warning("Failed to write schema cache", path=self.path, error=str(e))
+    
+    def clear(self):
+        """Önbellek dosyasını sil"""
+        try:
+            os.remove(self.path)
+            logger.info("Schema cache file removed", path=self.path)
+        except FileNotFoundError:
+            pass
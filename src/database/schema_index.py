@@ -0,0 +1,124 @@
+"""Tablo ve kolonlar üzerinde yerel BM25 arama indeksi"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+
+# Türkçe eklerini kabaca atmak için kullanılan önek uzunluğu ("müşterimiz" -> "müşte")
+STEM_LENGTH = 5
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def turkish_casefold(text: str) -> str:
+    """
+    Türkçe kurallarına uygun küçük harfe çevir (I -> ı, İ -> i)
+    
+    Args:
+        text: Dönüştürülecek metin
+    
+    Returns:
+        Küçük harfli metin
+    """
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni arama terimlerine ayır
+    
+    Alt çizgili tanımlayıcılar parçalanır; her kelime hem kendisi hem de
+    STEM_LENGTH karakterlik öneki ile indekslenir.
+    
+    Args:
+        text: Tokenize edilecek metin
+    
+    Returns:
+        Terim listesi
+    """
+    terms = []
+    for word in _TOKEN_PATTERN.findall(turkish_casefold(text)):
+        for part in word.split("_"):
+            if len(part) < 2 or part.isdigit():
+                continue
+            terms.append(part)
+            if len(part) > STEM_LENGTH:
+                terms.append(part[:STEM_LENGTH])
+    return terms
+
+
+class SchemaIndex:
+    """Schema tabloları üzerinde BM25 sıralaması yapan lexical indeks"""
+    
+    def __init__(self, schema: Dict[str, Any], k1: float = 1.2, b: float = 0.75):
+        """
+        İndeksi schema bilgisinden oluştur
+        
+        Args:
+            schema: get_full_schema çıktısı
+            k1: BM25 terim frekansı doygunluk parametresi
+            b: BM25 doküman uzunluğu normalizasyonu
+        """
+        self.k1 = k1
+        self.b = b
+        self._term_freqs: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._postings: Dict[str, List[str]] = {}
+        
+        for table_name, table_info in schema.items():
+            terms = self._table_terms(table_name, table_info)
+            freqs = Counter(terms)
+            self._term_freqs[table_name] = freqs
+            self._doc_lengths[table_name] = len(terms)
+            for term in freqs:
+                self._postings.setdefault(term, []).append(table_name)
+        
+        doc_count = len(self._term_freqs)
+        self._avg_length = (sum(self._doc_lengths.values()) / doc_count) if doc_count else 0.0
+        self._idf = {
+            term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+    
+    @staticmethod
+    def _table_terms(table_name: str, table_info: Dict[str, Any]) -> List[str]:
+        """Bir tablonun indekslenecek terimlerini topla (tablo adı iki kat ağırlıklı)"""
+        terms = tokenize(table_name) * 2
+        if table_info.get("comment"):
+            terms += tokenize(table_info["comment"])
+        
+        for col in table_info.get("columns", []):
+            terms += tokenize(col["name"])
+            if col.get("comment"):
+                terms += tokenize(col["comment"])
+            for value in col.get("sample_values") or []:
+                terms += tokenize(str(value))
+        
+        return terms
+    
+    def search(self, question: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Soruya en uygun tabloları BM25 skoruna göre sırala
+        
+        Args:
+            question: Kullanıcının sorusu
+            top_k: Döndürülecek maksimum tablo sayısı
+        
+        Returns:
+            (tablo adı, skor) listesi; eşleşme yoksa boş liste
+        """
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(question)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for table_name in self._postings[term]:
+                freq = self._term_freqs[table_name][term]
+                length_norm = 1 - self.b + self.b * self._doc_lengths[table_name] / self._avg_length
+                score = idf * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+                scores[table_name] = scores.get(table_name, 0.0) + score
+        
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
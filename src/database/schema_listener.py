@@ -0,0 +1,210 @@
+"""LISTEN/NOTIFY ile DDL değişikliklerini izleyen arka plan dinleyicisi"""
+
+import json
+import select
+import threading
+import time
+from typing import Callable, Iterable, Optional, Set
+import psycopg2
+import psycopg2.extensions
+from .connection import DatabaseConnection
+from ..utils.logger import logger
+
+
+# DDL bildirimlerinin gönderildiği kanal
+SCHEMA_CHANGE_CHANNEL = "dbqa_schema_changes"
+
+# Değişen tabloyu bulup kanala bildiren event trigger fonksiyonu.
+# ddl_command_end: CREATE/ALTER/COMMENT (index ve constraint'ler tablosuna eşlenir)
+# sql_drop: silinen tablolar, kolonlar ve constraint'ler
+EVENT_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION dbqa_notify_schema_change() RETURNS event_trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+    rel oid;
+BEGIN
+    IF TG_EVENT = 'sql_drop' THEN
+        FOR r IN SELECT * FROM pg_event_trigger_dropped_objects() LOOP
+            IF r.object_type IN ('table', 'table column', 'table constraint') THEN
+                PERFORM pg_notify('{SCHEMA_CHANGE_CHANNEL}', json_build_object(
+                    'schema', r.address_names[1],
+                    'table', r.address_names[2]
+                )::text);
+            END IF;
+        END LOOP;
+    ELSE
+        FOR r IN SELECT * FROM pg_event_trigger_ddl_commands() LOOP
+            rel := NULL;
+            IF r.classid = 'pg_class'::regclass THEN
+                SELECT COALESCE(i.indrelid, c.oid) INTO rel
+                FROM pg_class c
+                LEFT JOIN pg_index i ON i.indexrelid = c.oid
+                WHERE c.oid = r.objid;
+            ELSIF r.classid = 'pg_constraint'::regclass THEN
+                SELECT NULLIF(conrelid, 0) INTO rel FROM pg_constraint WHERE oid = r.objid;
+            END IF;
+            IF rel IS NOT NULL THEN
+                PERFORM pg_notify('{SCHEMA_CHANGE_CHANNEL}', json_build_object(
+                    'schema', (SELECT n.nspname FROM pg_class c
+                               JOIN pg_namespace n ON n.oid = c.relnamespace
+                               WHERE c.oid = rel),
+                    'table', (SELECT relname FROM pg_class WHERE oid = rel)
+                )::text);
+            END IF;
+        END LOOP;
+    END IF;
+END;
+$$;
+
+DROP EVENT TRIGGER IF EXISTS dbqa_schema_change_end;
+CREATE EVENT TRIGGER dbqa_schema_change_end ON ddl_command_end
+    EXECUTE FUNCTION dbqa_notify_schema_change();
+
+DROP EVENT TRIGGER IF EXISTS dbqa_schema_change_drop;
+CREATE EVENT TRIGGER dbqa_schema_change_drop ON sql_drop
+    EXECUTE FUNCTION dbqa_notify_schema_change();
+"""
+
+
+class SchemaChangeListener:
+    """
+    DDL bildirimlerini arka planda dinleyip değişen tabloları bildiren sınıf
+    
+    Ayrı bir bağlantı üzerinde LISTEN yapılır; kısa bir bekleme penceresinde
+    biriken bildirimler tek bir çağrıda toplanarak on_change'e iletilir.
+    """
+    
+    def __init__(
+        self,
+        db_connection: DatabaseConnection,
+        on_change: Callable[[Set[str]], None],
+        schemas: Optional[Iterable[str]] = ("public",),
+        qualify_names: bool = False,
+        channel: str = SCHEMA_CHANGE_CHANNEL,
+        debounce: float = 1.0,
+        poll_interval: float = 5.0,
+    ):
+        """
+        Schema değişiklik dinleyicisini başlat
+        
+        Args:
+            db_connection: Bağlantı parametrelerinin alınacağı veritabanı bağlantısı
+            on_change: Değişen tablo anahtarlarıyla çağrılacak fonksiyon
+            schemas: İzlenecek PostgreSQL schema'ları (None ise tümü)
+            qualify_names: Tabloları "schema.tablo" anahtarıyla bildir
+            channel: LISTEN kanalı
+            debounce: Bildirimleri toplamak için beklenecek süre (saniye)
+            poll_interval: select() zaman aşımı (saniye)
+        """
+        self.db = db_connection
+        self.on_change = on_change
+        self.schemas = set(schemas) if schemas is not None else None
+        self.qualify_names = qualify_names
+        self.channel = channel
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        logger.info("SchemaChangeListener initialized", channel=channel)
+    
+    def install_trigger(self):
+        """
+        Event trigger'ı veritabanına kur
+        
+        Event trigger oluşturmak superuser yetkisi gerektirir.
+        """
+        with self.db.get_cursor() as cursor:
+            # Oturum varsayılan olarak salt okunur açılır; DDL için işlem yazılabilir olmalı
+            cursor.execute("SET TRANSACTION READ WRITE")
+            cursor.execute(EVENT_TRIGGER_SQL)
+        logger.info("Schema change event trigger installed", channel=self.channel)
+    
+    def start(self):
+        """Dinleyici thread'ini başlat"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="schema-change-listener",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Schema change listener started")
+    
+    def stop(self, timeout: float = 5.0):
+        """Dinleyici thread'ini durdur"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("Schema change listener stopped")
+    
+    def parse_payload(self, payload: str) -> Optional[str]:
+        """
+        Bildirim içeriğinden izlenen schema'lara ait tablo anahtarını çıkar
+        
+        Args:
+            payload: pg_notify ile gönderilen JSON metni
+        
+        Returns:
+            Tablo anahtarı (izlenmeyen schema'ya aitse veya okunamazsa None)
+        """
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            logger.warning("Invalid schema change payload", payload=payload)
+            return None
+        
+        schema_name, table_name = data.get("schema"), data.get("table")
+        if not table_name or (self.schemas is not None and schema_name not in self.schemas):
+            return None
+        return f"{schema_name}.{table_name}" if self.qualify_names else table_name
+    
+    def _run(self):
+        """Bağlantı koptuğunda yeniden bağlanarak bildirimleri dinle"""
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db.connection_params)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}";')
+                backoff = 1.0
+                self._listen(conn)
+            except Exception as e:
+                # psycopg2, select ve soket hataları dinleyiciyi sonlandırmamalı
+                logger.error(
+                    "Schema change listener failed",
+                    error=str(e), error_type=type(e).__name__,
+                )
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+    
+    def _listen(self, conn: psycopg2.extensions.connection):
+        """Bildirimleri topla ve bekleme penceresi dolunca on_change'i çağır"""
+        pending: Set[str] = set()
+        last_notify = 0.0
+        
+        while not self._stop_event.is_set():
+            timeout = self.debounce if pending else self.poll_interval
+            if select.select([conn], [], [], timeout)[0]:
+                conn.poll()
+                while conn.notifies:
+                    table = self.parse_payload(conn.notifies.pop(0).payload)
+                    if table:
+                        pending.add(table)
+                        last_notify = time.monotonic()
+            
+            if pending and time.monotonic() - last_notify >= self.debounce:
+                changed, pending = pending, set()
+                try:
+                    self.on_change(changed)
+                except Exception as e:
+                    logger.error("Schema change handler failed", error=str(e), tables=sorted(changed))
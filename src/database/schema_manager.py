@@ -1,23 +1,154 @@
 """Veritabanı schema analizi ve metadata yönetimi"""
 
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+from psycopg2 import sql
 from .connection import DatabaseConnection
+from .schema_cache import SchemaCache
+from .schema_index import SchemaIndex
+from .cost_model import CostModel
+from .join_graph import JoinGraph
+from .schema_renderer import SchemaRenderer, estimate_tokens
+from ..config import settings
 from ..utils.logger import logger
 
 
+# Örnek değer toplanmayacak (büyük veya LLM için anlamsız) kolon tipleri
+SAMPLE_SKIP_TYPES = {'bytea', 'json', 'jsonb', 'xml', 'tsvector', 'tsquery'}
+
+# pg_stats.avg_width bu değerin üstündeyse kolon "büyük metin" sayılır
+SAMPLE_MAX_AVG_WIDTH = 200
+
+# TABLESAMPLE ile okunacak hedef satır sayısı (tablo boyutundan bağımsız)
+SAMPLE_TARGET_ROWS = 1000
+
+
+def parse_schema_names(value: str) -> List[str]:
+    """
+    Virgülle ayrılmış schema listesini ayrıştır ("*" tüm schema'lar demektir)
+    
+    Args:
+        value: Örn. "public,sales" veya "*"
+    
+    Returns:
+        Schema adları listesi
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if '*' in names:
+        return ['*']
+    return names or ['public']
+
+
 class SchemaManager:
     """Veritabanı schema'sını analiz eden ve metadata sağlayan sınıf"""
     
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(
+        self,
+        db_connection: DatabaseConnection,
+        cache: Optional[SchemaCache] = None,
+        schemas: Optional[List[str]] = None,
+        qualify_names: Optional[bool] = None,
+    ):
         """
         Schema manager'ı başlat
         
         Args:
             db_connection: Veritabanı bağlantı nesnesi
+            cache: Disk üzerindeki kalıcı schema önbelleği (None ise kullanılmaz)
+            schemas: İncelenecek PostgreSQL schema'ları; ["*"] tüm kullanıcı
+                schema'ları demektir (None ise ayarlardaki DB_SCHEMAS kullanılır)
+            qualify_names: Tablo adlarını "schema.tablo" olarak anahtarla
+                (None ise birden fazla schema varsa otomatik açılır)
         """
         self.db = db_connection
+        self.cache = cache
+        self.schemas = list(schemas) if schemas else parse_schema_names(settings.db_schemas)
+        self.all_schemas = self.schemas == ['*']
+        self.schema_name: Optional[str] = None if self.all_schemas else self.schemas[0]
+        self.qualify_names = (
+            qualify_names if qualify_names is not None
+            else self.all_schemas or len(self.schemas) > 1
+        )
         self._schema_cache: Optional[Dict[str, Any]] = None
-        logger.info("SchemaManager initialized")
+        self._llm_text_cache: Optional[str] = None
+        self._renderer = SchemaRenderer()
+        self._schema_index: Optional[SchemaIndex] = None
+        self._join_graph: Optional[JoinGraph] = None
+        self._cost_model: Optional[CostModel] = None
+        self._fingerprint: Optional[str] = None
+        self._schema_variant: Optional[str] = None
+        self._schema_options: tuple = (True, False)
+        self._refresh_lock = threading.Lock()
+        logger.info("SchemaManager initialized", persistent_cache=cache is not None)
+    
+    def table_key(self, schema_name: str, table_name: str) -> str:
+        """
+        Schema sözlüğünde kullanılan tablo anahtarını oluştur
+        
+        Args:
+            schema_name: PostgreSQL schema adı
+            table_name: Tablo adı
+        
+        Returns:
+            "schema.tablo" (nitelikli modda) veya sadece tablo adı
+        """
+        return f"{schema_name}.{table_name}" if self.qualify_names else table_name
+    
+    def split_key(self, key: str) -> tuple:
+        """
+        Tablo anahtarını (schema, tablo) çiftine ayır
+        
+        Args:
+            key: table_key ile üretilmiş anahtar
+        
+        Returns:
+            (schema adı, tablo adı) tuple'ı
+        """
+        if self.qualify_names and '.' in key:
+            schema_name, table_name = key.split('.', 1)
+            return schema_name, table_name
+        return self.schema_name, key
+    
+    def resolve_schema_names(self) -> List[str]:
+        """
+        İncelenecek schema adlarını getir ("*" ise sistem dışı tüm schema'lar)
+        
+        Returns:
+            Schema adları listesi
+        """
+        if not self.all_schemas:
+            return list(self.schemas)
+        
+        query = """
+            SELECT nspname
+            FROM pg_namespace
+            WHERE nspname NOT IN ('pg_catalog', 'information_schema')
+            AND nspname NOT LIKE 'pg\\_%'
+            ORDER BY nspname;
+        """
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query)
+            return [row['nspname'] for row in cursor.fetchall()]
+    
+    def _schema_filter(self, column: str) -> tuple:
+        """
+        Yapılandırılan schema'lar için SQL filtresi oluştur
+        
+        Args:
+            column: Schema adını içeren SQL ifadesi
+        
+        Returns:
+            (SQL parçası, parametreler) tuple'ı
+        """
+        if self.all_schemas:
+            return (
+                f"{column} NOT IN ('pg_catalog', 'information_schema') "
+                f"AND {column} NOT LIKE 'pg\\_%%'",
+                (),
+            )
+        return f"{column} = ANY(%s)", (list(self.schemas),)
     
     def get_all_tables(self) -> List[str]:
         """
@@ -29,13 +160,13 @@ class SchemaManager:
         query = """
             SELECT table_name 
             FROM information_schema.tables 
-            WHERE table_schema = 'public' 
+            WHERE table_schema = %s 
             AND table_type = 'BASE TABLE'
             ORDER BY table_name;
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query)
+            cursor.execute(query, (self.schema_name,))
             results = cursor.fetchall()
             tables = [row['table_name'] for row in results]
             logger.info("Retrieved tables", count=len(tables), tables=tables)
@@ -61,13 +192,13 @@ class SchemaManager:
                 numeric_precision,
                 numeric_scale
             FROM information_schema.columns
-            WHERE table_schema = 'public' 
+            WHERE table_schema = %s 
             AND table_name = %s
             ORDER BY ordinal_position;
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query, (table_name,))
+            cursor.execute(query, (self.schema_name, table_name))
             columns = cursor.fetchall()
             logger.info("Retrieved columns", table=table_name, count=len(columns))
             return [dict(col) for col in columns]
@@ -85,11 +216,12 @@ class SchemaManager:
         query = """
             SELECT obj_description(oid) as comment
             FROM pg_class
-            WHERE relname = %s AND relnamespace = 'public'::regnamespace;
+            WHERE relname = %s
+            AND relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = %s);
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query, (table_name,))
+            cursor.execute(query, (table_name, self.schema_name))
             result = cursor.fetchone()
             return result['comment'] if result and result['comment'] else None
     
@@ -110,13 +242,14 @@ class SchemaManager:
             FROM pg_attribute a
             JOIN pg_class c ON a.attrelid = c.oid
             WHERE c.relname = %s 
+            AND c.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = %s)
             AND a.attnum > 0 
             AND NOT a.attisdropped
             AND col_description(a.attrelid, a.attnum) IS NOT NULL;
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query, (table_name,))
+            cursor.execute(query, (table_name, self.schema_name))
             results = cursor.fetchall()
             return {row['column_name']: row['comment'] for row in results}
     
@@ -143,11 +276,12 @@ class SchemaManager:
                 ON ccu.constraint_name = tc.constraint_name
                 AND ccu.table_schema = tc.table_schema
             WHERE tc.constraint_type = 'FOREIGN KEY'
+            AND tc.table_schema = %s
             AND tc.table_name = %s;
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query, (table_name,))
+            cursor.execute(query, (self.schema_name, table_name))
             results = cursor.fetchall()
             return [dict(row) for row in results]
     
@@ -165,22 +299,68 @@ class SchemaManager:
             SELECT a.attname
             FROM pg_index i
             JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
-            WHERE i.indrelid = %s::regclass AND i.indisprimary;
+            WHERE i.indrelid = (quote_ident(%s) || '.' || quote_ident(%s))::regclass
+            AND i.indisprimary;
         """
         
         with self.db.get_cursor() as cursor:
-            cursor.execute(query, (table_name,))
+            cursor.execute(query, (self.schema_name, table_name))
             result = cursor.fetchone()
             return result['attname'] if result else None
     
-    def get_sample_values(self, table_name: str, column_name: str, limit: int = 5) -> List[Any]:
+    def get_indexes(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Tablonun index'lerini getir (maliyet tahmini için)
+        
+        Args:
+            table_name: Tablo adı
+        
+        Returns:
+            Index bilgileri listesi (ad, sıralı kolonlar, unique)
+        """
+        query = """
+            SELECT ic.relname AS index_name, i.indisunique,
+                array_agg(a.attname ORDER BY k.ord) AS columns
+            FROM pg_index i
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = (quote_ident(%s) || '.' || quote_ident(%s))::regclass
+            GROUP BY ic.relname, i.indisunique
+            ORDER BY ic.relname;
+        """
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name, table_name))
+            return [self._index_info(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _index_info(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Katalog satırını schema'daki index sözlüğüne çevir"""
+        return {
+            "name": row['index_name'],
+            "columns": list(row['columns']),
+            "unique": bool(row['indisunique']),
+        }
+    
+    def get_sample_values(
+        self,
+        table_name: str,
+        column_name: str,
+        limit: int = 5,
+        data_type: Optional[str] = None,
+    ) -> List[Any]:
         """
         Bir kolondan örnek değerler getir
         
+        Önce pg_stats (most_common_vals / histogram_bounds) kullanılır; istatistik
+        yoksa tablo boyutundan bağımsız maliyetli bir TABLESAMPLE sorgusuna düşülür.
+        
         Args:
             table_name: Tablo adı
             column_name: Kolon adı
             limit: Maksimum örnek sayısı
+            data_type: Kolon tipi (SAMPLE_SKIP_TYPES içindeyse örnek alınmaz)
         
         Returns:
             Örnek değerler listesi
@@ -190,22 +370,89 @@ class SchemaManager:
             logger.warning("Invalid table or column name", table=table_name, column=column_name)
             return []
         
-        query = f"""
-            SELECT DISTINCT "{column_name}"
-            FROM "{table_name}"
-            WHERE "{column_name}" IS NOT NULL
-            LIMIT %s;
+        if data_type in SAMPLE_SKIP_TYPES:
+            return []
+        
+        query = """
+            SELECT
+                avg_width,
+                most_common_vals::text::text[] AS most_common_vals,
+                histogram_bounds::text::text[] AS histogram_bounds
+            FROM pg_stats
+            WHERE schemaname = %s AND tablename = %s AND attname = %s
+            ORDER BY inherited DESC
+            LIMIT 1;
         """
         
         try:
             with self.db.get_cursor() as cursor:
-                cursor.execute(query, (limit,))
-                results = cursor.fetchall()
-                return [row[column_name] for row in results]
+                cursor.execute(query, (self.schema_name, table_name, column_name))
+                stats = cursor.fetchone()
+            
+            if stats:
+                if stats['avg_width'] and stats['avg_width'] > SAMPLE_MAX_AVG_WIDTH:
+                    return []
+                values = self._values_from_stats(stats, limit)
+                if values:
+                    return values
+            
+            row_count = self.get_table_row_estimate(table_name)
+            if row_count == 0:
+                return []
+            
+            sample_query = sql.SQL(
+                "SELECT ARRAY({sample}) AS samples"
+            ).format(sample=self._sample_subquery(table_name, column_name, row_count, limit))
+            
+            with self.db.get_cursor() as cursor:
+                cursor.execute(sample_query)
+                result = cursor.fetchone()
+                return list(result['samples'] or []) if result else []
         except Exception as e:
             logger.error("Failed to get sample values", error=str(e))
             return []
     
+    @staticmethod
+    def _values_from_stats(stats: Dict[str, Any], limit: int) -> List[Any]:
+        """pg_stats satırından en sık değerleri, yoksa histogram sınırlarını al"""
+        values = list(stats.get('most_common_vals') or [])
+        if len(values) < limit:
+            for value in stats.get('histogram_bounds') or []:
+                if value not in values:
+                    values.append(value)
+                if len(values) >= limit:
+                    break
+        return values[:limit]
+    
+    def _sample_subquery(
+        self,
+        table_name: str,
+        column_name: str,
+        row_count: Optional[int],
+        limit: int,
+    ) -> sql.Composed:
+        """
+        TABLESAMPLE SYSTEM ile sabit maliyetli örnek alt sorgusu oluştur
+        
+        Yüzde, tablonun tahmini boyutuna göre yaklaşık SAMPLE_TARGET_ROWS satır
+        okunacak şekilde seçilir; böylece maliyet tablo boyutuyla büyümez.
+        """
+        if row_count:
+            percent = min(100.0, SAMPLE_TARGET_ROWS * 100.0 / row_count)
+        else:
+            percent = 100.0
+        
+        column = sql.Identifier(column_name)
+        return sql.SQL(
+            "SELECT DISTINCT {column}::text FROM {table} TABLESAMPLE SYSTEM ({percent}) "
+            "WHERE {column} IS NOT NULL LIMIT {limit}"
+        ).format(
+            column=column,
+            table=sql.Identifier(self.schema_name, table_name),
+            percent=sql.Literal(round(percent, 4)),
+            limit=sql.Literal(limit),
+        )
+    
     def get_table_row_count(self, table_name: str) -> int:
         """
         Tablodaki satır sayısını getir
@@ -219,19 +466,70 @@ class SchemaManager:
         if not table_name.replace('_', '').isalnum():
             return 0
         
-        query = f'SELECT COUNT(*) as count FROM "{table_name}";'
+        query = sql.SQL("SELECT COUNT(*) as count FROM {table};").format(
+            table=sql.Identifier(self.schema_name, table_name),
+        )
         
         with self.db.get_cursor() as cursor:
             cursor.execute(query)
             result = cursor.fetchone()
             return result['count'] if result else 0
     
-    def get_full_schema(self, include_samples: bool = True) -> Dict[str, Any]:
+    def get_table_row_estimate(self, table_name: str) -> Optional[int]:
+        """
+        Tablonun satır sayısını planner istatistiklerinden tahmin et
+        
+        Args:
+            table_name: Tablo adı
+        
+        Returns:
+            Tahmini satır sayısı (istatistik yoksa None)
+        """
+        query = """
+            SELECT GREATEST(c.reltuples, s.n_live_tup)::bigint AS estimate
+            FROM pg_class c
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE c.relname = %s
+            AND c.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = %s);
+        """
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (table_name, self.schema_name))
+            result = cursor.fetchone()
+            if not result or result['estimate'] is None or result['estimate'] < 0:
+                return None
+            return result['estimate']
+    
+    def _count_rows(self, table_name: str, exact_counts: bool) -> tuple:
+        """
+        Tek bir tablo için satır sayısını getir (gerekirse tahmini)
+        
+        Returns:
+            (satır sayısı, tahmini mi) tuple'ı
+        """
+        if not exact_counts:
+            estimate = self.get_table_row_estimate(table_name)
+            if estimate is not None and estimate >= settings.schema_exact_count_threshold:
+                return estimate, True
+        
+        return self.get_table_row_count(table_name), False
+    
+    def get_full_schema(
+        self,
+        include_samples: bool = True,
+        bulk: Optional[bool] = None,
+        exact_counts: Optional[bool] = None,
+    ) -> Dict[str, Any]:
         """
         Tüm veritabanı schema'sını detaylı şekilde getir
         
         Args:
             include_samples: Örnek değerleri dahil et
+            bulk: True ise tüm schema'yı birkaç toplu katalog sorgusuyla getir
+                (None ise ayarlardaki değer kullanılır)
+            exact_counts: True ise tüm tablolar için COUNT(*) çalıştır, False ise
+                eşik üstündeki tablolarda planner tahminini kullan
+                (None ise ayarlardaki mod kullanılır)
         
         Returns:
             Tam schema bilgisi
@@ -239,15 +537,189 @@ class SchemaManager:
         if self._schema_cache:
             return self._schema_cache
         
+        if bulk is None:
+            bulk = settings.schema_bulk_introspection
+        if exact_counts is None:
+            exact_counts = settings.schema_row_count_mode == "exact"
+        
+        variant = (
+            f"schemas={','.join(self.schemas)};"
+            f"samples={int(include_samples)};exact_counts={int(exact_counts)}"
+        )
+        
+        if self.cache is not None:
+            self._fingerprint = self.get_catalog_fingerprint()
+            entry = self.cache.load(self._fingerprint, variant)
+            if entry:
+                self._schema_cache = entry["schema"]
+                self._llm_text_cache = entry.get("llm_text")
+                self._renderer = SchemaRenderer()
+                self._schema_index = None
+                self._join_graph = None
+                self._cost_model = None
+                self._schema_variant = variant
+                self._schema_options = (include_samples, exact_counts)
+                return self._schema_cache
+        
+        schema = self._introspect(include_samples, exact_counts, bulk)
+        
+        self._schema_cache = schema
+        self._llm_text_cache = None
+        self._renderer = SchemaRenderer()
+        self._schema_index = None
+        self._join_graph = None
+        self._cost_model = None
+        self._schema_variant = variant
+        self._schema_options = (include_samples, exact_counts)
+        if self.cache is not None:
+            self.cache.save(self._fingerprint, schema, variant=variant)
+        
+        logger.info("Full schema retrieved", table_count=len(schema), bulk=bulk)
+        return schema
+    
+    def get_catalog_fingerprint(self) -> str:
+        """
+        Schema yapısını özetleyen ucuz bir katalog parmak izi hesapla
+        
+        pg_class, pg_attribute, pg_constraint, pg_index ve pg_description
+        satırlarının xmin değerleri DDL ve COMMENT ile değişir. Tahmini satır
+        sayısının büyüklük mertebesi de dahil edilir; böylece sıradan yazma
+        trafiği önbelleği geçersiz kılmaz ama tablo boyutundaki büyük
+        değişimler yakalanır.
+        
+        Returns:
+            MD5 parmak izi
+        """
+        schema_filter, params = self._schema_filter("n.nspname")
+        query = f"""
+            WITH rels AS (
+                SELECT c.oid, c.xmin, c.reltuples
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE {schema_filter}
+                AND c.relkind IN ('r', 'p')
+            )
+            SELECT md5(COALESCE(string_agg(part, '|' ORDER BY part), '')) AS fingerprint
+            FROM (
+                SELECT 'c' || r.oid::text || ':' || r.xmin::text || ':'
+                    || floor(log(greatest(r.reltuples, 1)::numeric))::text AS part
+                FROM rels r
+                UNION ALL
+                SELECT 'a' || a.attrelid::text || '.' || a.attnum::text || ':' || a.xmin::text
+                FROM pg_attribute a
+                JOIN rels r ON r.oid = a.attrelid
+                WHERE a.attnum > 0
+                UNION ALL
+                SELECT 'k' || con.oid::text || ':' || con.xmin::text
+                FROM pg_constraint con
+                JOIN rels r ON r.oid = con.conrelid
+                UNION ALL
+                SELECT 'i' || i.indexrelid::text || ':' || i.xmin::text
+                FROM pg_index i
+                JOIN rels r ON r.oid = i.indrelid
+                UNION ALL
+                SELECT 'd' || d.objoid::text || '.' || d.objsubid::text || ':' || d.xmin::text
+                FROM pg_description d
+                JOIN rels r ON r.oid = d.objoid
+            ) parts;
+        """
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, params or None)
+            result = cursor.fetchone()
+            return result['fingerprint'] if result else ""
+    
+    def _introspect(
+        self,
+        include_samples: bool,
+        exact_counts: bool,
+        bulk: bool = True,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Yapılandırılan schema'ları incele ve tek bir sözlükte birleştir
+        
+        Birden fazla schema varsa her biri ayrı bir işçi thread'inde, kendi
+        bağlantısı üzerinden paralel olarak incelenir.
+        
+        Args:
+            include_samples: Örnek değerleri dahil et
+            exact_counts: Tüm tablolar için kesin satır sayısı al
+            bulk: Toplu katalog sorgularını kullan (tek schema'da anlamlı)
+            tables: Sadece bu tablo anahtarlarını getir (None ise tümü)
+        
+        Returns:
+            Tablo anahtarı -> tablo bilgisi sözlüğü
+        """
+        if not self.qualify_names:
+            if tables is not None or bulk:
+                return self._get_full_schema_bulk(include_samples, exact_counts, tables=tables)
+            return self._get_full_schema_per_table(include_samples, exact_counts)
+        
+        if tables is not None:
+            grouped: Dict[str, List[str]] = {}
+            for key in tables:
+                schema_name, table_name = self.split_key(key)
+                grouped.setdefault(schema_name, []).append(table_name)
+        else:
+            grouped = {name: None for name in self.resolve_schema_names()}
+        
+        if not grouped:
+            return {}
+        
+        workers = max(1, min(len(grouped), settings.schema_introspection_workers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="schema-introspect") as pool:
+            futures = {
+                schema_name: pool.submit(
+                    self._introspect_schema_worker,
+                    schema_name, include_samples, exact_counts, schema_tables,
+                )
+                for schema_name, schema_tables in grouped.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        
+        schema: Dict[str, Any] = {}
+        for schema_name in sorted(results):
+            schema.update(results[schema_name])
+        
+        logger.info("Schemas introspected", schemas=sorted(results), table_count=len(schema))
+        return schema
+    
+    def _introspect_schema_worker(
+        self,
+        schema_name: str,
+        include_samples: bool,
+        exact_counts: bool,
+        tables: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        """Tek bir schema'yı kendi bağlantısı üzerinden toplu olarak incele"""
+        worker_db = self.db.spawn()
+        try:
+            worker = SchemaManager(worker_db, schemas=[schema_name], qualify_names=True)
+            return worker._get_full_schema_bulk(include_samples, exact_counts, tables=tables)
+        finally:
+            if worker_db is not self.db:
+                worker_db.disconnect()
+    
+    def _get_full_schema_per_table(
+        self,
+        include_samples: bool,
+        exact_counts: bool,
+    ) -> Dict[str, Any]:
+        """Schema'yı tablo tablo, her bilgi için ayrı sorgu ile getir"""
         schema = {}
         tables = self.get_all_tables()
         
         for table_name in tables:
+            row_count, row_count_estimated = self._count_rows(table_name, exact_counts)
             table_info = {
                 "name": table_name,
+                "schema": self.schema_name,
                 "comment": self.get_table_comment(table_name),
-                "row_count": self.get_table_row_count(table_name),
+                "row_count": row_count,
+                "row_count_estimated": row_count_estimated,
                 "primary_key": self.get_primary_key(table_name),
+                "indexes": self.get_indexes(table_name),
                 "columns": [],
                 "foreign_keys": self.get_foreign_keys(table_name),
             }
@@ -266,66 +738,655 @@ class SchemaManager:
                 
                 if include_samples:
                     col_info['sample_values'] = self.get_sample_values(
-                        table_name, col['column_name'], limit=3
+                        table_name, col['column_name'], limit=3, data_type=col['data_type']
                     )
                 
                 table_info['columns'].append(col_info)
             
             schema[table_name] = table_info
         
-        self._schema_cache = schema
-        logger.info("Full schema retrieved", table_count=len(schema))
         return schema
     
-    def get_schema_for_llm(self) -> str:
+    def _get_full_schema_bulk(
+        self,
+        include_samples: bool,
+        exact_counts: bool,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Schema'yı tablo sayısından bağımsız, sabit sayıda katalog sorgusuyla getir
+        
+        Tablolar, kolonlar, açıklamalar, primary key'ler ve foreign key'ler
+        tüm schema için tek seferde çekilir ve tablo bazında birleştirilir.
+        
+        Args:
+            include_samples: Örnek değerleri dahil et
+            exact_counts: Tüm tablolar için kesin satır sayısı al
+            tables: Sadece bu tabloları getir (None ise tüm schema); anahtar
+                veya çıplak tablo adı verilebilir
+        
+        Returns:
+            get_full_schema ile aynı yapıda schema bilgisi
+        """
+        if tables is not None:
+            tables = [self.split_key(key)[1] for key in tables]
+        
+        table_comments = self._bulk_get_tables(tables)
+        if not table_comments:
+            return {}
+        
+        table_names = list(table_comments)
+        columns = self._bulk_get_columns(table_names)
+        primary_keys = self._bulk_get_primary_keys(table_names)
+        indexes = self._bulk_get_indexes(table_names)
+        foreign_keys = self._bulk_get_foreign_keys(table_names)
+        row_counts, estimated_tables = self._bulk_resolve_row_counts(
+            table_names, exact_counts
+        )
+        
+        samples: Dict[tuple, List[Any]] = {}
+        if include_samples:
+            samples = self._bulk_get_sample_values(columns, row_counts, limit=3)
+        
+        schema = {}
+        for table_name, comment in table_comments.items():
+            table_info = {
+                "name": table_name,
+                "schema": self.schema_name,
+                "comment": comment,
+                "row_count": row_counts.get(table_name, 0),
+                "row_count_estimated": table_name in estimated_tables,
+                "primary_key": primary_keys.get(table_name),
+                "indexes": indexes.get(table_name, []),
+                "columns": [],
+                "foreign_keys": foreign_keys.get(table_name, []),
+            }
+            
+            for col in columns.get(table_name, []):
+                col_info = {
+                    "name": col['column_name'],
+                    "type": col['data_type'],
+                    "nullable": col['is_nullable'] == 'YES',
+                    "default": col['column_default'],
+                    "comment": col['comment'],
+                }
+                
+                if include_samples:
+                    col_info['sample_values'] = samples.get(
+                        (table_name, col['column_name']), []
+                    )
+                
+                table_info['columns'].append(col_info)
+            
+            schema[self.table_key(self.schema_name, table_name)] = table_info
+        
+        return schema
+    
+    @staticmethod
+    def _table_filter(column: str, tables: Optional[List[str]]) -> tuple:
+        """
+        Toplu katalog sorguları için isteğe bağlı tablo filtresi oluştur
+        
+        Args:
+            column: Tablo adını içeren SQL ifadesi
+            tables: Filtrelenecek tablolar (None ise filtre uygulanmaz)
+        
+        Returns:
+            (SQL parçası, parametreler) tuple'ı
+        """
+        if tables is None:
+            return "", ()
+        return f"AND {column}::text = ANY(%s)", (list(tables),)
+    
+    def _bulk_get_tables(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """Tüm tabloları açıklamalarıyla birlikte tek sorguda getir"""
+        table_filter, params = self._table_filter("c.relname", tables)
+        query = f"""
+            SELECT
+                c.relname AS table_name,
+                obj_description(c.oid, 'pg_class') AS comment
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s
+            AND c.relkind IN ('r', 'p')
+            {table_filter}
+            ORDER BY c.relname;
+        """
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            results = cursor.fetchall()
+            tables = {row['table_name']: row['comment'] or None for row in results}
+            logger.info("Retrieved tables (bulk)", count=len(tables))
+            return tables
+    
+    def _bulk_get_columns(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Tüm tabloların kolonlarını ve kolon açıklamalarını tek sorguda getir"""
+        table_filter, params = self._table_filter("col.table_name", tables)
+        query = f"""
+            SELECT
+                col.table_name,
+                col.column_name,
+                col.data_type,
+                col.is_nullable,
+                col.column_default,
+                col_description(c.oid, col.ordinal_position::int) AS comment
+            FROM information_schema.columns col
+            JOIN pg_namespace n ON n.nspname = col.table_schema
+            JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = col.table_name
+            WHERE col.table_schema = %s
+            {table_filter}
+            ORDER BY col.table_name, col.ordinal_position;
+        """
+        
+        columns: Dict[str, List[Dict[str, Any]]] = {}
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            for row in cursor.fetchall():
+                columns.setdefault(row['table_name'], []).append(dict(row))
+        
+        logger.info("Retrieved columns (bulk)", table_count=len(columns))
+        return columns
+    
+    def _bulk_get_primary_keys(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, str]:
+        """Tüm tabloların primary key kolonlarını tek sorguda getir"""
+        table_filter, params = self._table_filter("c.relname", tables)
+        query = f"""
+            SELECT c.relname AS table_name, a.attname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+            WHERE n.nspname = %s AND i.indisprimary
+            {table_filter}
+            ORDER BY c.relname, array_position(i.indkey::int2[], a.attnum);
+        """
+        
+        primary_keys: Dict[str, str] = {}
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            for row in cursor.fetchall():
+                # Bileşik key'lerde tekil sorgu gibi ilk kolonu kullan
+                primary_keys.setdefault(row['table_name'], row['attname'])
+        
+        return primary_keys
+    
+    def _bulk_get_indexes(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Tüm tabloların index'lerini tek sorguda getir"""
+        table_filter, params = self._table_filter("c.relname", tables)
+        query = f"""
+            SELECT c.relname AS table_name, ic.relname AS index_name, i.indisunique,
+                array_agg(a.attname ORDER BY k.ord) AS columns
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indrelid
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE n.nspname = %s
+            {table_filter}
+            GROUP BY c.relname, ic.relname, i.indisunique
+            ORDER BY c.relname, ic.relname;
+        """
+        
+        indexes: Dict[str, List[Dict[str, Any]]] = {}
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            for row in cursor.fetchall():
+                indexes.setdefault(row['table_name'], []).append(self._index_info(row))
+        
+        return indexes
+    
+    def _bulk_get_foreign_keys(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """Tüm tabloların foreign key ilişkilerini tek sorguda getir"""
+        table_filter, params = self._table_filter("c.relname", tables)
+        query = f"""
+            SELECT
+                c.relname AS table_name,
+                a.attname AS column_name,
+                fn.nspname AS foreign_table_schema,
+                fc.relname AS foreign_table_name,
+                fa.attname AS foreign_column_name
+            FROM pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_class fc ON fc.oid = con.confrelid
+            JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+            CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, fattnum)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.fattnum
+            WHERE con.contype = 'f' AND n.nspname = %s
+            {table_filter}
+            ORDER BY c.relname, con.conname;
+        """
+        
+        foreign_keys: Dict[str, List[Dict[str, str]]] = {}
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            for row in cursor.fetchall():
+                foreign_keys.setdefault(row['table_name'], []).append({
+                    "column_name": row['column_name'],
+                    "foreign_table_name": self.table_key(
+                        row.get('foreign_table_schema') or self.schema_name,
+                        row['foreign_table_name'],
+                    ),
+                    "foreign_column_name": row['foreign_column_name'],
+                })
+        
+        return foreign_keys
+    
+    def _bulk_get_row_estimates(
+        self,
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, Optional[int]]:
+        """
+        Tüm tabloların tahmini satır sayılarını tek sorguda getir
+        
+        pg_class.reltuples son ANALYZE'ı, pg_stat_user_tables.n_live_tup ise
+        istatistik toplayıcının güncel değerini yansıtır; büyük olan kullanılır.
+        
+        Args:
+            tables: Sadece bu tabloları getir (None ise tüm schema)
+        
+        Returns:
+            Tablo adı -> tahmini satır sayısı (istatistik yoksa None)
+        """
+        table_filter, params = self._table_filter("c.relname", tables)
+        query = f"""
+            SELECT
+                c.relname AS table_name,
+                GREATEST(c.reltuples, s.n_live_tup)::bigint AS estimate
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = %s
+            AND c.relkind IN ('r', 'p')
+            {table_filter};
+        """
+        
+        estimates: Dict[str, Optional[int]] = {}
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query, (self.schema_name,) + params)
+            for row in cursor.fetchall():
+                estimate = row['estimate']
+                estimates[row['table_name']] = (
+                    estimate if estimate is not None and estimate >= 0 else None
+                )
+        
+        return estimates
+    
+    def _bulk_resolve_row_counts(
+        self,
+        tables: List[str],
+        exact_counts: bool,
+    ) -> tuple:
+        """
+        Tahmin ve kesin sayımları birleştirerek satır sayılarını belirle
+        
+        Eşik altındaki (veya istatistiği olmayan) tablolar için COUNT(*)
+        çalıştırılır; büyük tablolar için planner tahmini kullanılır.
+        
+        Args:
+            tables: Tablo adları
+            exact_counts: True ise tüm tablolar kesin sayılır
+        
+        Returns:
+            (tablo -> satır sayısı, tahmini sayılan tablolar kümesi) tuple'ı
+        """
+        if exact_counts:
+            return self._bulk_get_row_counts(tables), set()
+        
+        estimates = self._bulk_get_row_estimates(tables)
+        threshold = settings.schema_exact_count_threshold
+        
+        row_counts: Dict[str, int] = {}
+        estimated_tables = set()
+        to_count = []
+        for table_name in tables:
+            estimate = estimates.get(table_name)
+            if estimate is not None and estimate >= threshold:
+                row_counts[table_name] = estimate
+                estimated_tables.add(table_name)
+            else:
+                to_count.append(table_name)
+        
+        row_counts.update(self._bulk_get_row_counts(to_count))
+        return row_counts, estimated_tables
+    
+    def _bulk_get_row_counts(self, tables: List[str]) -> Dict[str, int]:
+        """
+        Tüm tabloların satır sayılarını tek bir UNION ALL sorgusuyla getir
+        
+        Args:
+            tables: Tablo adları
+        
+        Returns:
+            Tablo adı -> satır sayısı dictionary'si
+        """
+        if not tables:
+            return {}
+        
+        parts = [
+            sql.SQL("SELECT {name} AS table_name, COUNT(*) AS count FROM {table}").format(
+                name=sql.Literal(table_name),
+                table=sql.Identifier(self.schema_name, table_name),
+            )
+            for table_name in tables
+        ]
+        query = sql.SQL(" UNION ALL ").join(parts)
+        
+        with self.db.get_cursor() as cursor:
+            cursor.execute(query)
+            return {row['table_name']: row['count'] for row in cursor.fetchall()}
+    
+    def _bulk_get_sample_values(
+        self,
+        columns: Dict[str, List[Dict[str, Any]]],
+        row_counts: Dict[str, int],
+        limit: int = 3,
+    ) -> Dict[tuple, List[Any]]:
+        """
+        Tüm kolonların örnek değerlerini pg_stats'tan toplu olarak getir
+        
+        İstatistiği olmayan kolonlar için tek bir UNION ALL TABLESAMPLE sorgusu
+        çalıştırılır. Büyük/ikili tipler ve ortalama genişliği yüksek kolonlar atlanır.
+        
+        Args:
+            columns: Tablo adı -> kolon bilgileri
+            row_counts: Tablo adı -> (tahmini) satır sayısı
+            limit: Kolon başına maksimum örnek sayısı
+        
+        Returns:
+            (tablo, kolon) -> örnek değerler dictionary'si
+        """
+        table_filter, params = self._table_filter("tablename", list(columns))
+        query = f"""
+            SELECT
+                tablename AS table_name,
+                attname AS column_name,
+                avg_width,
+                most_common_vals::text::text[] AS most_common_vals,
+                histogram_bounds::text::text[] AS histogram_bounds
+            FROM pg_stats
+            WHERE schemaname = %s
+            {table_filter}
+            ORDER BY inherited;
+        """
+        
+        samples: Dict[tuple, List[Any]] = {}
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.execute(query, (self.schema_name,) + params)
+                stats = {
+                    (row['table_name'], row['column_name']): row
+                    for row in cursor.fetchall()
+                }
+        except Exception as e:
+            logger.error("Failed to read pg_stats", error=str(e))
+            stats = {}
+        
+        parts = []
+        for table_name, table_columns in columns.items():
+            for col in table_columns:
+                key = (table_name, col['column_name'])
+                if col['data_type'] in SAMPLE_SKIP_TYPES:
+                    continue
+                
+                column_stats = stats.get(key)
+                if column_stats:
+                    if column_stats['avg_width'] and column_stats['avg_width'] > SAMPLE_MAX_AVG_WIDTH:
+                        continue
+                    values = self._values_from_stats(column_stats, limit)
+                    if values:
+                        samples[key] = values
+                        continue
+                
+                row_count = row_counts.get(table_name)
+                if row_count == 0:
+                    continue
+                
+                parts.append(sql.SQL(
+                    "SELECT {table_name} AS table_name, {column_name} AS column_name, "
+                    "ARRAY({sample}) AS samples"
+                ).format(
+                    table_name=sql.Literal(table_name),
+                    column_name=sql.Literal(col['column_name']),
+                    sample=self._sample_subquery(table_name, col['column_name'], row_count, limit),
+                ))
+        
+        if not parts:
+            return samples
+        
+        query = sql.SQL(" UNION ALL ").join(parts)
+        
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.execute(query)
+                for row in cursor.fetchall():
+                    samples[(row['table_name'], row['column_name'])] = list(row['samples'] or [])
+        except Exception as e:
+            logger.error("Failed to get sample values (bulk)", error=str(e))
+        
+        return samples
+    
+    def get_schema_for_llm(
+        self,
+        tables: Optional[Iterable[str]] = None,
+        budget: Optional[int] = None,
+        level: str = "full",
+        question: Optional[str] = None,
+    ) -> str:
         """
         LLM için optimize edilmiş schema açıklaması oluştur
         
+        Bütçe aşılırsa metin kademeli olarak küçültülür: önce örnek değerler,
+        sonra açıklamalar, sonra anahtar olmayan kolonlar atılır; ardından
+        kompakt ve sadece tablo adı formatına geçilir.
+        
+        Args:
+            tables: Sadece bu tabloları dahil et (None ise tüm schema)
+            budget: Maksimum token sayısı (None ise sınırsız)
+            level: Başlangıç ayrıntı seviyesi ("full", "compact", "names")
+            question: Bütçe çok darsa tabloları ilgiye göre sıralamak için soru
+        
         Returns:
             LLM'e verilecek schema metni
         """
         schema = self.get_full_schema(include_samples=True)
+        renderer = self._renderer
+        
+        if tables is not None:
+            wanted = set(tables)
+            schema = {name: info for name, info in schema.items() if name in wanted}
         
-        schema_text = "# Veritabanı Schema Bilgisi\n\n"
+        relevance = None
+        if budget is not None and question:
+            relevance = dict(self.get_schema_index().search(question, len(schema)))
         
-        for table_name, table_info in schema.items():
-            schema_text += f"## Tablo: {table_name}\n"
+        if tables is None and budget is None and level == "full":
+            if self._llm_text_cache is not None:
+                return self._llm_text_cache
             
-            if table_info['comment']:
-                schema_text += f"Açıklama: {table_info['comment']}\n"
+            schema_text = renderer.render(schema)
             
-            schema_text += f"Satır Sayısı: {table_info['row_count']}\n"
+            self._llm_text_cache = schema_text
+            if self.cache is not None and self._fingerprint is not None:
+                self.cache.save(
+                    self._fingerprint, schema, llm_text=schema_text, variant=self._schema_variant
+                )
+            return schema_text
+        
+        join_lines = []
+        if tables is not None:
+            _, edges = self.get_join_graph().connect(schema)
+            if edges:
+                join_lines.append("## Önerilen JOIN Koşulları\n")
+                join_lines.extend(
+                    f"- JOIN {edge.table} ON {edge.condition()}\n" for edge in edges
+                )
+        
+        join_text = "".join(join_lines)
+        if budget is not None:
+            # JOIN önerileri bütçeden düşülür; tablo metni kalan bütçeye sığdırılır
+            budget = max(budget - estimate_tokens(join_text), 0)
+        
+        return renderer.render(schema, budget=budget, level=level, relevance=relevance) + join_text
+    
+    def get_schema_index(self) -> SchemaIndex:
+        """
+        Schema üzerindeki BM25 indeksini getir (schema başına bir kez oluşturulur)
+        
+        Returns:
+            SchemaIndex instance
+        """
+        schema = self.get_full_schema(include_samples=True)
+        index = self._schema_index
+        if index is None:
+            index = SchemaIndex(schema)
+            self._schema_index = index
+        return index
+    
+    def get_join_graph(self) -> JoinGraph:
+        """
+        Foreign key JOIN grafını getir (schema başına bir kez oluşturulur)
+        
+        Returns:
+            JoinGraph instance
+        """
+        schema = self.get_full_schema(include_samples=True)
+        graph = self._join_graph
+        if graph is None:
+            graph = JoinGraph(schema)
+            self._join_graph = graph
+        return graph
+    
+    def get_cost_model(self) -> CostModel:
+        """
+        Statik maliyet modelini getir (schema başına bir kez oluşturulur)
+        
+        Returns:
+            CostModel instance
+        """
+        schema = self.get_full_schema(include_samples=True)
+        model = self._cost_model
+        if model is None:
+            model = CostModel(schema)
+            self._cost_model = model
+        return model
+    
+    def find_relevant_tables(self, question: str, top_k: int = 5) -> List[str]:
+        """
+        Soruyla en ilgili tabloları ve foreign key ile bağlandıkları tabloları bul
+        
+        Seçilen tablolar arasındaki en kısa JOIN yolları üzerindeki ara tablolar
+        da eklenir; böylece LLM eksik tablo yüzünden kartezyen JOIN üretmez.
+        
+        Args:
+            question: Kullanıcının sorusu
+            top_k: BM25 ile seçilecek tablo sayısı
+        
+        Returns:
+            Tablo adları (eşleşme yoksa boş liste)
+        """
+        schema = self.get_full_schema(include_samples=True)
+        hits = [name for name, _ in self.get_schema_index().search(question, top_k)]
+        graph = self.get_join_graph()
+        
+        connected, _ = graph.connect(hits)
+        selected = set(connected)
+        for table_name in hits:
+            # Seçilen tablonun referans verdiği ve ona referans veren tablolar
+            selected.update(graph.neighbours(table_name))
+        
+        tables = [name for name in schema if name in selected]
+        logger.info("Relevant tables selected", hits=hits, tables=tables)
+        return tables
+    
+    def refresh_tables(self, tables: Iterable[str]) -> List[str]:
+        """
+        Sadece değişen tabloların schema girdilerini ve LLM parçalarını yenile
+        
+        Yeni girdiler ayrı bir sözlükte hazırlanıp tek atamayla yerleştirilir;
+        böylece devam eden sorgular eski schema referansını kullanmaya devam eder.
+        Artık var olmayan tablolar schema'dan çıkarılır.
+        
+        Args:
+            tables: Değişen tablo adları
+        
+        Returns:
+            Yenilenen tablo adları
+        """
+        tables = sorted(set(tables))
+        if not tables:
+            return []
+        
+        with self._refresh_lock:
+            if self._schema_cache is None:
+                # Henüz schema yüklenmedi; ilk yükleme zaten güncel olacak
+                return []
             
-            if table_info['primary_key']:
-                schema_text += f"Primary Key: {table_info['primary_key']}\n"
+            include_samples, exact_counts = self._schema_options
+            fresh = self._introspect(include_samples, exact_counts, tables=tables)
             
-            schema_text += "\n### Kolonlar:\n"
-            for col in table_info['columns']:
-                schema_text += f"- **{col['name']}** ({col['type']})"
-                
-                if not col['nullable']:
-                    schema_text += " [NOT NULL]"
-                
-                if col['comment']:
-                    schema_text += f" - {col['comment']}"
-                
-                if col.get('sample_values'):
-                    samples = ", ".join(str(v) for v in col['sample_values'][:3])
-                    schema_text += f"\n  Örnek değerler: {samples}"
-                
-                schema_text += "\n"
+            merged = {
+                name: info
+                for name, info in self._schema_cache.items()
+                if name not in tables
+            }
+            merged.update(fresh)
+            schema = {name: merged[name] for name in sorted(merged)}
             
-            if table_info['foreign_keys']:
-                schema_text += "\n### İlişkiler:\n"
-                for fk in table_info['foreign_keys']:
-                    schema_text += f"- {fk['column_name']} → {fk['foreign_table_name']}.{fk['foreign_column_name']}\n"
+            renderer = self._renderer.without(tables)
+            schema_text = renderer.render(schema)
             
-            schema_text += "\n---\n\n"
+            self._schema_cache = schema
+            self._renderer = renderer
+            self._llm_text_cache = schema_text
+            self._schema_index = None
+            self._join_graph = None
+            self._cost_model = None
+            
+            if self.cache is not None:
+                self._fingerprint = self.get_catalog_fingerprint()
+                self.cache.save(
+                    self._fingerprint, schema, llm_text=schema_text, variant=self._schema_variant
+                )
         
-        return schema_text
+        removed = [t for t in tables if t not in fresh]
+        logger.info("Schema tables refreshed", tables=tables, removed=removed)
+        return tables
     
-    def clear_cache(self):
-        """Schema cache'ini temizle"""
+    def clear_cache(self, persistent: bool = False):
+        """
+        Schema cache'ini temizle
+        
+        Args:
+            persistent: True ise disk üzerindeki önbellek dosyasını da sil
+        """
         self._schema_cache = None
-        logger.info("Schema cache cleared")
+        self._llm_text_cache = None
+        self._renderer = SchemaRenderer()
+        self._schema_index = None
+        self._join_graph = None
+        self._cost_model = None
+        self._fingerprint = None
+        self._schema_variant = None
+        if persistent and self.cache is not None:
+            self.cache.clear()
+        logger.info("Schema cache cleared", persistent=persistent)
 
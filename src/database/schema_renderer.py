@@ -0,0 +1,243 @@
+"""Token bütçesine göre LLM schema metni üreten renderer"""
+
+from typing import Dict, Any, Optional, Iterable, NamedTuple
+
+
+# Token tahmini için ortalama karakter/token oranı
+CHARS_PER_TOKEN = 4
+
+SCHEMA_HEADER = "# Veritabanı Schema Bilgisi\n\n"
+
+
+class RenderStage(NamedTuple):
+    """Bir ayrıntı seviyesinde tablo parçasının nasıl üretileceği"""
+    
+    level: str
+    samples: bool = True
+    comments: bool = True
+    key_columns_only: bool = False
+
+
+# Bütçe aşıldığında sırayla denenen seviyeler: önce örnekler, sonra açıklamalar,
+# sonra anahtar olmayan kolonlar atılır; ardından kompakt ve sadece-isim moduna geçilir
+RENDER_STAGES = (
+    RenderStage("full"),
+    RenderStage("full", samples=False),
+    RenderStage("full", samples=False, comments=False),
+    RenderStage("full", samples=False, comments=False, key_columns_only=True),
+    RenderStage("compact", samples=False, comments=False),
+    RenderStage("names", samples=False, comments=False),
+)
+
+RENDER_LEVELS = ("full", "compact", "names")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Metnin yaklaşık token sayısını tahmin et
+    
+    Args:
+        text: Metin
+    
+    Returns:
+        Tahmini token sayısı
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class SchemaRenderer:
+    """
+    Tablo parçalarını önbelleğe alarak bütçeli schema metni üreten sınıf
+    
+    Her (tablo, seviye) parçası bir kez üretilir; metin, parçaların tek bir
+    join ile birleştirilmesiyle doğrusal sürede oluşturulur.
+    """
+    
+    def __init__(self, fragments: Optional[Dict[tuple, str]] = None):
+        """
+        Renderer'ı başlat
+        
+        Args:
+            fragments: (tablo, seviye) -> metin parçası önbelleği
+        """
+        self._fragments: Dict[tuple, str] = dict(fragments or {})
+    
+    def without(self, tables: Iterable[str]) -> "SchemaRenderer":
+        """
+        Verilen tabloların parçaları atılmış yeni bir renderer döndür
+        
+        Args:
+            tables: Parçaları geçersiz kılınacak tablo anahtarları
+        
+        Returns:
+            Yeni SchemaRenderer instance
+        """
+        dropped = set(tables)
+        return SchemaRenderer({
+            key: fragment
+            for key, fragment in self._fragments.items()
+            if key[0] not in dropped
+        })
+    
+    def fragment(self, table_name: str, table_info: Dict[str, Any], stage: RenderStage) -> str:
+        """
+        Bir tablonun verilen seviyedeki metin parçasını getir (önbellekli)
+        
+        Args:
+            table_name: Tablo anahtarı
+            table_info: Tablo bilgisi
+            stage: Ayrıntı seviyesi
+        
+        Returns:
+            Metin parçası
+        """
+        key = (table_name, stage)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            if stage.level == "names":
+                fragment = f"- {table_name}\n"
+            elif stage.level == "compact":
+                fragment = self._render_compact(table_name, table_info)
+            else:
+                fragment = self._render_full(table_name, table_info, stage)
+            self._fragments[key] = fragment
+        return fragment
+    
+    def render(
+        self,
+        schema: Dict[str, Any],
+        budget: Optional[int] = None,
+        level: str = "full",
+        relevance: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """
+        Schema metnini token bütçesine sığacak şekilde üret
+        
+        Args:
+            schema: Tablo anahtarı -> tablo bilgisi
+            budget: Maksimum token sayısı (None ise sınırsız)
+            level: Başlangıç ayrıntı seviyesi ("full", "compact", "names")
+            relevance: Tablo -> ilgi skoru; isim listesi bile sığmazsa en az
+                ilgili tablolar atılır
+        
+        Returns:
+            LLM'e verilecek schema metni
+        """
+        if level not in RENDER_LEVELS:
+            raise ValueError(f"Geçersiz schema seviyesi: {level}")
+        
+        stages = [stage for stage in RENDER_STAGES if RENDER_LEVELS.index(stage.level) >= RENDER_LEVELS.index(level)]
+        max_chars = budget * CHARS_PER_TOKEN if budget is not None else None
+        
+        for stage in stages:
+            parts = [SCHEMA_HEADER]
+            parts.extend(self.fragment(name, info, stage) for name, info in schema.items())
+            if max_chars is None or sum(len(part) for part in parts) <= max_chars:
+                return "".join(parts)
+        
+        return self._render_names_within(schema, max_chars, relevance or {})
+    
+    def _render_names_within(
+        self,
+        schema: Dict[str, Any],
+        max_chars: int,
+        relevance: Dict[str, float],
+    ) -> str:
+        """Sadece tablo adlarını ilgi sırasına göre bütçe dolana kadar ekle"""
+        names_stage = RENDER_STAGES[-1]
+        ranked = sorted(
+            enumerate(schema),
+            key=lambda item: (-relevance.get(item[1], 0.0), item[0]),
+        )
+        
+        parts = [SCHEMA_HEADER]
+        # Atlanan tablo notu için yer ayrılır
+        used = len(SCHEMA_HEADER) + len(f"... ve {len(schema)} tablo daha\n")
+        included = 0
+        for _, name in ranked:
+            fragment = self.fragment(name, schema[name], names_stage)
+            if used + len(fragment) > max_chars:
+                break
+            parts.append(fragment)
+            used += len(fragment)
+            included += 1
+        
+        text = "".join(parts)
+        omitted = len(schema) - included
+        note = f"... ve {omitted} tablo daha\n" if omitted else ""
+        # Başlık ve not bile sığmıyorsa önce not atılır, sonra başlık kesilir
+        if len(text) + len(note) <= max_chars:
+            text += note
+        return text[:max_chars]
+    
+    @staticmethod
+    def _key_columns(table_info: Dict[str, Any]) -> set:
+        """Primary key ve foreign key kolonları"""
+        keys = {fk['column_name'] for fk in table_info.get('foreign_keys', [])}
+        if table_info.get('primary_key'):
+            keys.add(table_info['primary_key'])
+        return keys
+    
+    def _render_full(self, table_name: str, table_info: Dict[str, Any], stage: RenderStage) -> str:
+        """Tablonun başlıklı, kolon kolon ayrıntılı parçasını oluştur"""
+        lines = [f"## Tablo: {table_name}\n"]
+        
+        if stage.comments and table_info.get('comment'):
+            lines.append(f"Açıklama: {table_info['comment']}\n")
+        
+        if table_info.get('row_count_estimated'):
+            lines.append(f"Satır Sayısı: ~{table_info['row_count']} (tahmini)\n")
+        else:
+            lines.append(f"Satır Sayısı: {table_info.get('row_count', 0)}\n")
+        
+        if table_info.get('primary_key'):
+            lines.append(f"Primary Key: {table_info['primary_key']}\n")
+        
+        lines.append("\n### Kolonlar:\n")
+        key_columns = self._key_columns(table_info) if stage.key_columns_only else None
+        omitted = 0
+        for col in table_info.get('columns', []):
+            if key_columns is not None and col['name'] not in key_columns:
+                omitted += 1
+                continue
+            
+            line = f"- **{col['name']}** ({col['type']})"
+            if not col['nullable']:
+                line += " [NOT NULL]"
+            if stage.comments and col.get('comment'):
+                line += f" - {col['comment']}"
+            if stage.samples and col.get('sample_values'):
+                samples = ", ".join(str(v) for v in col['sample_values'][:3])
+                line += f"\n  Örnek değerler: {samples}"
+            lines.append(line + "\n")
+        
+        if omitted:
+            lines.append(f"- (+{omitted} kolon daha)\n")
+        
+        if table_info.get('foreign_keys'):
+            lines.append("\n### İlişkiler:\n")
+            for fk in table_info['foreign_keys']:
+                lines.append(
+                    f"- {fk['column_name']} → {fk['foreign_table_name']}.{fk['foreign_column_name']}\n"
+                )
+        
+        lines.append("\n---\n\n")
+        return "".join(lines)
+    
+    def _render_compact(self, table_name: str, table_info: Dict[str, Any]) -> str:
+        """Tablonun tek satırlık özetini oluştur"""
+        primary_key = table_info.get('primary_key')
+        columns = ", ".join(
+            f"{col['name']} PK" if col['name'] == primary_key else col['name']
+            for col in table_info.get('columns', [])
+        )
+        line = f"- {table_name}({columns})"
+        
+        if table_info.get('foreign_keys'):
+            relations = "; ".join(
+                f"{fk['column_name']}→{fk['foreign_table_name']}.{fk['foreign_column_name']}"
+                for fk in table_info['foreign_keys']
+            )
+            line += f" FK: {relations}"
+        
+        return line + "\n"
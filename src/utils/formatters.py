@@ -1,22 +1,34 @@
 """Sonuç formatlama araçları"""
 
-from typing import List, Dict, Any
+from collections.abc import Mapping
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Optional
 from rich.table import Table
 from rich.console import Console
 
 
-def format_table(data: List[Dict[str, Any]], title: str = "Sonuçlar") -> Table:
+def format_table(
+    data: Iterable[Dict[str, Any]],
+    title: str = "Sonuçlar",
+    max_rows: Optional[int] = None,
+) -> Table:
     """
     Veritabanı sonuçlarını Rich table formatında döndür
     
     Args:
-        data: Veritabanı sorgu sonuçları (dict listesi)
+        data: Veritabanı sorgu sonuçları (dict listesi veya satır iterator'ı)
         title: Tablo başlığı
+        max_rows: Gösterilecek maksimum satır sayısı (None ise tümü)
     
     Returns:
         Rich Table nesnesi
     """
-    if not data:
+    rows = iter(data)
+    if max_rows is not None:
+        rows = islice(rows, max_rows)
+    first = next(rows, None)
+    
+    if first is None:
         table = Table(title=title, show_header=False)
         table.add_row("Sonuç bulunamadı")
         return table
@@ -25,12 +37,12 @@ def format_table(data: List[Dict[str, Any]], title: str = "Sonuçlar") -> Table:
     table = Table(title=title, show_header=True, header_style="bold magenta")
     
     # Kolonları ekle
-    columns = list(data[0].keys())
+    columns = list(first.keys())
     for col in columns:
         table.add_column(col, style="cyan")
     
     # Satırları ekle
-    for row in data:
+    for row in chain([first], rows):
         table.add_row(*[str(value) if value is not None else "NULL" for value in row.values()])
     
     return table
@@ -78,3 +90,22 @@ def print_table(data: List[Dict[str, Any]], title: str = "Sonuçlar"):
     table = format_table(data, title)
     console.print(table)
 
+
+def json_default(value: Any) -> Any:
+    """
+    json.dumps için varsayılan dönüştürücü
+    
+    Kolon bazlı sonuçları dict listesine, satır görünümlerini dict'e, diğer
+    tipleri (tarih, Decimal vb.) metne çevirir.
+    
+    Args:
+        value: JSON'a çevrilemeyen değer
+    
+    Returns:
+        JSON uyumlu değer
+    """
+    if hasattr(value, "to_dicts"):
+        return value.to_dicts()
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
@@ -1,6 +1,8 @@
 """SQL validasyon modülü"""
 
+from .analyzer import SQLAnalysis, analyze_sql
 from .sql_validator import SQLValidator
+from .validation_cache import ValidationCache
 
-__all__ = ["SQLValidator"]
+__all__ = ["SQLValidator", "SQLAnalysis", "ValidationCache", "analyze_sql"]
 
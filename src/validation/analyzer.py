@@ -0,0 +1,629 @@
+"""SQL sorgusunu tek geçişte çözümleyen analiz hattı"""
+
+from typing import FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple
+import sqlparse
+from sqlparse import filters, formatter
+from sqlparse.sql import (
+    Comparison, Function, Identifier, IdentifierList, Over, Parenthesis, Statement, Token, TokenList,
+    Where,
+)
+from sqlparse.tokens import CTE, DML, Comment, Keyword, Name, Number, Operator, Punctuation
+
+
+# sanitize_sql'in tarihsel sqlparse.format seçenekleri
+SANITIZE_OPTIONS = {"reindent": True, "keyword_case": "upper", "strip_comments": True}
+
+# FROM/JOIN ile kaynak arasında gelebilen anahtar kelimeler
+_SOURCE_MODIFIERS = ("LATERAL", "ONLY")
+
+# JOIN ... ON koşulunu bitiren cümlecikler (JOIN'ler ve WHERE ayrıca bitirir)
+_CLAUSE_KEYWORDS = ("GROUP BY", "HAVING", "WINDOW", "ORDER BY", "LIMIT", "OFFSET", "FETCH")
+
+# Kolon sağ tarafa alınınca karşılaştırmanın yönü değişir (5 < x => x > 5)
+_FLIPPED_OPERATORS = {"<": ">", ">": "<", "<=": ">=", ">=": "<="}
+
+# GROUP BY olmadan kullanıldığında tüm satırları tek satıra indiren fonksiyonlar
+_AGGREGATE_FUNCTIONS = frozenset({
+    "count", "sum", "avg", "min", "max", "array_agg", "string_agg", "json_agg", "jsonb_agg",
+    "json_object_agg", "jsonb_object_agg", "bool_and", "bool_or", "every", "bit_and", "bit_or",
+    "stddev", "stddev_pop", "stddev_samp", "variance", "var_pop", "var_samp",
+    "percentile_cont", "percentile_disc", "mode",
+})
+
+
+class TableRef(NamedTuple):
+    """FROM/JOIN ile okunan bir tablo referansı (adlar küçük harfli)"""
+    
+    schema: Optional[str]
+    name: str
+    alias: Optional[str]
+
+
+class ColumnRef(NamedTuple):
+    """Sorgudaki bir kolon referansı (qualifier: tablo adı veya alias)"""
+    
+    qualifier: Optional[str]
+    name: str
+
+
+class Predicate(NamedTuple):
+    """WHERE veya JOIN ... ON içindeki AND ile bağlı basit bir koşul"""
+    
+    left: ColumnRef
+    operator: str  # "=", "<", "LIKE", "IN", "BETWEEN", ...
+    # Sağ taraf kolon değilse (sabit, parametre, alt sorgu) None
+    right: Optional[ColumnRef]
+
+
+class QueryScope(NamedTuple):
+    """Tek bir SELECT gövdesi; alt sorgular, CTE'ler ve UNION kolları ayrı kapsamdır"""
+    
+    # CTE adı veya FROM alt sorgusunun alias'ı (WHERE alt sorgularında None)
+    name: Optional[str]
+    # Sonucu doğrudan döndüren dış sorgu kolu mu
+    top_level: bool
+    # Bu seviyede okunan kaynaklar; CTE ve FROM alt sorguları adlarıyla yer alır
+    tables: Tuple[TableRef, ...]
+    predicates: Tuple[Predicate, ...]
+    grouped: bool
+    # Bu seviyede (pencere fonksiyonu olmayan) aggregate çağrısı var mı
+    aggregated: bool = False
+    # Sabit LIMIT değeri; UNION kollarında tüm birleşimin LIMIT'i (yoksa None)
+    limit: Optional[int] = None
+    # ORDER BY, DISTINCT veya UNION (ALL olmadan): sonuç tüm girdi okunmadan üretilemez
+    ordered: bool = False
+
+
+class SQLAnalysis(NamedTuple):
+    """Bir SQL metninin tek parse ile çıkarılan tüm bilgileri"""
+    
+    sql: str
+    statement_types: Tuple[Optional[str], ...]
+    tables: Tuple[str, ...]
+    join_count: int
+    union_count: int
+    subquery_count: int
+    group_by_count: int
+    having_count: int
+    open_parens: int
+    close_parens: int
+    sanitized: str
+    table_refs: Tuple[TableRef, ...] = ()
+    column_refs: Tuple[ColumnRef, ...] = ()
+    # Sorgu içinde tanımlanan adlar (alias, CTE, kolon alias listeleri)
+    defined_names: FrozenSet[str] = frozenset()
+    # Kolonları bilinemeyen kaynak var mı (fonksiyon, ayrıştırılamayan tablo)
+    opaque_sources: bool = False
+    scopes: Tuple[QueryScope, ...] = ()
+    
+    @property
+    def statement_type(self) -> Optional[str]:
+        """İlk ifadenin türü ("SELECT", "WITH", "INSERT", ...)"""
+        return self.statement_types[0] if self.statement_types else None
+
+
+def iter_from_sources(token_list: TokenList) -> Iterator[Token]:
+    """
+    FROM ve JOIN'den sonra gelen kaynak token'larını gez (alt sorgular dahil)
+    
+    Sadece SELECT içeren token gruplarındaki FROM sayılır; böylece
+    EXTRACT(year FROM x) ve IS DISTINCT FROM kaynak sanılmaz.
+    
+    Args:
+        token_list: Statement veya token grubu
+    
+    Yields:
+        Identifier, alt sorgu/fonksiyon identifier'ı veya sqlparse'ın anahtar
+        kelime sandığı tablo adı (örn. events)
+    """
+    return _iter_sources(token_list.tokens, nested=True)
+
+
+def _iter_sources(tokens: List[Token], nested: bool) -> Iterator[Token]:
+    """iter_from_sources gövdesi; nested False ise gruplara inilmez (tek kapsam)"""
+    in_select = False
+    expect_source = False
+    previous_keyword = None
+    for token in tokens:
+        if token.is_whitespace or token.ttype in Comment:
+            continue
+        
+        if expect_source:
+            items = list(token.get_identifiers()) if isinstance(token, IdentifierList) else [token]
+            for item in items:
+                if not (item.ttype in Keyword and item.normalized in _SOURCE_MODIFIERS):
+                    yield item
+            last = items[-1] if items else token
+            expect_source = last.ttype in Keyword and last.normalized in _SOURCE_MODIFIERS
+            if token.ttype in Keyword:
+                continue
+        elif token.ttype in Keyword:
+            normalized = token.normalized
+            if token.ttype in DML and normalized == "SELECT":
+                in_select = True
+            expect_source = in_select and previous_keyword != "DISTINCT" and (
+                normalized == "FROM" or normalized.endswith("JOIN")
+            )
+            previous_keyword = normalized
+            continue
+        
+        # IS DISTINCT FROM yalnızca bitişik anahtar kelimeler; SELECT DISTINCT kolon FROM değil
+        previous_keyword = None
+        if nested and token.is_group:
+            yield from _iter_sources(token.tokens, nested=True)
+
+
+def is_table_source(token: Token) -> bool:
+    """Kaynak düz bir tablo identifier'ı mı (alt sorgu veya fonksiyon değil)"""
+    return isinstance(token, Identifier) and not any(
+        isinstance(t, (Parenthesis, Function)) for t in token.tokens
+    )
+
+
+def iter_table_identifiers(token_list: TokenList) -> Iterator[Identifier]:
+    """
+    FROM ve JOIN'den sonra gelen tablo identifier'larını gez (alt sorgular dahil)
+    
+    Alt sorgu ve fonksiyon kaynakları (FROM (SELECT ...) s, FROM unnest(...))
+    tablo sayılmaz; içlerindeki FROM'lar ayrıca gezilir.
+    
+    Args:
+        token_list: Statement veya token grubu
+    
+    Yields:
+        Tablo identifier'ları
+    """
+    for source in iter_from_sources(token_list):
+        if is_table_source(source):
+            yield source
+
+
+def _statement_type(statement: Statement) -> Optional[str]:
+    """İfadenin ilk anahtar kelimesi (baştaki parantez ve yorumlar atlanır)"""
+    for token in statement.flatten():
+        if token.is_whitespace or token.ttype in Comment or token.ttype in Punctuation:
+            continue
+        return token.normalized if token.ttype in Keyword else None
+    return None
+
+
+def _is_blank(statement: Statement) -> bool:
+    """İfade sadece boşluk ve yorumdan mı oluşuyor"""
+    return all(token.is_whitespace or token.ttype in Comment for token in statement.flatten())
+
+
+def _cte_names(statement: Statement) -> Set[str]:
+    """WITH ile tanımlanan CTE adları (tablo listesinden çıkarılır)"""
+    names = set()
+    index, token = statement.token_next(-1)
+    if token is None or token.ttype not in CTE:
+        return names
+    
+    index, token = statement.token_next(index)
+    if token is not None and token.normalized == "RECURSIVE":
+        index, token = statement.token_next(index)
+    
+    items = token.get_identifiers() if isinstance(token, IdentifierList) else [token]
+    for item in items:
+        if isinstance(item, Identifier) and item.get_name():
+            names.add(item.get_name().lower())
+    return names
+
+
+def _is_subquery(token: Parenthesis) -> bool:
+    """Parantez bir alt sorgu mu (içi SELECT veya WITH ile başlıyor mu)"""
+    _, first = token.token_next(0)
+    return first is not None and first.ttype in (DML, CTE) and first.normalized in ("SELECT", "WITH")
+
+
+class _Counter:
+    """Tek ağaç gezintisinde toplanan sayaçlar"""
+    
+    __slots__ = ("joins", "unions", "subqueries", "group_by", "having", "open_parens", "close_parens")
+    
+    def __init__(self):
+        self.joins = self.unions = self.subqueries = 0
+        self.group_by = self.having = 0
+        self.open_parens = self.close_parens = 0
+    
+    def walk(self, token_list: TokenList):
+        for token in token_list.tokens:
+            if token.is_group:
+                if isinstance(token, Parenthesis) and _is_subquery(token):
+                    self.subqueries += 1
+                self.walk(token)
+            elif token.ttype in Keyword:
+                normalized = token.normalized
+                if normalized.endswith("JOIN"):
+                    self.joins += 1
+                elif normalized.startswith("UNION"):
+                    self.unions += 1
+                elif normalized == "GROUP BY":
+                    self.group_by += 1
+                elif normalized == "HAVING":
+                    self.having += 1
+            elif token.ttype in Punctuation:
+                if token.value == "(":
+                    self.open_parens += 1
+                elif token.value == ")":
+                    self.close_parens += 1
+
+
+def _is_keyword(token: Optional[Token], value: str) -> bool:
+    return token is not None and token.ttype in Keyword and token.normalized == value
+
+
+def _matching_paren(leaves: List[Token], index: int) -> int:
+    """leaves[index] konumundaki '(' ile eşleşen ')' konumu (yoksa son konum)"""
+    depth = 0
+    for position in range(index, len(leaves)):
+        if leaves[position].value == "(":
+            depth += 1
+        elif leaves[position].value == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(leaves) - 1
+
+
+def _collect_references(
+    statement: Statement, ctes: Set[str]
+) -> Tuple[List[TableRef], List[ColumnRef], Set[str], bool]:
+    """
+    İfadedeki tablo ve kolon referanslarını, tanımlanan adları topla
+    
+    Returns:
+        (tablo referansları, kolon referansları, tanımlanan adlar, opak kaynak var mı)
+    """
+    table_refs: List[TableRef] = []
+    defined = set(ctes)
+    opaque = False
+    skip: Set[int] = set()
+    
+    for source in iter_from_sources(statement):
+        if is_table_source(source):
+            alias = source.get_alias()
+            parent = source.get_parent_name()
+            table_refs.append(TableRef(
+                parent.lower() if parent else None,
+                source.get_real_name().lower(),
+                alias.lower() if alias else None,
+            ))
+            skip.update(id(leaf) for leaf in source.flatten())
+        elif source.ttype in Keyword:
+            # sqlparse'ın anahtar kelime sandığı tablo adı; alias'ı ayrışmaz
+            table_refs.append(TableRef(None, source.value.lower(), None))
+            skip.add(id(source))
+            opaque = True
+        elif isinstance(source, Identifier) and source.get_alias():
+            # Alt sorgu veya fonksiyon kaynağı
+            opaque = opaque or not any(isinstance(t, Parenthesis) for t in source.tokens)
+        else:
+            opaque = True
+    
+    for group in _iter_groups(statement):
+        if isinstance(group, Identifier) and group.get_alias():
+            defined.add(group.get_alias().lower())
+    
+    leaves = [t for t in statement.flatten() if not (t.is_whitespace or t.ttype in Comment)]
+    column_refs: List[ColumnRef] = []
+    for index, leaf in enumerate(leaves):
+        if leaf.ttype is not Name or id(leaf) in skip:
+            continue
+        
+        name = leaf.value.lower()
+        previous = leaves[index - 1] if index else None
+        following = leaves[index + 1] if index + 1 < len(leaves) else None
+        
+        if following is not None and following.value == "(":
+            # Fonksiyon çağrısı; AS g(n) veya WITH x(a, b) AS (...) ise kolon alias listesi
+            close = _matching_paren(leaves, index + 1)
+            after = leaves[close + 1] if close + 1 < len(leaves) else None
+            after_next = leaves[close + 2] if close + 2 < len(leaves) else None
+            if _is_keyword(previous, "AS") or (
+                _is_keyword(after, "AS") and after_next is not None and after_next.value == "("
+            ):
+                defined.add(name)
+                defined.update(
+                    t.value.lower() for t in leaves[index + 2:close] if t.ttype is Name
+                )
+            continue
+        
+        if _is_keyword(previous, "AS"):
+            defined.add(name)
+            continue
+        if _is_keyword(following, "AS") and index + 2 < len(leaves) and leaves[index + 2].value == "(":
+            # WITH x AS (...) veya WINDOW w AS (...)
+            defined.add(name)
+            continue
+        if previous is not None and previous.value == "::":
+            continue
+        if following is not None and following.value == ".":
+            continue
+        
+        if previous is not None and previous.value == ".":
+            qualifier = leaves[index - 2] if index >= 2 else None
+            if qualifier is None or qualifier.ttype is not Name:
+                continue
+            if index >= 3 and leaves[index - 3].value == ".":
+                continue
+            column_refs.append(ColumnRef(qualifier.value.lower(), name))
+            continue
+        
+        column_refs.append(ColumnRef(None, name))
+    
+    return table_refs, column_refs, defined, opaque
+
+
+def _iter_groups(token_list: TokenList) -> Iterator[TokenList]:
+    """Ağaçtaki tüm grupları gez"""
+    for token in token_list.tokens:
+        if token.is_group:
+            yield token
+            yield from _iter_groups(token)
+
+
+def _table_ref(source: Token) -> Optional[TableRef]:
+    """FROM/JOIN kaynağını TableRef'e çevir (fonksiyon kaynaklarında None)"""
+    if is_table_source(source):
+        alias = source.get_alias()
+        parent = source.get_parent_name()
+        return TableRef(
+            parent.lower() if parent else None,
+            source.get_real_name().lower(),
+            alias.lower() if alias else None,
+        )
+    if source.ttype in Keyword:
+        return TableRef(None, source.value.lower(), None)
+    if isinstance(source, Identifier) and source.get_alias() and any(
+        isinstance(t, Parenthesis) and _is_subquery(t) for t in source.tokens
+    ):
+        # FROM alt sorgusu, kendi kapsamına alias'ı üzerinden bağlanır
+        return TableRef(None, source.get_alias().lower(), None)
+    return None
+
+
+def _column_ref(token: Token) -> Optional[ColumnRef]:
+    """Düz bir kolon identifier'ını ColumnRef'e çevir (ifade veya fonksiyonsa None)"""
+    if not is_table_source(token) or not token.get_real_name():
+        return None
+    qualifier = token.get_parent_name()
+    return ColumnRef(qualifier.lower() if qualifier else None, token.get_real_name().lower())
+
+
+def _comparison_predicate(comparison: Comparison) -> Optional[Predicate]:
+    """Karşılaştırmayı kolon solda olacak şekilde Predicate'e çevir"""
+    operator = next(
+        (" ".join(t.value.upper().split()) for t in comparison.tokens if t.ttype in Operator.Comparison),
+        None,
+    )
+    left, right = _column_ref(comparison.left), _column_ref(comparison.right)
+    if left is None and right is not None:
+        left, right = right, None
+        operator = _FLIPPED_OPERATORS.get(operator, operator)
+    if operator is None or left is None:
+        return None
+    return Predicate(left, operator, right)
+
+
+def _add_conditions(tokens: List[Token], predicates: List[Predicate]):
+    """AND ile bağlı koşullardaki basit karşılaştırmaları topla (OR içeren seviye atlanır)"""
+    items = [t for t in tokens if not (t.is_whitespace or t.ttype in Comment)]
+    if any(_is_keyword(t, "OR") for t in items):
+        return
+    
+    for index, token in enumerate(items):
+        following = items[index + 1] if index + 1 < len(items) else None
+        if isinstance(token, Comparison):
+            predicate = _comparison_predicate(token)
+            if predicate is not None:
+                predicates.append(predicate)
+        elif isinstance(token, Parenthesis) and not _is_subquery(token):
+            _add_conditions(token.tokens[1:-1], predicates)
+        elif _is_keyword(following, "IN") or _is_keyword(following, "BETWEEN"):
+            column = _column_ref(token)
+            if column is not None:
+                predicates.append(Predicate(column, following.normalized, None))
+
+
+def _branch_predicates(tokens: List[Token]) -> List[Predicate]:
+    """Bir SELECT kolunun WHERE, JOIN ... ON ve JOIN ... USING koşulları"""
+    predicates: List[Predicate] = []
+    condition: Optional[List[Token]] = None
+    joined: Optional[TableRef] = None
+    previous = None
+    for token in tokens:
+        if token.is_whitespace or token.ttype in Comment:
+            continue
+        
+        ends_condition = isinstance(token, Where) or token.ttype in Keyword and (
+            token.normalized.endswith("JOIN") or token.normalized in _CLAUSE_KEYWORDS
+        )
+        if condition is not None and ends_condition:
+            _add_conditions(condition, predicates)
+            condition = None
+        
+        if previous is not None and previous.ttype in Keyword and previous.normalized.endswith("JOIN"):
+            joined = _table_ref(token)
+        
+        if isinstance(token, Where):
+            _add_conditions(token.tokens[1:], predicates)
+        elif _is_keyword(token, "ON"):
+            condition = []
+        elif condition is not None:
+            condition.append(token)
+        elif isinstance(token, Parenthesis) and _is_keyword(previous, "USING") and joined is not None:
+            # USING (a) = önceki kaynaklardan birinin a'sı ile JOIN edilen tablonun a'sı
+            qualifier = joined.alias or joined.name
+            for leaf in token.flatten():
+                if leaf.ttype is Name:
+                    name = leaf.value.lower()
+                    predicates.append(Predicate(ColumnRef(None, name), "=", ColumnRef(qualifier, name)))
+        previous = token
+    
+    if condition is not None:
+        _add_conditions(condition, predicates)
+    return predicates
+
+
+def _has_aggregate(tokens: List[Token]) -> bool:
+    """Kolun kendi seviyesinde (alt sorgular hariç) pencere dışı aggregate çağrısı var mı"""
+    for token in tokens:
+        if isinstance(token, Parenthesis) and _is_subquery(token):
+            continue
+        if isinstance(token, Function) and (token.get_name() or "").lower() in _AGGREGATE_FUNCTIONS:
+            if not any(isinstance(t, Over) for t in token.tokens):
+                return True
+        if token.is_group and _has_aggregate(token.tokens):
+            return True
+    return False
+
+
+def _branch_limit(tokens: List[Token]) -> Optional[int]:
+    """Kolun sabit LIMIT değeri (yoksa, ALL veya parametreyse None)"""
+    items = [t for t in tokens if not (t.is_whitespace or t.ttype in Comment)]
+    for token, following in zip(items, items[1:]):
+        if _is_keyword(token, "LIMIT") and following.ttype in Number.Integer:
+            return int(following.value)
+    return None
+
+
+def _scope_name(parent: TokenList, subquery: Parenthesis) -> Optional[str]:
+    """Alt sorgunun bağlandığı ad: FROM (...) s için s, WITH x AS (...) için x"""
+    if not isinstance(parent, Identifier):
+        return None
+    name = parent.get_alias() if parent.tokens[0] is subquery else parent.get_real_name()
+    return name.lower() if name else None
+
+
+def _collect_scopes(
+    root: TokenList, name: Optional[str], top_level: bool, scopes: List[QueryScope]
+):
+    """
+    İfade veya alt sorgu parantezindeki SELECT kollarını ve iç içe alt
+    sorguları kapsam olarak ekle
+    """
+    branches: List[List[Token]] = [[]]
+    set_operators: List[str] = []
+    for token in root.tokens:
+        if token.ttype in Keyword and token.normalized.split()[0] in ("UNION", "INTERSECT", "EXCEPT"):
+            branches.append([])
+            set_operators.append(token.normalized)
+        else:
+            branches[-1].append(token)
+    
+    # Son koldaki LIMIT ve ORDER BY tüm UNION/INTERSECT/EXCEPT sonucuna uygulanır;
+    # ALL olmayan küme işlemleri de tekrarları ayıklamak için tüm girdiyi okur
+    limit = _branch_limit(branches[-1])
+    compound_ordered = any(operator != "UNION ALL" for operator in set_operators) or any(
+        _is_keyword(token, "ORDER BY") for token in branches[-1]
+    )
+    for tokens in branches:
+        tables = [_table_ref(source) for source in _iter_sources(tokens, nested=False)]
+        scopes.append(QueryScope(
+            name=name,
+            top_level=top_level,
+            tables=tuple(ref for ref in tables if ref is not None),
+            predicates=tuple(_branch_predicates(tokens)),
+            grouped=any(_is_keyword(token, "GROUP BY") for token in tokens),
+            aggregated=_has_aggregate(tokens),
+            limit=limit,
+            ordered=compound_ordered or any(_is_keyword(token, "DISTINCT") for token in tokens),
+        ))
+    
+    _collect_nested_scopes(root, scopes)
+
+
+def _collect_nested_scopes(token_list: TokenList, scopes: List[QueryScope]):
+    """Bu seviyedeki alt sorguları (daha içtekiler onların altında) kapsam olarak ekle"""
+    for token in token_list.tokens:
+        if isinstance(token, Parenthesis) and _is_subquery(token):
+            _collect_scopes(token, _scope_name(token_list, token), False, scopes)
+        elif token.is_group:
+            _collect_nested_scopes(token, scopes)
+
+
+def _sanitize(statements: List[Statement]) -> str:
+    """
+    Parse edilmiş ifadeleri sqlparse.format(**SANITIZE_OPTIONS) ile aynı
+    şekilde biçimlendir (ifadeler yerinde değiştirilir)
+    """
+    stack = formatter.build_filter_stack(
+        sqlparse.engine.FilterStack(), formatter.validate_options(dict(SANITIZE_OPTIONS))
+    )
+    stack.postprocess.append(filters.SerializerUnicode())
+    
+    output = []
+    for statement in statements:
+        for token in statement.flatten():
+            if token.ttype in Keyword:
+                token.value = token.value.upper()
+        for filter_ in stack.stmtprocess:
+            filter_.process(statement)
+        for filter_ in stack.postprocess:
+            statement = filter_.process(statement)
+        output.append(str(statement))
+    return "".join(output).strip()
+
+
+def analyze_sql(sql: str) -> SQLAnalysis:
+    """
+    SQL'i bir kez parse edip validasyon, tablo çıkarma, karmaşıklık ve
+    sanitize için gereken tüm bilgiyi üret
+    
+    Args:
+        sql: SQL metni
+    
+    Returns:
+        SQLAnalysis
+    """
+    statements = [s for s in sqlparse.parse(sql) if not _is_blank(s)]
+    
+    counter = _Counter()
+    tables = []
+    table_refs: List[TableRef] = []
+    column_refs: List[ColumnRef] = []
+    defined: Set[str] = set()
+    opaque = False
+    scopes: List[QueryScope] = []
+    for statement in statements:
+        counter.walk(statement)
+        _collect_scopes(statement, None, True, scopes)
+        ctes = _cte_names(statement)
+        for identifier in iter_table_identifiers(statement):
+            name = identifier.get_real_name()
+            if not name or name.lower() in ctes:
+                continue
+            parent = identifier.get_parent_name()
+            tables.append(f"{parent}.{name}" if parent else name)
+        
+        # Sanitize ağacı değiştirmeden önce toplanır
+        statement_tables, statement_columns, statement_defined, statement_opaque = (
+            _collect_references(statement, ctes)
+        )
+        table_refs.extend(ref for ref in statement_tables if ref.name not in ctes)
+        column_refs.extend(statement_columns)
+        defined.update(statement_defined)
+        opaque = opaque or statement_opaque
+    
+    statement_types = tuple(_statement_type(s) for s in statements)
+    
+    return SQLAnalysis(
+        sql=sql,
+        statement_types=statement_types,
+        tables=tuple(dict.fromkeys(tables)),
+        join_count=counter.joins,
+        union_count=counter.unions,
+        subquery_count=counter.subqueries,
+        group_by_count=counter.group_by,
+        having_count=counter.having,
+        open_parens=counter.open_parens,
+        close_parens=counter.close_parens,
+        # Ağaç yerinde değiştiği için en son üretilir
+        sanitized=_sanitize(statements),
+        table_refs=tuple(dict.fromkeys(table_refs)),
+        column_refs=tuple(dict.fromkeys(column_refs)),
+        defined_names=frozenset(defined),
+        opaque_sources=opaque,
+        scopes=tuple(scopes),
+    )
@@ -1,5 +1,6 @@
 """SQL validasyon kuralları"""
 
+import hashlib
 from typing import Set
 
 # Yasaklı SQL komutları (blacklist)
@@ -55,3 +56,13 @@ MAX_QUERY_LENGTH = 5000  # Maksimum sorgu uzunluğu (karakter)
 DEFAULT_TIMEOUT = 30  # Saniye
 DEFAULT_ROW_LIMIT = 1000  # Maksimum döndürülecek satır sayısı
 
+# Kuralların içeriğinden üretilen sürüm (validasyon önbelleği anahtarına girer;
+# yukarıdaki listeler veya limitler değişince eski sonuçlar kullanılmaz)
+RULES_VERSION = hashlib.sha256(repr((
+    sorted(FORBIDDEN_KEYWORDS),
+    sorted(FORBIDDEN_FUNCTIONS),
+    MAX_JOINS,
+    MAX_SUBQUERIES,
+    MAX_UNIONS,
+    MAX_QUERY_LENGTH,
+)).encode("utf-8")).hexdigest()[:12]
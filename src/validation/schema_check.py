@@ -0,0 +1,249 @@
+"""SQL'deki tablo ve kolon adlarının schema'ya karşı statik kontrolü"""
+
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+import sqlparse
+from sqlparse.tokens import Name
+from .analyzer import SQLAnalysis
+
+
+# Öneri sayılacak en büyük edit mesafesi: adın uzunluğunun bu oranı (en az 1)
+MAX_DISTANCE_RATIO = 0.4
+
+MAX_SUGGESTIONS = 3
+
+# Yerel düzeltmede en fazla kaç tur ad değiştirileceği
+MAX_REPAIR_ROUNDS = 3
+
+# Kolonları schema sözlüğünde olmayan, salt okunur PostgreSQL katalog schema'ları
+SYSTEM_SCHEMAS = frozenset({"pg_catalog", "information_schema"})
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    İki ad arasındaki Damerau-Levenshtein (komşu harf yer değiştirmeli) mesafesi
+    
+    Args:
+        a: Birinci ad
+        b: İkinci ad
+    
+    Returns:
+        Ekleme, silme, değiştirme ve yer değiştirme sayısı
+    """
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def closest_matches(name: str, vocabulary: Iterable[str]) -> List[Tuple[str, int]]:
+    """
+    Ada en yakın sözlük kelimelerini bul
+    
+    Args:
+        name: Bilinmeyen ad
+        vocabulary: Aday adlar
+    
+    Returns:
+        Mesafeye göre sıralı (ad, mesafe) listesi (en fazla MAX_SUGGESTIONS)
+    """
+    limit = max(1, int(len(name) * MAX_DISTANCE_RATIO))
+    matches = []
+    for candidate in set(vocabulary):
+        # Uzunluk farkı mesafenin alt sınırıdır
+        if abs(len(candidate) - len(name)) > limit:
+            continue
+        distance = edit_distance(name, candidate)
+        if distance <= limit:
+            matches.append((candidate, distance))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches[:MAX_SUGGESTIONS]
+
+
+class SchemaIssue(NamedTuple):
+    """Schema'da bulunamayan bir referans"""
+    
+    kind: str  # "table", "qualifier" veya "column"
+    reference: str  # Sorguda yazıldığı şekliyle ("o.totl")
+    name: str  # Bulunamayan çıplak ad ("totl")
+    suggestions: Tuple[str, ...]
+    # En yakın öneri tek ve açıksa yerel düzeltmede kullanılacak ad
+    repair: Optional[str]
+    
+    @property
+    def message(self) -> str:
+        """Kullanıcıya ve LLM'e gösterilecek hata mesajı"""
+        labels = {"table": "tablo", "qualifier": "tablo veya alias", "column": "kolon"}
+        message = f"Bilinmeyen {labels[self.kind]}: {self.reference}."
+        if self.suggestions:
+            message += f" Bunu mu demek istediniz: {', '.join(self.suggestions)}?"
+        return message
+
+
+def _issue(kind: str, reference: str, name: str, vocabulary: Iterable[str]) -> SchemaIssue:
+    """Öneriler ve tek açık düzeltme ile SchemaIssue oluştur"""
+    matches = closest_matches(name, vocabulary)
+    repair = None
+    if matches and (len(matches) == 1 or matches[0][1] < matches[1][1]):
+        repair = matches[0][0]
+    return SchemaIssue(kind, reference, name, tuple(match for match, _ in matches), repair)
+
+
+class SchemaCatalog:
+    """get_full_schema çıktısından üretilen tablo ve kolon adı sözlüğü"""
+    
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Sözlüğü oluştur
+        
+        Args:
+            schema: SchemaManager.get_full_schema çıktısı
+        """
+        self.columns: Dict[str, Set[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        
+        for key, table_info in schema.items():
+            key = key.lower()
+            table_name = (table_info.get("name") or key.rsplit(".", 1)[-1]).lower()
+            self.columns[key] = {
+                column["name"].lower() for column in table_info.get("columns", [])
+            }
+            self._by_name.setdefault(table_name, []).append(key)
+            schema_name = table_info.get("schema")
+            if schema_name and "." not in key:
+                self._by_name.setdefault(f"{schema_name.lower()}.{table_name}", []).append(key)
+    
+    @property
+    def table_names(self) -> List[str]:
+        """Öneri için çıplak tablo adları"""
+        return [name for name in self._by_name if "." not in name]
+    
+    def resolve(self, schema_name: Optional[str], table_name: str) -> Optional[str]:
+        """
+        Sorgudaki tablo adını schema anahtarına çevir
+        
+        Args:
+            schema_name: Sorgudaki schema niteleyicisi (yoksa None)
+            table_name: Tablo adı
+        
+        Returns:
+            Schema sözlüğündeki anahtar (bulunamazsa None)
+        """
+        name = f"{schema_name}.{table_name}" if schema_name else table_name
+        if name in self.columns:
+            return name
+        keys = self._by_name.get(name)
+        return keys[0] if keys else None
+
+
+def is_system_table(schema_name: Optional[str], table_name: str) -> bool:
+    """
+    Tablo PostgreSQL kataloğuna mı ait (pg_catalog, information_schema veya pg_ önekli)
+    
+    Args:
+        schema_name: Sorgudaki schema niteleyicisi (yoksa None)
+        table_name: Tablo adı
+    
+    Returns:
+        True ise tablo schema sözlüğünde aranmaz
+    """
+    if schema_name is not None:
+        return schema_name in SYSTEM_SCHEMAS
+    return table_name.startswith("pg_")
+
+
+def check_references(analysis: SQLAnalysis, catalog: SchemaCatalog) -> List[SchemaIssue]:
+    """
+    Analizdeki tablo ve kolon referanslarını schema'ya karşı kontrol et
+    
+    Kolonları bilinemeyen kaynaklar (fonksiyonlar, katalog tabloları,
+    sqlparse'ın ayrıştıramadığı tablolar) varsa çıplak kolonlar kontrol
+    edilmez; yanlış alarm vermek yerine kontrol veritabanına bırakılır.
+    
+    Args:
+        analysis: SQLValidator.analyze çıktısı
+        catalog: Schema sözlüğü
+    
+    Returns:
+        Bulunamayan referanslar (hepsi bulunduysa boş liste)
+    """
+    issues: List[SchemaIssue] = []
+    by_qualifier: Dict[str, str] = {}
+    scope_columns: Set[str] = set()
+    system_qualifiers: Set[str] = set()
+    
+    for ref in analysis.table_refs:
+        key = catalog.resolve(ref.schema, ref.name)
+        if key is None and is_system_table(ref.schema, ref.name):
+            system_qualifiers.add(ref.alias or ref.name)
+            continue
+        if key is None:
+            reference = f"{ref.schema}.{ref.name}" if ref.schema else ref.name
+            issues.append(_issue("table", reference, ref.name, catalog.table_names))
+            continue
+        by_qualifier[ref.alias or ref.name] = key
+        scope_columns |= catalog.columns[key]
+    
+    if issues:
+        # Kolonlar ancak tablolar düzeldikten sonra anlamlı kontrol edilir
+        return issues
+    
+    table_names = {ref.name for ref in analysis.table_refs}
+    known_names = analysis.defined_names | table_names | system_qualifiers
+    opaque = bool(analysis.opaque_sources or system_qualifiers)
+    for ref in analysis.column_refs:
+        if ref.qualifier is not None:
+            key = by_qualifier.get(ref.qualifier)
+            if key is not None:
+                if ref.name not in catalog.columns[key]:
+                    issues.append(_issue(
+                        "column", f"{ref.qualifier}.{ref.name}", ref.name, catalog.columns[key]
+                    ))
+            elif ref.qualifier not in known_names and not opaque:
+                issues.append(_issue(
+                    "qualifier", ref.qualifier, ref.qualifier,
+                    list(by_qualifier) + list(analysis.defined_names),
+                ))
+        elif (
+            not opaque
+            and ref.name not in scope_columns
+            and ref.name not in known_names
+        ):
+            issues.append(_issue("column", ref.name, ref.name, scope_columns))
+    
+    return list(dict.fromkeys(issues))
+
+
+def repair_sql(sql: str, replacements: Dict[str, str]) -> str:
+    """
+    SQL'deki adları düzeltmeleriyle değiştir (string ve yorumlara dokunmaz)
+    
+    Args:
+        sql: SQL metni
+        replacements: Küçük harfli bulunamayan ad -> schema'daki ad
+    
+    Returns:
+        Düzeltilmiş SQL
+    """
+    output = []
+    for statement in sqlparse.parse(sql):
+        for token in statement.flatten():
+            if token.ttype in Name and token.value.lower() in replacements:
+                output.append(replacements[token.value.lower()])
+            else:
+                output.append(token.value)
+    return "".join(output)
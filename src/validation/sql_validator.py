@@ -1,14 +1,19 @@
 """SQL sorgu validasyonu ve güvenlik kontrolü"""
 
 import re
-import sqlparse
-from sqlparse.sql import Token, TokenList
-from sqlparse.tokens import Keyword, DML
-from typing import Tuple, List, Optional
+from typing import Dict, Any, Callable, Tuple, List, Optional, Set
+from .analyzer import SQLAnalysis, analyze_sql
+from .schema_check import (
+    MAX_REPAIR_ROUNDS,
+    SchemaCatalog,
+    SchemaIssue,
+    check_references,
+    repair_sql,
+)
+from .validation_cache import ValidationCache
 from .rules import (
     FORBIDDEN_KEYWORDS,
     FORBIDDEN_FUNCTIONS,
-    ALLOWED_KEYWORDS,
     MAX_JOINS,
     MAX_SUBQUERIES,
     MAX_UNIONS,
@@ -17,6 +22,47 @@ from .rules import (
 from ..utils.logger import logger
 
 
+def _alternation(words: Set[str]) -> str:
+    """Kelimeleri en uzun önce gelecek şekilde tek bir regex alternatifine çevir"""
+    return "|".join(
+        re.escape(word).replace(r"\ ", r"\s+")
+        for word in sorted(words, key=len, reverse=True)
+    )
+
+
+def _compile_forbidden_pattern(backslash_escapes: bool) -> "re.Pattern":
+    """
+    Yasaklı komut ve fonksiyonları tek geçişte bulan regex'i derle
+    
+    Yorumlar, string literal'ler ve tırnaklı identifier'lar bütün olarak
+    eşleşip atlanır; böylece içlerindeki kelimeler komut sayılmaz.
+    
+    Args:
+        backslash_escapes: Düz '...' string'lerinde ters bölü kaçışı geçerli mi
+            (standard_conforming_strings kapalı sunucular için)
+    
+    Returns:
+        Derlenmiş regex
+    """
+    plain_string = r"'(?:[^'\\]|\\.|'')*'" if backslash_escapes else r"'(?:[^']|'')*'"
+    return re.compile(
+        r"(?P<comment>--[^\n]*|/\*.*?\*/)"
+        r"|(?P<dollar>(?<![\w$])\$(?P<tag>(?:[^\W\d]\w*)?)\$.*?\$(?P=tag)\$)"
+        r"|(?P<string>(?<![\w$])[Ee]'(?:[^'\\]|\\.|'')*'|" + plain_string + r")"
+        r'|(?P<identifier>"(?:[^"]|"")*")'
+        r"|(?<![\w$])(?P<keyword>" + _alternation(FORBIDDEN_KEYWORDS) + r")(?![\w$])"
+        # Fonksiyonlar önek olarak aranır (pg_sleep_for, dblink_connect de yakalanır)
+        r"|(?P<function>" + _alternation(FORBIDDEN_FUNCTIONS) + r")",
+        re.IGNORECASE | re.DOTALL,
+    )
+
+
+# Modül yüklenirken bir kez derlenir
+_FORBIDDEN_PATTERN = _compile_forbidden_pattern(backslash_escapes=False)
+_FORBIDDEN_PATTERN_BACKSLASH = _compile_forbidden_pattern(backslash_escapes=True)
+_FUNCTION_PATTERN = re.compile(_alternation(FORBIDDEN_FUNCTIONS), re.IGNORECASE)
+
+
 class ValidationError(Exception):
     """SQL validasyon hatası"""
     pass
@@ -25,49 +71,184 @@ class ValidationError(Exception):
 class SQLValidator:
     """SQL sorgu güvenlik validatörü"""
     
-    def __init__(self, strict_mode: bool = True):
+    def __init__(
+        self,
+        strict_mode: bool = True,
+        cache: Optional[ValidationCache] = None,
+        schema_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
         """
         SQL validator'ı başlat
         
         Args:
             strict_mode: True ise daha katı kontroller uygula
+            cache: Validasyon sonucu ve analiz önbelleği (None ise her çağrıda parse edilir)
+            schema_provider: get_full_schema çıktısını döndüren fonksiyon; verilirse
+                tablo ve kolon adları bu schema'ya karşı kontrol edilir
         """
         self.strict_mode = strict_mode
+        self.cache = cache
+        self.schema_provider = schema_provider
+        self._catalog: Optional[SchemaCatalog] = None
+        self._catalog_schema: Optional[Dict[str, Any]] = None
         logger.info("SQLValidator initialized", strict_mode=strict_mode)
     
-    def validate(self, sql: str) -> Tuple[bool, Optional[str]]:
+    def validate(self, sql: str, analysis: Optional[SQLAnalysis] = None) -> Tuple[bool, Optional[str]]:
         """
         SQL sorgusunu doğrula
         
         Args:
             sql: Doğrulanacak SQL sorgusu
+            analysis: Aynı SQL için önceden üretilmiş analiz (None ise parse edilir)
         
         Returns:
             (is_valid, error_message) tuple'ı
         """
+        key = self._cache_key(sql)
+        outcome = self.cache.get_outcome(key) if key is not None else None
+        if outcome is None:
+            outcome = self._validate_rules(sql, analysis, key)
+        
+        # Schema değişebildiği için bu kontrol önbelleğe yazılmaz (analiz önbellekten gelir)
+        if outcome[0] and self.schema_provider is not None:
+            issues = self.check_schema(sql, analysis)
+            if issues:
+                message = " ".join(issue.message for issue in issues)
+                logger.warning("SQL schema check failed", error=message, sql=sql[:100])
+                return False, message
+        
+        return outcome
+    
+    def _validate_rules(
+        self, sql: str, analysis: Optional[SQLAnalysis], key: Optional[bytes]
+    ) -> Tuple[bool, Optional[str]]:
+        """Güvenlik ve karmaşıklık kurallarını uygula ve sonucu önbelleğe koy"""
         try:
-            # Temel kontroller
+            # Temel kontroller (parse öncesi, ham metin üzerinde)
             self._check_length(sql)
-            self._check_forbidden_keywords(sql)
-            self._check_forbidden_functions(sql)
-            self._check_only_select(sql)
+            self._check_forbidden_patterns(sql)
+            
+            # Kalan kontroller tek parse'tan üretilen analizi okur
+            if analysis is None:
+                analysis = self._analyze(sql, key)
+            self._check_only_select(analysis)
             
             # Karmaşıklık kontrolleri
             if self.strict_mode:
-                self._check_complexity(sql)
+                self._check_complexity(analysis)
             
             # SQL syntax kontrolü
-            self._check_syntax(sql)
+            self._check_syntax(analysis)
             
             logger.info("SQL validation passed", sql=sql[:100])
-            return True, None
+            outcome = (True, None)
             
         except ValidationError as e:
             logger.warning("SQL validation failed", error=str(e), sql=sql[:100])
-            return False, str(e)
+            outcome = (False, str(e))
         except Exception as e:
+            # Beklenmeyen hatalar önbelleğe yazılmaz
             logger.error("Unexpected validation error", error=str(e))
             return False, f"Beklenmeyen doğrulama hatası: {str(e)}"
+        
+        if key is not None:
+            self.cache.put_outcome(key, outcome)
+        return outcome
+    
+    def check_schema(self, sql: str, analysis: Optional[SQLAnalysis] = None) -> List[SchemaIssue]:
+        """
+        Tablo ve kolon referanslarını bellekteki schema'ya karşı kontrol et
+        
+        Args:
+            sql: SQL sorgusu
+            analysis: Aynı SQL için önceden üretilmiş analiz (None ise önbellekten/parse ile)
+        
+        Returns:
+            Bulunamayan referanslar ve en yakın adlar (schema yoksa boş liste)
+        """
+        catalog = self._schema_catalog()
+        if catalog is None:
+            return []
+        if analysis is None:
+            analysis = self.analyze(sql)
+        return check_references(analysis, catalog)
+    
+    def suggest_repair(self, sql: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Bulunamayan her ad için tek ve açık bir öneri varsa SQL'i yerelde düzelt
+        
+        Args:
+            sql: Schema kontrolünden geçemeyen SQL
+        
+        Returns:
+            (düzeltilmiş SQL, {yanlış ad: doğru ad}) veya düzeltilemiyorsa None
+        """
+        replacements: Dict[str, str] = {}
+        repaired = sql
+        # Tablo hataları kolonlardan önce raporlandığı için birkaç tur gerekebilir
+        for _ in range(MAX_REPAIR_ROUNDS):
+            issues = self.check_schema(repaired)
+            if not issues:
+                break
+            if any(issue.repair is None for issue in issues):
+                return None
+            round_replacements = {issue.name: issue.repair for issue in issues}
+            replacements.update(round_replacements)
+            repaired = repair_sql(repaired, round_replacements)
+        
+        if not replacements or not self.validate(repaired)[0]:
+            return None
+        
+        logger.info("SQL repaired against schema", replacements=replacements)
+        return repaired, replacements
+    
+    def _schema_catalog(self) -> Optional[SchemaCatalog]:
+        """Schema sözlüğünü getir (schema nesnesi değişince yeniden oluşturulur)"""
+        if self.schema_provider is None:
+            return None
+        
+        try:
+            schema = self.schema_provider()
+        except Exception as e:
+            logger.warning("Schema unavailable for validation", error=str(e))
+            return None
+        if not schema:
+            return None
+        
+        if schema is not self._catalog_schema:
+            self._catalog = SchemaCatalog(schema)
+            self._catalog_schema = schema
+        return self._catalog
+    
+    def analyze(self, sql: str) -> SQLAnalysis:
+        """
+        SQL sorgusunu bir kez parse edip validasyon, sanitize ve tablo
+        çıkarma için gereken bilgileri üret
+        
+        Args:
+            sql: SQL sorgusu
+        
+        Returns:
+            SQLAnalysis (önbellek varsa tekrar eden SQL parse edilmez)
+        """
+        return self._analyze(sql, self._cache_key(sql))
+    
+    def _analyze(self, sql: str, key: Optional[bytes]) -> SQLAnalysis:
+        """Analizi önbellekten getir veya üretip önbelleğe koy"""
+        if key is None:
+            return analyze_sql(sql)
+        
+        analysis = self.cache.get_analysis(key)
+        if analysis is None:
+            analysis = analyze_sql(sql)
+            self.cache.put_analysis(key, analysis)
+        return analysis
+    
+    def _cache_key(self, sql: str) -> Optional[bytes]:
+        """Önbellek açıksa SQL için anahtar üret"""
+        if self.cache is None:
+            return None
+        return self.cache.key(sql, self.strict_mode)
     
     def _check_length(self, sql: str):
         """Sorgu uzunluğunu kontrol et"""
@@ -76,126 +257,92 @@ class SQLValidator:
                 f"Sorgu çok uzun. Maksimum {MAX_QUERY_LENGTH} karakter olmalı."
             )
     
-    def _check_forbidden_keywords(self, sql: str):
-        """Yasaklı anahtar kelimeleri kontrol et"""
-        sql_upper = sql.upper()
+    def _check_forbidden_patterns(self, sql: str):
+        """
+        Yasaklı anahtar kelimeleri ve tehlikeli fonksiyonları tek taramada kontrol et
         
-        for keyword in FORBIDDEN_KEYWORDS:
-            # Kelime sınırlarını kontrol et (örn: "SELECT" != "SELECTED")
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, sql_upper):
-                raise ValidationError(
-                    f"Yasaklı komut tespit edildi: {keyword}. "
-                    f"Sadece SELECT sorguları çalıştırılabilir."
-                )
-    
-    def _check_forbidden_functions(self, sql: str):
-        """Tehlikeli fonksiyonları kontrol et"""
-        sql_lower = sql.lower()
+        Anahtar kelimeler sadece SQL kodunda aranır ('DELETED' gibi değerler
+        ve "update" gibi kolon adları komut sayılmaz). Fonksiyon adları ise
+        query_to_xml gibi string içindeki SQL'i çalıştıran yollara karşı
+        literal ve yorumların içinde de aranır.
+        """
+        patterns = [_FORBIDDEN_PATTERN]
+        if "\\" in sql:
+            # Sunucunun string kaçış ayarı bilinmediği için iki yorum da taranır
+            patterns.append(_FORBIDDEN_PATTERN_BACKSLASH)
         
-        for func in FORBIDDEN_FUNCTIONS:
-            if func.lower() in sql_lower:
-                raise ValidationError(
-                    f"Tehlikeli fonksiyon tespit edildi: {func}. "
-                    f"Bu fonksiyon güvenlik nedeniyle yasaklanmıştır."
-                )
+        for pattern in patterns:
+            for match in pattern.finditer(sql):
+                if match.lastgroup == "keyword":
+                    keyword = " ".join(match.group("keyword").upper().split())
+                    raise ValidationError(
+                        f"Yasaklı komut tespit edildi: {keyword}. "
+                        f"Sadece SELECT sorguları çalıştırılabilir."
+                    )
+                
+                function = match.group("function") or self._function_in(match.group())
+                if function:
+                    raise ValidationError(
+                        f"Tehlikeli fonksiyon tespit edildi: {function.lower()}. "
+                        f"Bu fonksiyon güvenlik nedeniyle yasaklanmıştır."
+                    )
+    
+    @staticmethod
+    def _function_in(text: str) -> Optional[str]:
+        """Yorum, literal veya tırnaklı identifier içindeki yasaklı fonksiyon adı"""
+        found = _FUNCTION_PATTERN.search(text)
+        return found.group() if found else None
     
-    def _check_only_select(self, sql: str):
+    def _check_only_select(self, analysis: SQLAnalysis):
         """Sadece SELECT sorgusu olduğunu doğrula"""
-        parsed = sqlparse.parse(sql)
+        if not analysis.statement_types:
+            raise ValidationError("Boş SQL sorgusu.")
         
-        if not parsed:
-            raise ValidationError("Geçersiz SQL sorgusu.")
-        
-        for statement in parsed:
-            # İlk anlamlı token'ı bul
-            first_token = None
-            for token in statement.tokens:
-                if not token.is_whitespace:
-                    first_token = token
-                    break
-            
-            if first_token is None:
-                raise ValidationError("Boş SQL sorgusu.")
-            
+        for statement_type in analysis.statement_types:
             # SELECT veya WITH ile başlamalı (CTE için)
-            if first_token.ttype is Keyword and first_token.value.upper() in ('SELECT', 'WITH'):
+            if statement_type in ('SELECT', 'WITH'):
                 continue
-            elif isinstance(first_token, TokenList):
-                # TokenList içindeki ilk keyword'ü kontrol et
-                found_valid = False
-                for token in first_token.tokens:
-                    if token.ttype is Keyword:
-                        if token.value.upper() in ('SELECT', 'WITH'):
-                            found_valid = True
-                            break
-                        else:
-                            raise ValidationError(
-                                f"Sadece SELECT sorguları izinlidir. "
-                                f"Tespit edilen: {token.value}"
-                            )
-                
-                # Eğer hiç keyword bulunamadıysa da hata verme, devam et
-                if not found_valid:
-                    # Basit bir kontrol: SQL'de SELECT var mı?
-                    if 'SELECT' not in sql.upper():
-                        raise ValidationError(
-                            "Sorgu SELECT veya WITH ile başlamalıdır."
-                        )
-            # Eğer DML keyword ise kontrol et
-            elif first_token.ttype is not None:
-                # Diğer durumlarda basit kontrol
-                if 'SELECT' not in sql.upper() and 'WITH' not in sql.upper():
-                    raise ValidationError(
-                        "Sorgu SELECT veya WITH ile başlamalıdır."
-                    )
+            if statement_type is None:
+                raise ValidationError("Sorgu SELECT veya WITH ile başlamalıdır.")
+            raise ValidationError(
+                f"Sadece SELECT sorguları izinlidir. "
+                f"Tespit edilen: {statement_type}"
+            )
     
-    def _check_complexity(self, sql: str):
+    def _check_complexity(self, analysis: SQLAnalysis):
         """Sorgu karmaşıklığını kontrol et"""
-        sql_upper = sql.upper()
-        
         # JOIN sayısını kontrol et
-        join_count = len(re.findall(r'\bJOIN\b', sql_upper))
-        if join_count > MAX_JOINS:
+        if analysis.join_count > MAX_JOINS:
             raise ValidationError(
-                f"Çok fazla JOIN kullanıldı ({join_count}). "
+                f"Çok fazla JOIN kullanıldı ({analysis.join_count}). "
                 f"Maksimum {MAX_JOINS} JOIN kullanabilirsiniz."
             )
         
         # Alt sorgu sayısını kontrol et
-        subquery_count = sql.count('(') - sql.count(')')
-        if abs(subquery_count) > MAX_SUBQUERIES:
+        if analysis.subquery_count > MAX_SUBQUERIES:
             raise ValidationError(
-                f"Çok fazla alt sorgu kullanıldı. "
+                f"Çok fazla alt sorgu kullanıldı ({analysis.subquery_count}). "
                 f"Maksimum {MAX_SUBQUERIES} alt sorgu kullanabilirsiniz."
             )
         
         # UNION sayısını kontrol et
-        union_count = len(re.findall(r'\bUNION\b', sql_upper))
-        if union_count > MAX_UNIONS:
+        if analysis.union_count > MAX_UNIONS:
             raise ValidationError(
-                f"Çok fazla UNION kullanıldı ({union_count}). "
+                f"Çok fazla UNION kullanıldı ({analysis.union_count}). "
                 f"Maksimum {MAX_UNIONS} UNION kullanabilirsiniz."
             )
     
-    def _check_syntax(self, sql: str):
+    def _check_syntax(self, analysis: SQLAnalysis):
         """Temel SQL syntax kontrolü"""
-        parsed = sqlparse.parse(sql)
-        
-        if not parsed:
-            raise ValidationError("SQL sorgusu parse edilemedi.")
-        
-        # Parantez dengesini kontrol et
-        open_parens = sql.count('(')
-        close_parens = sql.count(')')
-        if open_parens != close_parens:
+        # Parantez dengesini kontrol et (string içindeki parantezler sayılmaz)
+        if analysis.open_parens != analysis.close_parens:
             raise ValidationError(
                 f"Parantez dengesi hatalı. "
-                f"Açılan: {open_parens}, Kapanan: {close_parens}"
+                f"Açılan: {analysis.open_parens}, Kapanan: {analysis.close_parens}"
             )
         
         # Tırnak dengesini kontrol et
-        single_quotes = sql.count("'")
+        single_quotes = analysis.sql.count("'")
         if single_quotes % 2 != 0:
             raise ValidationError("Tek tırnak dengesi hatalı.")
     
@@ -209,18 +356,7 @@ class SQLValidator:
         Returns:
             Temizlenmiş ve formatlanmış SQL
         """
-        # Fazla boşlukları temizle
-        sql = ' '.join(sql.split())
-        
-        # SQL'i formatla
-        formatted = sqlparse.format(
-            sql,
-            reindent=True,
-            keyword_case='upper',
-            strip_comments=True,
-        )
-        
-        return formatted.strip()
+        return self.analyze(sql).sanitized
     
     def extract_table_names(self, sql: str) -> List[str]:
         """
@@ -230,31 +366,6 @@ class SQLValidator:
             sql: SQL sorgusu
         
         Returns:
-            Tablo isimleri listesi
+            FROM/JOIN ile okunan tablo isimleri (şema nitelikli, CTE'ler hariç)
         """
-        parsed = sqlparse.parse(sql)
-        tables = []
-        
-        for statement in parsed:
-            for token in statement.tokens:
-                if isinstance(token, TokenList):
-                    tables.extend(self._extract_tables_from_token(token))
-        
-        return list(set(tables))  # Tekrarları kaldır
-    
-    def _extract_tables_from_token(self, token: TokenList) -> List[str]:
-        """Token'dan tablo isimlerini çıkar (yardımcı metod)"""
-        tables = []
-        
-        if token.ttype is None:
-            for item in token.tokens:
-                if isinstance(item, TokenList):
-                    tables.extend(self._extract_tables_from_token(item))
-                elif item.ttype is not Keyword and not item.is_whitespace:
-                    # FROM veya JOIN'den sonraki identifier'ları yakala
-                    value = item.value.strip('`"[]')
-                    if value and not value.upper() in ALLOWED_KEYWORDS:
-                        tables.append(value)
-        
-        return tables
-
+        return list(self.analyze(sql).tables)
@@ -0,0 +1,153 @@
+"""SQL validasyon sonuçları ve analizleri için LRU önbellek"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from .analyzer import SQLAnalysis
+from .rules import RULES_VERSION
+from ..config import settings
+
+
+class _Entry:
+    """Bir SQL için saklanan analiz ve validasyon sonucu"""
+    
+    __slots__ = ("analysis", "outcome")
+    
+    def __init__(self):
+        self.analysis: Optional[SQLAnalysis] = None
+        self.outcome: Optional[Tuple[bool, Optional[str]]] = None
+
+
+class ValidationCache:
+    """
+    SQL metninin hash'ine göre validasyon sonucu ve analiz önbelleği
+    
+    Anahtar SQL metni, strict mode ve kural sürümünden (RULES_VERSION)
+    üretilir; rules.py değiştiğinde eski sonuçlar kendiliğinden kullanılmaz.
+    Sonuçlar veritabanına bağlı olmadığı için TTL yoktur, sadece boyut
+    sınırı aşılınca en uzun süredir kullanılmayan girdi atılır.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        """
+        Önbelleği oluştur
+        
+        Args:
+            max_entries: Maksimum girdi sayısı
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    @classmethod
+    def from_settings(cls) -> "ValidationCache":
+        """
+        Ayarlardaki boyutla önbellek oluştur
+        
+        Returns:
+            ValidationCache instance
+        """
+        return cls(max_entries=settings.validation_cache_max_entries)
+    
+    @staticmethod
+    def key(sql: str, strict_mode: bool) -> bytes:
+        """
+        SQL için önbellek anahtarı üret
+        
+        Args:
+            sql: Ham SQL metni
+            strict_mode: Validator'ın strict mode ayarı
+        
+        Returns:
+            SHA-256 özeti
+        """
+        digest = hashlib.sha256(f"{RULES_VERSION}:{int(strict_mode)}:".encode("utf-8"))
+        digest.update(sql.encode("utf-8"))
+        return digest.digest()
+    
+    def get_analysis(self, key: bytes) -> Optional[SQLAnalysis]:
+        """
+        Önbellekteki analizi getir
+        
+        Args:
+            key: key() ile üretilen anahtar
+        
+        Returns:
+            SQLAnalysis (yoksa None)
+        """
+        return self._get(key, "analysis")
+    
+    def get_outcome(self, key: bytes) -> Optional[Tuple[bool, Optional[str]]]:
+        """
+        Önbellekteki validasyon sonucunu getir
+        
+        Args:
+            key: key() ile üretilen anahtar
+        
+        Returns:
+            (is_valid, error_message) tuple'ı (yoksa None)
+        """
+        return self._get(key, "outcome")
+    
+    def put_analysis(self, key: bytes, analysis: SQLAnalysis):
+        """Analizi önbelleğe koy"""
+        self._put(key, "analysis", analysis)
+    
+    def put_outcome(self, key: bytes, outcome: Tuple[bool, Optional[str]]):
+        """Validasyon sonucunu önbelleğe koy"""
+        self._put(key, "outcome", outcome)
+    
+    def clear(self):
+        """Tüm girdileri sil"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Önbellek istatistiklerini getir
+        
+        Returns:
+            İsabet, ıska ve silinme sayıları
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+    
+    def _get(self, key: bytes, field: str) -> Any:
+        """Girdinin bir alanını oku ve LRU sırasını güncelle"""
+        with self._lock:
+            entry = self._entries.get(key)
+            value = getattr(entry, field) if entry is not None else None
+            if value is None:
+                self._misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+    
+    def _put(self, key: bytes, field: str, value: Any):
+        """Girdinin bir alanını yaz; boyut aşılırsa en eski girdiyi at"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            else:
+                self._entries.move_to_end(key)
+            setattr(entry, field, value)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
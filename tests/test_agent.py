@@ -1,10 +1,12 @@
 """Agent modülü testleri"""
 
+import asyncio
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from src.agent.core import QueryAgent
 from src.agent.chain import LLMChainManager
 from src.database.connection import DatabaseConnection
+from src.database.result import QueryResult
 
 
 class TestQueryAgent:
@@ -34,6 +36,58 @@ class TestQueryAgent:
         
         assert len(suggestions) == 5
         assert all(isinstance(q, str) for q in suggestions)
+    
+    @patch('src.agent.core.AsyncQueryExecutor')
+    @patch('src.agent.core.SchemaManager')
+    @patch('src.agent.core.QueryExecutor')
+    @patch('src.agent.core.LLMChainManager')
+    def test_aquery(self, mock_llm, mock_executor, mock_schema, mock_async_executor):
+        """Async sorgu LLM ve veritabanını await ile kullanmalı"""
+        agent = QueryAgent(self.mock_db)
+        agent._cached_schema = "schema"
+        agent.validator = Mock()
+        agent.validator.validate.return_value = (True, None)
+        agent.llm_chain.agenerate_sql = AsyncMock(
+            return_value={"sql": "SELECT 1;", "confidence": 0.9}
+        )
+        agent.llm_chain.aexplain_results = AsyncMock(return_value="Bir sonuç var.")
+        agent.async_executor.aexecute_query = AsyncMock(
+            return_value=QueryResult.from_dicts([{"x": 1}]).with_metadata(cache="miss")
+        )
+        
+        async def run_many():
+            return await asyncio.gather(*(agent.aquery(f"soru {i}") for i in range(3)))
+        
+        results = asyncio.run(run_many())
+        
+        assert all(r["success"] and r["results"] == [{"x": 1}] for r in results)
+        assert results[0]["explanation"] == "Bir sonuç var."
+        assert results[0]["metadata"]["cache"] == "miss"
+        assert agent.async_executor.aexecute_query.await_count == 3
+        agent.llm_chain.generate_sql.assert_not_called()
+    
+    @patch('src.agent.core.SchemaManager')
+    @patch('src.agent.core.QueryExecutor')
+    @patch('src.agent.core.LLMChainManager')
+    def test_query_repairs_unknown_column(self, mock_llm, mock_executor, mock_schema):
+        """Schema'da tek karşılığı olan yanlış kolon adı LLM'e dönmeden düzeltilir"""
+        agent = QueryAgent(self.mock_db)
+        agent._cached_schema = "schema"
+        agent.validator = Mock()
+        agent.validator.validate.return_value = (False, "Bilinmeyen kolon: nmae.")
+        agent.validator.suggest_repair.return_value = (
+            "SELECT name FROM customers", {"nmae": "name"}
+        )
+        agent.llm_chain.generate_sql.return_value = {"sql": "SELECT nmae FROM customers"}
+        agent.executor.execute_query.return_value = QueryResult.from_dicts([{"name": "Ali"}])
+        
+        result = agent.query("müşteri adları", explain_results=False)
+        
+        assert result["success"] is True
+        assert result["sql"] == "SELECT name FROM customers"
+        assert result["metadata"]["sql_repaired"] == {"nmae": "name"}
+        assert agent.executor.execute_query.call_args.kwargs["sql"] == "SELECT name FROM customers"
+        agent.llm_chain.explain_error.assert_not_called()
 
 
 class TestLLMChainManager:
@@ -82,4 +136,15 @@ class TestLLMChainManager:
         
         assert "Test 1" in formatted
         assert "Test 2" in formatted
-
+    
+    @patch('src.agent.chain.ChatGoogleGenerativeAI')
+    def test_format_results_for_llm_iterator(self, mock_gemini):
+        """Iterator sonuçlar sadece ilk satırlar tutularak formatlanmalı"""
+        chain_manager = LLMChainManager()
+        
+        rows = ({"id": i} for i in range(25))
+        formatted = chain_manager._format_results_for_llm(rows, max_rows=10)
+        
+        assert '"id": 9' in formatted
+        assert '"id": 10' not in formatted
+        assert "... ve 15 satır daha." in formatted
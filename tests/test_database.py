@@ -1,9 +1,48 @@
 """Database modülü testleri"""
 
+import asyncio
+import datetime
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+import numpy as np
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from src.database.connection import DatabaseConnection
+import psycopg2
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from src.database.connection import DatabaseConnection, session_options
+from src.database.executor import QueryExecutor, QueryExecutionError, apply_row_cap
+from src.database.pool import ConnectionPool, PoolTimeoutError
+from src.database.async_executor import AsyncQueryExecutor
+from src.database.result import QueryResult
+from src.validation.sql_validator import SQLValidator, ValidationError
+from src.database.admission import AdmissionController, QueryRejectedError, apply_table_sampling
+from src.database.export import copy_statement, export_format_for
+from src.database.plan_store import PlanStore, SlowQueryLog, dominant_nodes, fingerprint_sql
+from src.database.scheduler import QueryScheduler, QueueFullError, QueueTimeoutError
+from src.database.result_cache import ResultCache, TableChangeTracker
 from src.database.schema_manager import SchemaManager
+from src.database.schema_cache import SchemaCache
+from src.database.schema_listener import SchemaChangeListener
+from src.database.schema_index import SchemaIndex, tokenize, turkish_casefold
+from src.database.join_graph import JoinGraph
+from src.database.cost_model import CostModel
+from src.database.schema_renderer import SchemaRenderer, RENDER_STAGES, estimate_tokens
+
+
+def mock_db():
+    """
+    get_cursor ve transaction'ı mock'lanmış, havuzsuz bağlantı oluştur
+    
+    Oturum statement_timeout'u 30 saniyedir; timeout=30 ile kurulan executor
+    sorgu başına SET göndermez.
+    
+    Returns:
+        (bağlantı, get_cursor ile dönen cursor)
+    """
+    db = DatabaseConnection({"host": "h"}, pooled=False, session={"statement_timeout": "30000"})
+    db.get_cursor = MagicMock()
+    db.transaction = MagicMock()
+    return db, db.get_cursor.return_value.__enter__.return_value
 
 
 class TestDatabaseConnection:
@@ -45,6 +84,830 @@ class TestDatabaseConnection:
         
         # Bağlantı kapatılmalı
         mock_conn.close.assert_called()
+    
+    @patch('src.database.connection.psycopg2.connect')
+    def test_session_settings_applied_on_connect(self, mock_connect):
+        """Oturum parametreleri bağlantı açılırken options ile iletilmeli"""
+        db = DatabaseConnection(
+            {"host": "h"},
+            pooled=False,
+            session={"statement_timeout": "30000", "default_transaction_read_only": "on"},
+        )
+        db.connect()
+        
+        options = mock_connect.call_args.kwargs["options"]
+        assert options == "-c statement_timeout=30000 -c default_transaction_read_only=on"
+        assert db.spawn().session == db.session
+        assert session_options({"search_path": "a, b"}) == "-c search_path=a,\\ b"
+
+
+class TestQueryExecutor:
+    """QueryExecutor test sınıfı"""
+    
+    def test_executor_skips_redundant_timeout(self):
+        """Timeout oturum varsayılanıyla aynıysa sorgu başına SET gönderilmemeli"""
+        db, cursor = mock_db()
+        cursor.fetchall.return_value = []
+        
+        QueryExecutor(db, timeout=30)._execute_with_timeout("SELECT 1")
+        assert [c.args[0] for c in cursor.execute.call_args_list] == ["SELECT 1"]
+        
+        cursor.execute.reset_mock()
+        QueryExecutor(db, timeout=5)._execute_with_timeout("SELECT 1")
+        assert cursor.execute.call_args_list[0].args[0] == "SET LOCAL statement_timeout = 5000;"
+    
+    def test_stream_batches(self):
+        """Sonuçlar isimli cursor'dan fetchmany parçalarıyla akıtılmalı"""
+        db, _ = mock_db()
+        conn = db.transaction.return_value.__enter__.return_value
+        named = conn.cursor.return_value
+        named.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+        executor = QueryExecutor(db, timeout=30, max_rows=100)
+        
+        batches = list(executor.stream_batches("SELECT id FROM customers", batch_size=2))
+        
+        assert batches == [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+        assert conn.cursor.call_args.kwargs["name"].startswith("dbqa_stream_")
+        assert named.execute.call_args.args[0].endswith("LIMIT 101;")
+        named.fetchmany.assert_called_with(2)
+        named.close.assert_called_once()
+        
+        named.reset_mock()
+        named.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+        rows = executor.stream_query("SELECT id FROM customers", batch_size=2)
+        assert next(rows) == {"id": 1}
+        rows.close()
+        named.close.assert_called_once()
+        assert named.fetchmany.call_count == 1
+    
+    def test_stream_truncated(self):
+        """Akış max_rows + 1 sınırıyla çalışmalı, fazladan satırı atıp truncated işaretlemeli"""
+        db, _ = mock_db()
+        named = db.transaction.return_value.__enter__.return_value.cursor.return_value
+        executor = QueryExecutor(db, timeout=30, max_rows=3)
+        
+        named.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], []]
+        batches = executor.stream_batches("SELECT id FROM customers", batch_size=2)
+        assert list(batches) == [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+        assert batches.truncated
+        assert named.execute.call_args.args[0].endswith("LIMIT 4;")
+        assert named.fetchmany.call_count == 2
+        
+        named.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], []]
+        rows = executor.stream_query("SELECT id FROM customers", batch_size=2)
+        assert [row["id"] for row in rows] == [1, 2, 3]
+        assert rows.truncated
+        
+        named.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+        rows = executor.stream_query("SELECT id FROM customers", batch_size=2)
+        assert len(list(rows)) == 3 and not rows.truncated
+    
+    def test_apply_row_cap(self):
+        """Sadece dış sorgunun LIMIT'i dikkate alınmalı"""
+        assert apply_row_cap("SELECT a FROM t LIMIT 10", 101) == "SELECT a FROM t LIMIT 10;"
+        assert apply_row_cap("SELECT a FROM t LIMIT 5000;", 101) == "SELECT a FROM t LIMIT 101;"
+        assert apply_row_cap(
+            "SELECT * FROM (SELECT a FROM t LIMIT 5) s WHERE b = 'LIMIT'", 101
+        ).endswith("WHERE b = 'LIMIT' LIMIT 101;")
+        assert apply_row_cap("SELECT limit_count FROM t", 101) == "SELECT limit_count FROM t LIMIT 101;"
+        assert apply_row_cap("SELECT a FROM t LIMIT ALL", 101).startswith("SELECT * FROM (")
+        assert apply_row_cap(
+            "SELECT a FROM t WHERE b > 1 FETCH FIRST 5 ROWS ONLY", 101
+        ).endswith(") AS capped_query\nLIMIT 101;")
+    
+    def test_truncated_flag(self):
+        """Sınırdan fazla satır gelirse sonuç kısaltılıp işaretlenmeli"""
+        db, cursor = mock_db()
+        cursor.description = [("id",)]
+        cursor.fetchall.return_value = [(1,), (2,), (3,)]
+        
+        result = QueryExecutor(db, timeout=30, max_rows=2).execute_query("SELECT id FROM t")
+        assert cursor.execute.call_args.args[0].endswith("LIMIT 3;")
+        assert result == [{"id": 1}, {"id": 2}]
+        assert result.metadata["truncated"] is True
+        
+        result = QueryExecutor(db, timeout=30, max_rows=3).execute_query("SELECT id FROM t")
+        assert len(result) == 3 and result.metadata["truncated"] is False
+    
+    def test_test_query_estimates_cost(self):
+        """test_query karmaşıklığı statik maliyet tahmininden üretmeli"""
+        db, _ = mock_db()
+        executor = QueryExecutor(db, timeout=30)
+        
+        test_result = executor.test_query("SELECT * FROM customers")
+        assert test_result["estimated_complexity"] == "low"
+        assert test_result["estimated_cost"] == 1000
+        assert test_result["tables"] == ["customers"]
+    
+    def test_expensive_query_routed_to_batch(self):
+        """Statik maliyeti eşiği aşan etkileşimli sorgu batch sınıfında sıraya girmeli"""
+        db, cursor = mock_db()
+        cursor.description = [("kind",)]
+        cursor.fetchall.return_value = [("click",)]
+        scheduler = MagicMock()
+        scheduler.slot.return_value.__enter__.return_value = 0.0
+        model = CostModel({"events": {"name": "events", "row_count": 5_000_000, "columns": []}})
+        executor = QueryExecutor(
+            db, timeout=30, scheduler=scheduler, cost_model_provider=lambda: model
+        )
+        executor.batch_cost_threshold = 1e6
+        
+        result = executor.execute_query("SELECT kind FROM events ORDER BY kind")
+        assert scheduler.slot.call_args.args == (None, "batch")
+        assert result.metadata["estimated_cost"] >= 5_000_000
+        assert result.metadata["routed_to_batch"] is True
+        
+        executor.execute_query("SELECT kind FROM customers")
+        assert scheduler.slot.call_args.args == (None, "interactive")
+    
+    def test_capped_browse_not_routed_to_batch(self):
+        """Eklenen satır sınırı büyük tabloyu gezen sorgunun maliyetini de sınırlamalı"""
+        db, cursor = mock_db()
+        cursor.description = [("kind",)]
+        cursor.fetchall.return_value = [("click",)]
+        scheduler = MagicMock()
+        scheduler.slot.return_value.__enter__.return_value = 0.0
+        model = CostModel({"events": {"name": "events", "row_count": 5_000_000, "columns": []}})
+        executor = QueryExecutor(
+            db, timeout=30, max_rows=1000, scheduler=scheduler, cost_model_provider=lambda: model
+        )
+        executor.batch_cost_threshold = 1e6
+        
+        result = executor.execute_query("SELECT kind FROM events")
+        assert scheduler.slot.call_args.args == (None, "interactive")
+        assert result.metadata["estimated_cost"] <= 1001
+        assert result.metadata["estimated_rows"] == 1001
+        assert "routed_to_batch" not in result.metadata
+        
+        preview = executor.test_query("SELECT kind FROM events")
+        assert preview["estimated_cost"] <= 1001
+
+
+class TestQueryResult:
+    """Kolon bazlı QueryResult test sınıfı"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.result = QueryResult.from_rows(
+            ["id", "price", "name", "created", "discount"],
+            [
+                (1, 9.5, "Kalem", datetime.date(2024, 1, 1), None),
+                (2, 12.0, "Defter", datetime.date(2024, 2, 1), Decimal("1.5")),
+            ],
+        )
+    
+    def test_columnar_storage(self):
+        """Sayısal ve tarih kolonları NumPy dizisi, diğerleri liste olmalı"""
+        assert self.result.column("id").dtype == np.int64
+        assert self.result.column("price").dtype == np.float64
+        assert self.result.column("created").dtype == np.dtype("datetime64[D]")
+        assert self.result.column("name") == ["Kalem", "Defter"]
+        assert self.result.column("discount") == [None, Decimal("1.5")]
+    
+    def test_row_views_are_dict_compatible(self):
+        """Satır görünümleri dict gibi davranmalı ve Python tipleri döndürmeli"""
+        row = self.result[1]
+        
+        assert len(self.result) == 2 and bool(self.result)
+        assert row["id"] == 2 and type(row["id"]) is int
+        assert row["created"] == datetime.date(2024, 2, 1)
+        assert list(row.keys()) == ["id", "price", "name", "created", "discount"]
+        assert dict(self.result[0]) == {
+            "id": 1, "price": 9.5, "name": "Kalem",
+            "created": datetime.date(2024, 1, 1), "discount": None,
+        }
+        assert self.result[-1:] == [dict(row)]
+        assert list(self.result.rows())[0] == (1, 9.5, "Kalem", datetime.date(2024, 1, 1), None)
+    
+    def test_empty_result(self):
+        """Boş sonuç kolon adlarını korumalı"""
+        empty = QueryResult.from_rows(["id"], [])
+        
+        assert len(empty) == 0 and not empty
+        assert empty.columns == ["id"]
+        assert empty == []
+
+
+class TestResultCache:
+    """Sonuç önbelleği test sınıfı"""
+    
+    def test_lru_and_ttl(self):
+        """Boyut aşılınca en eski girdi atılmalı, süresi dolan girdi dönmemeli"""
+        cache = ResultCache(max_entries=2, ttl=60)
+        cache.put("q1", "r1", ["a"])
+        cache.put("q2", "r2", ["b"])
+        assert cache.get("q1") == "r1"
+        cache.put("q3", "r3", ["c"])
+        
+        assert cache.get("q2") is None
+        assert cache.get("q1") == "r1" and cache.get("q3") == "r3"
+        
+        expired = ResultCache(ttl=0)
+        expired.put("q", "r", [])
+        assert expired.get("q") is None
+        
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 3 and stats["misses"] == 1
+    
+    def test_invalidate_tables(self):
+        """Değişen tabloyu okuyan girdiler silinmeli, araya giren sorgu yazılmamalı"""
+        cache = ResultCache()
+        cache.put("q1", "r1", ["public.Orders", "customers"])
+        cache.put("q2", "r2", ["products"])
+        generation = cache.generation
+        
+        assert cache.invalidate_tables(["orders"]) == 1
+        assert cache.get("q1") is None and cache.get("q2") == "r2"
+        
+        cache.put("q3", "r3", ["products"], generation=generation)
+        assert cache.get("q3") is None
+    
+    def test_executor_uses_cache(self):
+        """Aynı SQL ikinci kez veritabanına gitmemeli ve metadata'da görünmeli"""
+        db, cursor = mock_db()
+        cursor.description = [("id",)]
+        cursor.fetchall.return_value = [(1,)]
+        executor = QueryExecutor(db, timeout=30, result_cache=ResultCache())
+        
+        first = executor.execute_query("SELECT id FROM customers")
+        second = executor.execute_query("select id  from customers")
+        
+        assert first.metadata["cache"] == "miss"
+        assert second.metadata["cache"] == "hit"
+        assert "duration_ms" in first.metadata and "duration_ms" not in second.metadata
+        assert second == [{"id": 1}]
+        assert cursor.execute.call_count == 1
+        
+        executor.change_tracker = Mock(spec=TableChangeTracker)
+        executor.change_tracker.poll.return_value = {"customers"}
+        assert executor.execute_query("SELECT id FROM customers").metadata["cache"] == "miss"
+    
+    def test_change_tracker(self):
+        """Sayaçları değişen tablolar bulunmalı"""
+        db = MagicMock()
+        cursor = db.get_cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [
+            [{"table_name": "orders", "changes": 5}, {"table_name": "products", "changes": 1}],
+            [{"table_name": "orders", "changes": 7}, {"table_name": "products", "changes": 1}],
+        ]
+        tracker = TableChangeTracker(db, interval=0)
+        
+        assert tracker.poll() == set()
+        assert tracker.poll() == {"orders"}
+
+
+class TestAdmissionController:
+    """EXPLAIN tabanlı kabul kontrolü test sınıfı"""
+    
+    PLAN = {
+        "Node Type": "Aggregate", "Total Cost": 9_500_000.0, "Plan Rows": 1,
+        "Plans": [{
+            "Node Type": "Seq Scan", "Relation Name": "page_views", "Alias": "e",
+            "Total Cost": 8_000_000.0, "Plan Rows": 500_000_000,
+        }],
+    }
+    
+    def test_reject_over_threshold(self):
+        """Tahmini taranan satır sınırı aşarsa sorgu reddedilmeli"""
+        controller = AdmissionController(max_cost=1e7, max_rows=1_000_000)
+        
+        with pytest.raises(QueryRejectedError):
+            controller.evaluate("SELECT COUNT(*) FROM page_views e;", self.PLAN)
+        
+        sql, info = AdmissionController(max_cost=1e7, max_rows=10**9).evaluate("SELECT 1;", self.PLAN)
+        assert sql == "SELECT 1;"
+        assert info["admission"] == "admitted"
+        assert info["plan"]["total_cost"] == 9_500_000.0
+        assert info["plan"]["max_node_rows"] == 500_000_000
+    
+    def test_sample_mode(self):
+        """Örnekleme modunda büyük tablolara TABLESAMPLE eklenmeli"""
+        controller = AdmissionController(max_rows=1_000_000, action="sample", sample_percent=0.5)
+        
+        sql, info = controller.evaluate(
+            "SELECT COUNT(*) FROM page_views e JOIN users u ON u.id = e.user_id LIMIT 1001;", self.PLAN
+        )
+        assert "FROM page_views e TABLESAMPLE SYSTEM (0.5) JOIN users u" in sql
+        assert info["admission"] == "sampled" and info["sampled_tables"] == ["page_views"]
+        
+        assert apply_table_sampling(
+            "SELECT * FROM (SELECT id FROM page_views) s, users", {"page_views"}, 1
+        )[0] == "SELECT * FROM (SELECT id FROM page_views TABLESAMPLE SYSTEM (1)) s, users"
+    
+    def test_limit_stops_scan_early(self):
+        """Limit altındaki bloklamayan tarama sınırı aşsa da kabul edilmeli, Sort varsa edilmemeli"""
+        scan = {
+            "Node Type": "Seq Scan", "Relation Name": "page_views", "Parent Relationship": "Outer",
+            "Total Cost": 8_000_000.0, "Plan Rows": 500_000_000,
+        }
+        browse = {"Node Type": "Limit", "Total Cost": 16.0, "Plan Rows": 1001, "Plans": [scan]}
+        sorted_browse = {
+            "Node Type": "Limit", "Total Cost": 9_000_000.0, "Plan Rows": 1001,
+            "Plans": [{"Node Type": "Sort", "Parent Relationship": "Outer",
+                       "Total Cost": 9_000_000.0, "Plan Rows": 500_000_000, "Plans": [scan]}],
+        }
+        controller = AdmissionController(max_cost=1e7, max_rows=1_000_000)
+        
+        sql, info = controller.evaluate("SELECT * FROM page_views LIMIT 1001;", browse)
+        assert info["admission"] == "admitted"
+        assert info["plan"]["max_node_rows"] == 1001
+        
+        with pytest.raises(QueryRejectedError):
+            controller.evaluate("SELECT * FROM page_views ORDER BY ts LIMIT 1001;", sorted_browse)
+    
+    def test_sample_only_fact_table(self):
+        """Maliyet aşılınca sadece en büyük tarama örneklenmeli, FK -> PK araması örneklenmemeli"""
+        plan = {
+            "Node Type": "Aggregate", "Total Cost": 2e7, "Plan Rows": 1,
+            "Plans": [{
+                "Node Type": "Nested Loop", "Parent Relationship": "Outer",
+                "Total Cost": 1.9e7, "Plan Rows": 5_000_000,
+                "Plans": [
+                    {
+                        "Node Type": "Hash Join", "Parent Relationship": "Outer",
+                        "Total Cost": 1.2e7, "Plan Rows": 5_000_000,
+                        "Plans": [
+                            {"Node Type": "Seq Scan", "Relation Name": "orders",
+                             "Parent Relationship": "Outer", "Plan Rows": 5_000_000},
+                            {"Node Type": "Hash", "Parent Relationship": "Inner", "Plan Rows": 200,
+                             "Plans": [{"Node Type": "Seq Scan", "Relation Name": "regions",
+                                        "Parent Relationship": "Outer", "Plan Rows": 200}]},
+                        ],
+                    },
+                    {"Node Type": "Index Scan", "Relation Name": "customers",
+                     "Parent Relationship": "Inner", "Index Cond": "(customer_id = o.customer_id)",
+                     "Plan Rows": 1},
+                ],
+            }],
+        }
+        controller = AdmissionController(max_cost=1e7, max_rows=10**9, action="sample")
+        
+        sql, info = controller.evaluate(
+            "SELECT SUM(o.total) FROM orders o JOIN customers c ON c.customer_id = o.customer_id "
+            "JOIN regions r ON r.id = c.region_id;", plan
+        )
+        assert info["sampled_tables"] == ["orders"]
+        assert "orders o TABLESAMPLE SYSTEM (1)" in sql
+        assert sql.count("TABLESAMPLE") == 1
+    
+    def test_executor_gate(self):
+        """Executor sorgudan önce EXPLAIN çalıştırıp plan özetini metadata'ya koymalı"""
+        db, cursor = mock_db()
+        cursor.fetchone.return_value = ([{"Plan": self.PLAN}],)
+        cursor.description = [("count",)]
+        cursor.fetchall.return_value = [(5,)]
+        
+        executor = QueryExecutor(db, timeout=30, admission=AdmissionController(max_rows=10**9))
+        result = executor.execute_query("SELECT COUNT(*) FROM page_views")
+        
+        assert cursor.execute.call_args_list[0].args[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert result.metadata["plan"]["total_cost"] == 9_500_000.0
+        
+        executor.admission = AdmissionController(max_rows=1000, action="sample")
+        executor.result_cache = ResultCache()
+        sampled = executor.execute_query("SELECT COUNT(*) FROM page_views")
+        assert sampled.metadata["admission"] == "sampled"
+        assert executor.result_cache.get_stats()["size"] == 0
+        executor.result_cache = None
+        
+        executor.admission = AdmissionController(max_rows=1000)
+        with pytest.raises(QueryRejectedError):
+            executor.execute_query("SELECT COUNT(*) FROM page_views")
+        assert cursor.fetchall.call_count == 2
+
+
+class TestSlowQueryLog:
+    """Yavaş sorgu kaydı ve plan deposu test sınıfı"""
+    
+    ANALYZED_PLAN = {
+        "Plan": {
+            "Node Type": "Sort", "Actual Total Time": 900.0, "Actual Loops": 1, "Actual Rows": 10,
+            "Sort Space Type": "Disk", "Sort Space Used": 20480,
+            "Plans": [{
+                "Node Type": "Seq Scan", "Relation Name": "orders", "Actual Total Time": 700.0,
+                "Actual Loops": 1, "Actual Rows": 1_200_000, "Shared Read Blocks": 5000,
+            }],
+        },
+        "Execution Time": 905.0,
+    }
+    
+    def test_fingerprint_ignores_literals(self):
+        """Sadece literal değerleri farklı sorgular aynı parmak izini almalı"""
+        assert fingerprint_sql("SELECT * FROM t WHERE id = 5 AND city = 'Ankara'") == fingerprint_sql(
+            "select *  from t where id = 42 and city = 'İzmir';"
+        )
+        assert fingerprint_sql("SELECT * FROM t WHERE id IN (1, 2)") == fingerprint_sql(
+            "SELECT * FROM t WHERE id IN (1, 2, 3, 4)"
+        )
+        assert fingerprint_sql("SELECT a FROM t") != fingerprint_sql("SELECT b FROM t")
+    
+    def test_store_and_report(self):
+        """Süreler parmak izine göre birikmeli ve plan düğümleri özetlenmeli"""
+        store = PlanStore(":memory:")
+        store.record_timing("fp1", "SELECT 1", 1500.0, question="Soru")
+        store.record_timing("fp1", "SELECT 1", 500.0)
+        store.record_timing("fp2", "SELECT 2", 3000.0)
+        assert store.needs_plan("fp1")
+        store.save_plan("fp1", self.ANALYZED_PLAN, "analyze")
+        
+        worst = store.worst(order_by="total")
+        assert [r["fingerprint"] for r in worst] == ["fp2", "fp1"]
+        assert worst[1]["calls"] == 2 and worst[1]["avg_ms"] == 1000.0
+        assert worst[1]["question"] == "Soru"
+        assert not store.needs_plan("fp1")
+        
+        nodes = dominant_nodes(worst[1]["plan"]["Plan"])
+        assert nodes[0].startswith("Sort: 200.0 ms") and "diske taştı" in nodes[0]
+        assert nodes[1].startswith("Seq Scan on orders: 700.0 ms, 1200000 satır")
+    
+    def test_capture_in_background(self):
+        """Eşiği aşan sorgunun planı arka planda yakalanmalı, bütçe aşılırsa tahmin saklanmalı"""
+        db = MagicMock()
+        db.spawn.return_value = db
+        cursor = db.get_cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = ([self.ANALYZED_PLAN],)
+        log = SlowQueryLog(db, PlanStore(":memory:"), threshold_ms=100, analyze_budget_ms=2000)
+        
+        assert not log.observe("SELECT 1", 50.0)
+        assert log.observe("SELECT * FROM orders ORDER BY total", 900.0, question="Sipariş")
+        log._worker.shutdown(wait=True)
+        
+        executed = [c.args[0] for c in cursor.execute.call_args_list]
+        assert executed[0] == "SET LOCAL statement_timeout = 2000;"
+        assert executed[1].startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT")
+        assert log.store.worst()[0]["plan_kind"] == "analyze"
+        
+        cursor.execute.side_effect = [None, psycopg2.extensions.QueryCanceledError(
+            "canceling statement due to statement timeout"), None]
+        assert log.capture_plan("SELECT 1")[1] == "estimate"
+    
+    def test_executor_reports_duration(self):
+        """Executor süreyi metadata'ya koymalı ve yavaş sorgu kaydına bildirmeli"""
+        db, cursor = mock_db()
+        cursor.description = [("id",)]
+        cursor.fetchall.return_value = [(1,)]
+        slow_log = Mock(spec=SlowQueryLog)
+        
+        result = QueryExecutor(db, timeout=30, slow_query_log=slow_log).execute_query(
+            "SELECT id FROM t", question="Kaç?"
+        )
+        
+        assert result.metadata["duration_ms"] >= 0
+        assert slow_log.observe.call_args.kwargs["question"] == "Kaç?"
+    
+    def test_executor_reports_timed_out_query(self):
+        """Zaman aşımına uğrayan sorgu da yavaş sorgu kaydına bildirilmeli"""
+        db, cursor = mock_db()
+        cursor.execute.side_effect = psycopg2.extensions.QueryCanceledError(
+            "canceling statement due to statement timeout")
+        slow_log = Mock(spec=SlowQueryLog)
+        
+        with pytest.raises(QueryExecutionError):
+            QueryExecutor(db, timeout=30, slow_query_log=slow_log).execute_query(
+                "SELECT id FROM t", question="Kaç?"
+            )
+        
+        sql, duration_ms = slow_log.observe.call_args.args
+        assert sql.endswith("LIMIT 1001;") and duration_ms >= 0
+        assert slow_log.observe.call_args.kwargs["question"] == "Kaç?"
+    
+    def test_async_executor_reports_timed_out_query(self):
+        """Async executor da zaman aşımına uğrayan sorguyu kayda geçirmeli"""
+        cursor = AsyncMock()
+        cursor.execute.side_effect = psycopg2.extensions.QueryCanceledError(
+            "canceling statement due to statement timeout")
+        conn = MagicMock()
+        conn.cursor.return_value.__aenter__.return_value = cursor
+        pool = MagicMock()
+        pool.connection.return_value.__aenter__.return_value = conn
+        slow_log = Mock(spec=SlowQueryLog)
+        executor = AsyncQueryExecutor(Mock(), timeout=5, pool=pool, slow_query_log=slow_log)
+        
+        with pytest.raises(QueryExecutionError):
+            asyncio.run(executor.aexecute_query("SELECT id FROM t"))
+        
+        assert slow_log.observe.call_args.args[0].endswith("LIMIT 1001;")
+
+
+class TestQueryScheduler:
+    """Öncelikli ve kotalı sorgu zamanlayıcı test sınıfı"""
+    
+    def test_fair_ordering(self):
+        """Boşalan yer önce interaktif sınıfa, sonra en az sorgusu çalışan kullanıcıya verilmeli"""
+        scheduler = QueryScheduler(max_concurrent=2, per_user_concurrency=2)
+        order = []
+        
+        def enqueue(name, user, priority="interactive"):
+            return scheduler._enqueue(user, priority, lambda: order.append(name))
+        
+        first, second = enqueue("ayse-1", "ayse"), enqueue("ayse-2", "ayse")
+        ali_batch = enqueue("ali-batch", "ali", "batch")
+        ali_1, ali_2 = enqueue("ali-1", "ali"), enqueue("ali-2", "ali")
+        veli = enqueue("veli-1", "veli")
+        assert order == ["ayse-1", "ayse-2"]
+        
+        scheduler._release(first)
+        assert order[-1] == "ali-1"
+        scheduler._release(second)
+        # ali'nin zaten çalışan sorgusu var; sıra veli'ye geçer
+        assert order[-1] == "veli-1"
+        scheduler._release(ali_1)
+        assert order[-1] == "ali-2"
+        scheduler._release(veli)
+        assert order[-1] == "ali-batch"
+        assert ali_batch.granted and ali_2.granted
+    
+    def test_quotas(self):
+        """Kullanıcı başına eşzamanlılık ve sıra derinliği sınırları uygulanmalı"""
+        scheduler = QueryScheduler(
+            max_concurrent=4, per_user_concurrency=1, per_user_queue_depth=1, queue_timeout=0.05
+        )
+        
+        with scheduler.slot("ali") as wait:
+            assert wait < 0.05
+            with pytest.raises(QueueTimeoutError):
+                with scheduler.slot("ali"):
+                    pass
+            
+            scheduler._enqueue("ali", "interactive", lambda: None)
+            with pytest.raises(QueueFullError):
+                scheduler._enqueue("ali", "interactive", lambda: None)
+            
+            with scheduler.slot("veli"):
+                assert scheduler.get_stats()["running_by_user"] == {"ali": 1, "veli": 1}
+        
+        stats = scheduler.get_stats()
+        assert stats["timeouts"] == 1 and stats["rejected"] == 1
+    
+    def test_threads_and_asyncio(self):
+        """Thread'ler ve coroutine'ler aynı sınırı paylaşmalı, bekleme süresi ölçülmeli"""
+        import threading
+        scheduler = QueryScheduler(max_concurrent=2, per_user_concurrency=2)
+        peak, running, lock = [0], [0], threading.Lock()
+        
+        def work():
+            with scheduler.slot("ali"):
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                threading.Event().wait(0.01)
+                with lock:
+                    running[0] -= 1
+        
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak[0] == 2
+        
+        async def awork():
+            async with scheduler.aslot("veli") as wait:
+                await asyncio.sleep(0.01)
+                return wait
+        
+        async def main():
+            return await asyncio.gather(*(awork() for _ in range(4)))
+        
+        waits = asyncio.run(main())
+        assert max(waits) >= 0.01
+        assert scheduler.get_stats()["running"] == 0
+    
+    def test_executor_reports_queue_wait(self):
+        """Zamanlayıcı verilirse sıra bekleme süresi metadata'ya eklenmeli"""
+        db, cursor = mock_db()
+        cursor.description = [("id",)]
+        cursor.fetchall.return_value = [(1,)]
+        scheduler = QueryScheduler()
+        
+        result = QueryExecutor(db, timeout=30, scheduler=scheduler).execute_query(
+            "SELECT id FROM t", user="ali"
+        )
+        
+        assert "queue_wait_ms" in result.metadata
+        assert scheduler.get_stats()["granted"] == 1 and scheduler.get_stats()["running"] == 0
+
+
+class TestExport:
+    """COPY ile toplu dışa aktarma test sınıfı"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.db, self.cursor = mock_db()
+        self.cursor.rowcount = 2
+        self.cursor.copy_expert.side_effect = lambda sql, f: f.write(b"id\n1\n2\n")
+    
+    def test_copy_statement(self):
+        """SELECT sunucu tarafında COPY ile sarılmalı"""
+        csv_sql = copy_statement("SELECT id FROM t;", "csv")
+        assert csv_sql == "COPY (\nSELECT id FROM t\n) TO STDOUT WITH (FORMAT csv, HEADER true)"
+        
+        jsonl_sql = copy_statement("SELECT id FROM t", "jsonl")
+        assert "SELECT row_to_json(export_row)::text FROM (\nSELECT id FROM t\n) AS export_row" in jsonl_sql
+        assert jsonl_sql.endswith("TO STDOUT WITH (FORMAT text)")
+        assert export_format_for("out.ndjson") == "jsonl" and export_format_for("out.txt") is None
+    
+    def test_export_csv(self, tmp_path):
+        """CSV çıktısı dosyaya doğrudan akıtılmalı, kullanıcı SQL'inde COPY engelli kalmalı"""
+        executor = QueryExecutor(self.db, timeout=30)
+        target = tmp_path / "out.csv"
+        
+        stats = executor.export_query("SELECT id FROM t", str(target))
+        
+        assert target.read_bytes() == b"id\n1\n2\n"
+        assert stats["rows"] == 2 and stats["bytes"] == 7 and stats["format"] == "csv"
+        copy_sql = self.cursor.copy_expert.call_args.args[0]
+        assert copy_sql.startswith("COPY (\nSELECT id\nFROM t\n) TO STDOUT")
+        assert "LIMIT" not in copy_sql
+        
+        with pytest.raises(ValidationError):
+            executor.export_query("COPY t TO STDOUT", str(target))
+    
+    def test_export_jsonl_multiline_json(self, tmp_path):
+        """Çok satırlı json kolonu tek satırlık JSONL kaydı olarak yazılmalı"""
+        # COPY text çıktısı: json kolonundaki ham satır sonu \n, string içindeki \n ise \\n olur
+        rows = b'{"id":1,"doc":{\\n  "note": "a\\\\nb"\\n}}\n{"id":2,"doc":null}\n'
+        self.cursor.copy_expert.side_effect = lambda sql, f: [
+            f.write(rows[:16]), f.write(rows[16:33]), f.write(rows[33:])
+        ]
+        target = tmp_path / "out.jsonl"
+        
+        stats = QueryExecutor(self.db, timeout=30).export_query(
+            "SELECT id, doc FROM t", str(target), export_format="jsonl"
+        )
+        
+        lines = target.read_bytes().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"id": 1, "doc": {"note": "a\nb"}}, {"id": 2, "doc": None},
+        ]
+        assert stats["bytes"] == len(target.read_bytes())
+    
+    def test_failed_export_keeps_existing_file(self, tmp_path):
+        """Hata durumunda var olan dosya bozulmamalı ve yarım dosya kalmamalı"""
+        target = tmp_path / "out.csv"
+        target.write_bytes(b"old\n")
+        
+        def fail(sql, f):
+            f.write(b"id\n1\n")
+            raise psycopg2.OperationalError("permission denied for table t")
+        
+        self.cursor.copy_expert.side_effect = fail
+        with pytest.raises(QueryExecutionError):
+            QueryExecutor(self.db, timeout=30).export_query("SELECT id FROM t", str(target))
+        
+        assert target.read_bytes() == b"old\n"
+        assert [path.name for path in tmp_path.iterdir()] == ["out.csv"]
+    
+    def test_export_parquet(self, tmp_path):
+        """Parquet server-side cursor parçalarından yazılmalı"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        conn = self.db.transaction.return_value.__enter__.return_value
+        named = conn.cursor.return_value
+        named.fetchmany.side_effect = [[(1, Decimal("2.5"))], [(2, None)], []]
+        named.description = [("id", 23), ("price", 1700)]
+        target = tmp_path / "out.parquet"
+        
+        stats = QueryExecutor(self.db, timeout=30).export_query(
+            "SELECT id, price FROM t", str(target), export_format="parquet", batch_size=1
+        )
+        
+        assert stats["rows"] == 2
+        assert pq.read_table(target).to_pydict() == {"id": [1, 2], "price": [2.5, None]}
+
+
+class TestConnectionPool:
+    """ConnectionPool test sınıfı"""
+    
+    @staticmethod
+    def _mock_conn():
+        conn = Mock()
+        conn.closed = 0
+        conn.get_transaction_status.return_value = 0
+        return conn
+    
+    @patch('src.database.pool.psycopg2.connect')
+    def test_reuse_and_stats(self, mock_connect):
+        """İade edilen bağlantı tekrar kullanılmalı ve istatistikler tutulmalı"""
+        mock_connect.side_effect = lambda **_: self._mock_conn()
+        pool = ConnectionPool({}, min_size=1, max_size=2, health_check_interval=60)
+        pool.open()
+        
+        first = pool.getconn()
+        second = pool.getconn()
+        assert pool.get_stats()["utilization"] == 1.0
+        pool.putconn(first)
+        
+        assert pool.getconn() is first
+        stats = pool.get_stats()
+        assert mock_connect.call_count == 2
+        assert stats["checkouts"] == 3
+        assert stats["in_use"] == 2 and stats["peak_in_use"] == 2
+        pool.putconn(second)
+    
+    @patch('src.database.pool.psycopg2.connect')
+    def test_checkout_timeout(self, mock_connect):
+        """Havuz doluysa bekleme süresi sonunda hata verilmeli"""
+        mock_connect.side_effect = lambda **_: self._mock_conn()
+        pool = ConnectionPool({}, min_size=0, max_size=1, checkout_timeout=0.01)
+        pool.getconn()
+        
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+        assert pool.get_stats()["timeouts"] == 1
+    
+    @patch('src.database.pool.psycopg2.connect')
+    def test_expired_and_unhealthy_connections_replaced(self, mock_connect):
+        """Ömrü dolan veya sağlık kontrolünden geçemeyen bağlantı değiştirilmeli"""
+        mock_connect.side_effect = lambda **_: self._mock_conn()
+        pool = ConnectionPool({}, min_size=0, max_size=1, max_lifetime=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        
+        assert pool.getconn() is not conn
+        conn.close.assert_called_once()
+        
+        pool = ConnectionPool({}, min_size=0, max_size=1, health_check_interval=0)
+        broken = pool.getconn()
+        pool.putconn(broken)
+        broken.cursor.side_effect = psycopg2.OperationalError
+        
+        assert pool.getconn() is not broken
+        assert pool.get_stats()["discarded"] == 1
+    
+    @patch('src.database.pool.psycopg2.connect')
+    def test_pooled_database_connection(self, mock_connect):
+        """Havuz modunda get_cursor bağlantıyı havuza iade etmeli"""
+        mock_connect.side_effect = lambda **_: self._mock_conn()
+        with patch('src.database.pool.settings') as mock_settings:
+            mock_settings.db_pool_min_size = 0
+            mock_settings.db_pool_max_size = 2
+            mock_settings.db_pool_max_lifetime = 3600
+            mock_settings.db_pool_idle_timeout = 600
+            mock_settings.db_pool_checkout_timeout = 1
+            db = DatabaseConnection({"host": "h"}, pooled=True)
+        
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT 1")
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT 1")
+        
+        assert db.spawn() is db
+        assert mock_connect.call_count == 1
+        assert db.get_pool_stats()["in_use"] == 0
+        assert DatabaseConnection({"host": "h"}, pooled=False).get_pool_stats() is None
+
+
+class TestAsyncQueryExecutor:
+    """AsyncQueryExecutor test sınıfı"""
+    
+    def test_aexecute_query(self):
+        """Sorgu async havuzdan alınan bağlantıda LIMIT ile çalışmalı"""
+        cursor = AsyncMock()
+        cursor.description = [SimpleNamespace(name="id")]
+        cursor.fetchall.return_value = [(1,), (2,)]
+        conn = MagicMock()
+        conn.cursor.return_value.__aenter__.return_value = cursor
+        pool = MagicMock()
+        pool.connection.return_value.__aenter__.return_value = conn
+        pool.close = AsyncMock()
+        
+        executor = AsyncQueryExecutor(Mock(), timeout=5, max_rows=10, pool=pool)
+        
+        async def run():
+            rows = await executor.aexecute_query("SELECT id FROM customers")
+            await executor.aclose()
+            return rows
+        
+        assert asyncio.run(run()) == [{"id": 1}, {"id": 2}]
+        executed = [c.args[0] for c in cursor.execute.await_args_list]
+        assert executed[0] == "SET LOCAL statement_timeout = 5000;"
+        assert executed[1].endswith("LIMIT 11;")
+        pool.close.assert_awaited_once()
+    
+    def test_pool_per_event_loop(self):
+        """Ardışık asyncio.run çağrıları kendi loop'larında açılan havuzu kullanmalı"""
+        executor = AsyncQueryExecutor(Mock(), timeout=5, max_rows=10)
+        created = []
+        
+        async def create_pool():
+            pool = MagicMock()
+            pool.close = AsyncMock()
+            created.append(pool)
+            return pool
+        
+        executor._create_pool = create_pool
+        
+        async def run():
+            first = await executor._get_pool()
+            assert await executor._get_pool() is first
+            return first
+        
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+        
+        assert first is not second
+        assert len(created) == 2
 
 
 class TestSchemaManager:
@@ -90,3 +953,562 @@ class TestSchemaManager:
         
         assert schema_manager._schema_cache is None
 
+
+class TestSchemaManagerBulk:
+    """Toplu schema introspection testleri"""
+    
+    def _make_db(self, table_count: int, estimate: int = -1):
+        """Sorgu içeriğine göre sonuç döndüren sahte bağlantı oluştur"""
+        tables = [f"table{i}" for i in range(table_count)]
+        results = {
+            "md5(": [{'fingerprint': 'abc'}],
+            "reltuples": [{'table_name': t, 'estimate': estimate} for t in tables],
+            "pg_stats": [{
+                'table_name': 'table0',
+                'column_name': 'id',
+                'avg_width': 4,
+                'most_common_vals': None,
+                'histogram_bounds': ['1', '50', '100'],
+            }],
+            "TABLESAMPLE": [
+                {'table_name': t, 'column_name': 'parent_id', 'samples': ['7']}
+                for t in tables
+            ],
+            "obj_description": [
+                {'table_name': t, 'comment': f"{t} açıklaması"} for t in tables
+            ],
+            "information_schema.columns": [
+                {
+                    'table_name': t,
+                    'column_name': col,
+                    'data_type': 'integer',
+                    'is_nullable': 'NO' if col == 'id' else 'YES',
+                    'column_default': None,
+                    'comment': None,
+                }
+                for t in tables for col in ('id', 'parent_id')
+            ],
+            "indisprimary": [{'table_name': t, 'attname': 'id'} for t in tables],
+            "indisunique": [
+                {'table_name': t, 'index_name': f"{t}_pkey", 'indisunique': True, 'columns': ['id']}
+                for t in tables
+            ],
+            "contype": [
+                {
+                    'table_name': t,
+                    'column_name': 'parent_id',
+                    'foreign_table_name': 'table0',
+                    'foreign_column_name': 'id',
+                }
+                for t in tables[1:]
+            ],
+        }
+        
+        db = Mock(spec=DatabaseConnection)
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.__exit__.return_value = None
+        executed = []
+        
+        def execute(query, params=None):
+            executed.append(query)
+            text = query if isinstance(query, str) else repr(query)
+            cursor.fetchall.return_value = []
+            for marker, rows in results.items():
+                if marker in text:
+                    cursor.fetchall.return_value = rows
+                    cursor.fetchone.return_value = rows[0] if rows else None
+                    return
+            if "COUNT(*)" in text:
+                cursor.fetchall.return_value = [
+                    {'table_name': t, 'count': 10} for t in tables
+                ]
+        
+        cursor.execute.side_effect = execute
+        db.get_cursor.return_value = cursor
+        return db, executed
+    
+    def test_bulk_schema_structure(self):
+        """Toplu mod tablo bazlı sorgularla aynı yapıyı üretmeli"""
+        db, _ = self._make_db(3)
+        schema = SchemaManager(db).get_full_schema(include_samples=False, bulk=True)
+        
+        assert list(schema) == ['table0', 'table1', 'table2']
+        table = schema['table1']
+        assert table['comment'] == "table1 açıklaması"
+        assert table['row_count'] == 10
+        assert table['primary_key'] == 'id'
+        assert table['foreign_keys'] == [{
+            'column_name': 'parent_id',
+            'foreign_table_name': 'table0',
+            'foreign_column_name': 'id',
+        }]
+        assert [c['name'] for c in table['columns']] == ['id', 'parent_id']
+        assert table['columns'][0]['nullable'] is False
+        assert table['indexes'] == [{'name': 'table1_pkey', 'columns': ['id'], 'unique': True}]
+    
+    def test_bulk_round_trips_constant(self):
+        """Sorgu sayısı tablo sayısıyla artmamalı"""
+        small_db, small_executed = self._make_db(2)
+        large_db, large_executed = self._make_db(50)
+        
+        SchemaManager(small_db).get_full_schema(include_samples=True, bulk=True)
+        SchemaManager(large_db).get_full_schema(include_samples=True, bulk=True)
+        
+        assert len(small_executed) == len(large_executed)
+
+    def test_estimated_row_counts(self):
+        """Eşik üstü tablolarda COUNT(*) yerine planner tahmini kullanılmalı"""
+        db, executed = self._make_db(3, estimate=5_000_000)
+        manager = SchemaManager(db)
+        schema = manager.get_full_schema(include_samples=False, bulk=True, exact_counts=False)
+        
+        assert schema['table0']['row_count'] == 5_000_000
+        assert schema['table0']['row_count_estimated'] is True
+        assert not any("COUNT(*)" in repr(q) for q in executed)
+        assert "~5000000 (tahmini)" in manager.get_schema_for_llm()
+    
+    def test_exact_row_counts_on_request(self):
+        """exact_counts=True ise tahmin kullanılmamalı"""
+        db, _ = self._make_db(2, estimate=5_000_000)
+        schema = SchemaManager(db).get_full_schema(include_samples=False, bulk=True, exact_counts=True)
+        
+        assert schema['table0']['row_count'] == 10
+        assert schema['table0']['row_count_estimated'] is False
+
+    def test_samples_from_pg_stats(self):
+        """Örnekler pg_stats'tan, istatistik yoksa TABLESAMPLE ile alınmalı"""
+        db, executed = self._make_db(2)
+        schema = SchemaManager(db).get_full_schema(include_samples=True, bulk=True)
+        
+        columns = {c['name']: c for c in schema['table0']['columns']}
+        assert columns['id']['sample_values'] == ['1', '50', '100']
+        assert columns['parent_id']['sample_values'] == ['7']
+        assert not any("SELECT DISTINCT" in repr(q) and "TABLESAMPLE" not in repr(q) for q in executed)
+    
+    def test_refresh_tables(self):
+        """Sadece değişen tablolar yenilenmeli, silinen tablolar çıkarılmalı"""
+        db, _ = self._make_db(3)
+        manager = SchemaManager(db)
+        manager.get_full_schema(include_samples=False, bulk=True)
+        manager.get_schema_for_llm()
+        manager._schema_cache['gone'] = {}
+        old_fragment = manager._renderer.fragment('table0', None, RENDER_STAGES[0])
+        cursor = db.get_cursor.return_value
+        cursor.execute.reset_mock()
+        
+        refreshed = manager.refresh_tables(['table1', 'gone'])
+        
+        assert refreshed == ['gone', 'table1']
+        filtered = [c.args[1] for c in cursor.execute.call_args_list if len(c.args) > 1]
+        assert ('public', ['gone', 'table1']) in filtered
+        assert 'gone' not in manager._schema_cache
+        assert manager._renderer.fragment('table0', None, RENDER_STAGES[0]) is old_fragment
+        assert "## Tablo: table1" in manager.get_schema_for_llm()
+    
+    def test_multi_schema_parallel(self):
+        """Birden fazla schema ayrı bağlantılarla incelenip nitelikli adlarla birleşmeli"""
+        db, _ = self._make_db(2)
+        spawned = []
+        
+        def spawn():
+            worker_db, _ = self._make_db(2)
+            spawned.append(worker_db)
+            return worker_db
+        
+        db.spawn.side_effect = spawn
+        manager = SchemaManager(db, schemas=['public', 'sales'])
+        schema = manager.get_full_schema(include_samples=False, bulk=True)
+        
+        assert sorted(schema) == ['public.table0', 'public.table1', 'sales.table0', 'sales.table1']
+        assert schema['sales.table1']['schema'] == 'sales'
+        assert schema['sales.table1']['foreign_keys'][0]['foreign_table_name'] == 'sales.table0'
+        assert len(spawned) == 2
+        assert all(worker.disconnect.called for worker in spawned)
+        assert "## Tablo: sales.table1" in manager.get_schema_for_llm()
+    
+    def test_sample_skip_types(self):
+        """Büyük/ikili tipler için örnek sorgusu yapılmamalı"""
+        schema_manager = SchemaManager(self._make_db(1)[0])
+        
+        assert schema_manager.get_sample_values('docs', 'payload', data_type='jsonb') == []
+
+
+class TestSchemaCache:
+    """Kalıcı schema önbelleği testleri"""
+    
+    def test_roundtrip(self, tmp_path):
+        """Aynı parmak izi ile kaydedilen giriş okunabilmeli"""
+        cache = SchemaCache(str(tmp_path / "schema.json"))
+        cache.save("fp1", {"customers": {"name": "customers"}}, llm_text="metin")
+        
+        entry = cache.load("fp1")
+        assert entry["schema"] == {"customers": {"name": "customers"}}
+        assert entry["llm_text"] == "metin"
+    
+    def test_stale_fingerprint(self, tmp_path):
+        """Parmak izi değiştiyse önbellek kullanılmamalı"""
+        cache = SchemaCache(str(tmp_path / "schema.json"))
+        cache.save("fp1", {})
+        
+        assert cache.load("fp2") is None
+        assert SchemaCache(str(tmp_path / "missing.json")).load("fp1") is None
+    
+    def test_warm_start_single_query(self, tmp_path):
+        """Önbellek geçerliyse schema tek sorgu ile yüklenmeli"""
+        cache = SchemaCache(str(tmp_path / "schema.json"))
+        
+        cold_db, _ = TestSchemaManagerBulk()._make_db(3)
+        cold = SchemaManager(cold_db, cache=cache)
+        llm_text = cold.get_schema_for_llm()
+        
+        warm_db, executed = TestSchemaManagerBulk()._make_db(3)
+        warm = SchemaManager(warm_db, cache=cache)
+        
+        assert warm.get_schema_for_llm() == llm_text
+        assert len(executed) == 1
+
+
+class TestSchemaChangeListener:
+    """Schema değişiklik dinleyicisi testleri"""
+    
+    def test_parse_payload(self):
+        """Bildirimden sadece izlenen schema'nın tabloları alınmalı"""
+        listener = SchemaChangeListener(Mock(spec=DatabaseConnection), on_change=Mock())
+        
+        assert listener.parse_payload('{"schema": "public", "table": "orders"}') == 'orders'
+        assert listener.parse_payload('{"schema": "audit", "table": "orders"}') is None
+        assert listener.parse_payload('not json') is None
+    
+    def test_parse_payload_qualified(self):
+        """Çoklu schema modunda nitelikli anahtar döndürülmeli"""
+        listener = SchemaChangeListener(
+            Mock(spec=DatabaseConnection), on_change=Mock(), schemas=None, qualify_names=True
+        )
+        
+        assert listener.parse_payload('{"schema": "sales", "table": "orders"}') == 'sales.orders'
+    
+    def test_run_reconnects_after_unexpected_error(self):
+        """psycopg2 dışı hatalardan sonra da yeniden bağlanılmalı"""
+        listener = SchemaChangeListener(Mock(spec=DatabaseConnection), on_change=Mock())
+        listener.db.connection_params = {}
+        listener._stop_event.wait = Mock()
+        
+        def listen(conn):
+            if listen.calls == 0:
+                listen.calls += 1
+                raise OSError("bad file descriptor")
+            listener._stop_event.set()
+        listen.calls = 0
+        listener._listen = listen
+        
+        with patch('src.database.schema_listener.psycopg2.connect') as connect:
+            listener._run()
+        
+        assert connect.call_count == 2
+        listener._stop_event.wait.assert_called_once_with(1.0)
+
+
+class TestSchemaIndex:
+    """BM25 schema indeksi testleri"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.schema = {
+            "customers": {
+                "comment": "Müşteri bilgilerini içerir",
+                "columns": [
+                    {"name": "customer_id", "comment": None},
+                    {"name": "city", "comment": "Müşterinin bulunduğu şehir",
+                     "sample_values": ["İstanbul", "Ankara"]},
+                ],
+                "foreign_keys": [],
+            },
+            "orders": {
+                "comment": "Müşteri siparişleri",
+                "columns": [{"name": "order_id", "comment": None}],
+                "foreign_keys": [{
+                    "column_name": "customer_id",
+                    "foreign_table_name": "customers",
+                    "foreign_column_name": "customer_id",
+                }],
+            },
+            "products": {
+                "comment": "Satışa sunulan ürünler",
+                "columns": [{"name": "price", "comment": None}],
+                "foreign_keys": [],
+            },
+        }
+    
+    def test_turkish_casefold(self):
+        """İ/ı dönüşümü Türkçe kurallarına uygun olmalı"""
+        assert turkish_casefold("İSTANBUL") == "istanbul"
+        assert turkish_casefold("IĞDIR") == "ığdır"
+        assert "müşte" in tokenize("Müşterimiz")
+    
+    def test_search_ranks_relevant_table(self):
+        """Soruyla ilgili tablo ilk sırada gelmeli"""
+        index = SchemaIndex(self.schema)
+        
+        assert index.search("İstanbul'dan kaç müşteri var?", top_k=1)[0][0] == "customers"
+        assert index.search("En pahalı ürünler", top_k=1)[0][0] == "products"
+        assert index.search("xyz", top_k=3) == []
+    
+    def test_find_relevant_tables_adds_fk_neighbours(self):
+        """Seçilen tablolara FK ile bağlı tablolar da eklenmeli"""
+        manager = SchemaManager(Mock(spec=DatabaseConnection))
+        manager._schema_cache = self.schema
+        
+        tables = manager.find_relevant_tables("siparişler", top_k=1)
+        
+        assert tables == ["customers", "orders"]
+
+
+class TestJoinGraph:
+    """Foreign key JOIN grafı testleri"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        def fk(column, table):
+            return {"column_name": column, "foreign_table_name": table, "foreign_column_name": "id"}
+        
+        self.schema = {
+            "customers": {"foreign_keys": []},
+            "orders": {"foreign_keys": [fk("customer_id", "customers")]},
+            "order_items": {"foreign_keys": [fk("order_id", "orders"), fk("product_id", "products")]},
+            "products": {"foreign_keys": [fk("category_id", "categories")]},
+            "categories": {"foreign_keys": [fk("parent_category_id", "categories")]},
+            "logs": {"foreign_keys": []},
+        }
+    
+    def test_shortest_path(self):
+        """Uzak iki tablo arasındaki en kısa yol bulunmalı"""
+        graph = JoinGraph(self.schema)
+        path = graph.path("customers", "products")
+        
+        assert [edge.condition() for edge in path] == [
+            "orders.customer_id = customers.id",
+            "order_items.order_id = orders.id",
+            "order_items.product_id = products.id",
+        ]
+        assert graph.path("customers", "logs") is None
+    
+    def test_connect_adds_intermediate_tables(self):
+        """Bağlanan tablolar arasındaki ara tablolar eklenmeli"""
+        tables, edges = JoinGraph(self.schema).connect(["customers", "categories"])
+        
+        assert set(tables) == {"customers", "orders", "order_items", "products", "categories"}
+        assert len(edges) == 4
+    
+    def test_connect_orients_edges_toward_new_table(self):
+        """JOIN edilen tablo, yolun hangi yönde yürüdüğünden bağımsız olarak yeni tablo olmalı"""
+        _, forward = JoinGraph(self.schema).connect(["customers", "order_items"])
+        _, backward = JoinGraph(self.schema).connect(["order_items", "customers"])
+        
+        assert [(edge.table, edge.condition()) for edge in forward] == [
+            ("orders", "orders.customer_id = customers.id"),
+            ("order_items", "order_items.order_id = orders.id"),
+        ]
+        assert [(edge.table, edge.condition()) for edge in backward] == [
+            ("orders", "orders.id = order_items.order_id"),
+            ("customers", "customers.id = orders.customer_id"),
+        ]
+    
+    def test_join_hints_name_new_table(self):
+        """LLM'e verilen JOIN önerisi sorguya eklenecek tabloyu göstermeli"""
+        manager = SchemaManager(Mock(spec=DatabaseConnection))
+        manager._schema_cache = {
+            name: {**info, "columns": [], "comment": None} for name, info in self.schema.items()
+        }
+        
+        text = manager.get_schema_for_llm(tables=["customers", "orders"])
+        
+        assert "- JOIN orders ON orders.customer_id = customers.id\n" in text
+
+
+class TestCostModel:
+    """Schema istatistikleriyle statik maliyet tahmini testleri"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        def columns(*names):
+            return [{"name": name} for name in names]
+        
+        self.model = CostModel({
+            "customers": {
+                "name": "customers", "row_count": 10_000, "primary_key": "customer_id",
+                "indexes": [{"name": "customers_pkey", "columns": ["customer_id"], "unique": True}],
+                "columns": columns("customer_id", "city"),
+            },
+            "orders": {
+                "name": "orders", "row_count": 1_000_000, "primary_key": "order_id",
+                "indexes": [
+                    {"name": "orders_pkey", "columns": ["order_id"], "unique": True},
+                    {"name": "orders_customer_idx", "columns": ["customer_id", "status"], "unique": False},
+                ],
+                "columns": columns("order_id", "customer_id", "status"),
+            },
+        })
+        self.validator = SQLValidator(strict_mode=False)
+    
+    def estimate(self, sql):
+        return self.model.estimate(self.validator.analyze(sql))
+    
+    def test_index_lookup_vs_seq_scan(self):
+        """Index'li kolonda arama tablonun tamamını taramamalı"""
+        lookup = self.estimate("SELECT * FROM orders WHERE order_id = 5")
+        seq_scan = self.estimate("SELECT * FROM orders WHERE status = 'paid'")
+        
+        assert lookup.rows == 1 and lookup.cost < 100
+        assert seq_scan.scans == {"orders": 1_000_000}
+        assert seq_scan.rows == 5000
+    
+    def test_join_blowup(self):
+        """FK -> PK JOIN çoğalmamalı, unique olmayan kolonda JOIN çoğalmalı"""
+        fk_join = self.estimate(
+            "SELECT * FROM customers c JOIN orders o ON o.customer_id = c.customer_id "
+            "WHERE c.city = 'Ankara'"
+        )
+        blowup = self.estimate("SELECT * FROM orders a JOIN orders b ON a.status = b.status")
+        cross = self.estimate("SELECT * FROM customers, orders")
+        
+        assert fk_join.rows == pytest.approx(5000)
+        # Filtrelenmiş müşteriler için orders index ile aranır
+        assert fk_join.scans["orders"] < 10_000
+        assert fk_join.level == "medium"
+        assert blowup.rows == pytest.approx(1_000_000 ** 2 / 200)
+        assert cross.rows == 10_000 * 1_000_000
+        assert blowup.level == cross.level == "high"
+    
+    def test_subqueries_are_separate_scopes(self):
+        """Alt sorgu ve CTE ayrı kapsamdır; dış sorguyla kartezyen çarpılmaz"""
+        semi_join = self.estimate(
+            "SELECT * FROM customers WHERE customer_id IN "
+            "(SELECT customer_id FROM orders WHERE status = 'paid')"
+        )
+        cte = self.estimate(
+            "WITH totals AS (SELECT customer_id, COUNT(*) FROM orders GROUP BY customer_id) "
+            "SELECT * FROM customers c JOIN totals t ON t.customer_id = c.customer_id"
+        )
+        
+        assert semi_join.rows == pytest.approx(500)
+        assert semi_join.cost < 2_000_000
+        assert cte.scans["orders"] == 1_000_000
+        assert cte.rows == pytest.approx(200)
+    
+    def test_limit_and_aggregate_rows(self):
+        """LIMIT ve GROUP BY'sız aggregate sonuç satırını sınırlamalı, taramayı değil"""
+        count = self.estimate("SELECT count(*) FROM orders")
+        limited = self.estimate("SELECT * FROM orders LIMIT 10")
+        window = self.estimate("SELECT order_id, count(*) OVER () FROM orders")
+        union = self.estimate(
+            "SELECT customer_id FROM orders UNION ALL SELECT customer_id FROM customers LIMIT 50"
+        )
+        cte = self.estimate(
+            "WITH recent AS (SELECT * FROM orders ORDER BY order_id DESC LIMIT 100) "
+            "SELECT * FROM recent r JOIN customers c ON c.customer_id = r.customer_id"
+        )
+        
+        assert count.rows == 1 and count.scans == {"orders": 1_000_000}
+        assert limited.rows == 10 and limited.cost == pytest.approx(10)
+        assert window.rows == 1_000_000
+        assert union.rows == 50
+        assert cte.rows == pytest.approx(100)
+    
+    def test_limit_bounds_streaming_scan(self):
+        """ORDER BY/GROUP BY/aggregate yoksa LIMIT taramayı ve JOIN işini de kısaltmalı"""
+        joined = self.estimate(
+            "SELECT * FROM customers c JOIN orders o ON o.customer_id = c.customer_id LIMIT 10"
+        )
+        full_join = self.estimate(
+            "SELECT * FROM customers c JOIN orders o ON o.customer_id = c.customer_id"
+        )
+        ordered = self.estimate("SELECT * FROM orders ORDER BY status LIMIT 10")
+        distinct = self.estimate("SELECT DISTINCT customer_id FROM orders LIMIT 10")
+        grouped = self.estimate("SELECT status, count(*) FROM orders GROUP BY status LIMIT 10")
+        union = self.estimate(
+            "SELECT customer_id FROM orders UNION SELECT customer_id FROM customers LIMIT 10"
+        )
+        
+        assert self.estimate("SELECT * FROM orders LIMIT 10").level == "low"
+        assert joined.cost < full_join.cost / 100
+        assert ordered.scans == {"orders": 1_000_000}
+        assert distinct.scans == {"orders": 1_000_000}
+        assert grouped.scans == {"orders": 1_000_000}
+        assert union.scans == {"orders": 1_000_000, "customers": 10_000}
+    
+    def test_missing_statistics(self):
+        """Bilinmeyen tablolar varsayılan boyutta, index'siz eski önbellek PK ile tahmin edilir"""
+        model = CostModel({"t": {"name": "t", "row_count": 1_000_000, "primary_key": "id", "columns": []}})
+        
+        assert model.estimate(self.validator.analyze("SELECT * FROM t WHERE id = 1")).cost < 100
+        assert model.estimate(self.validator.analyze("SELECT * FROM unknown")).cost == 1000
+        assert model.estimate(self.validator.analyze("SELECT * FROM unknown")).level == "low"
+
+
+class TestSchemaRenderer:
+    """Token bütçeli schema renderer testleri"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        def column(name, comment="", samples=None):
+            return {"name": name, "type": "integer", "nullable": True,
+                    "comment": comment, "sample_values": samples or []}
+        
+        self.schema = {
+            f"table{i}": {
+                "comment": "Uzun bir tablo açıklaması " * 3,
+                "row_count": 10,
+                "primary_key": "id",
+                "columns": [column("id"), column("parent_id")] + [
+                    column(f"col{j}", comment="kolon açıklaması", samples=["a", "b", "c"])
+                    for j in range(8)
+                ],
+                "foreign_keys": [{"column_name": "parent_id", "foreign_table_name": "table0",
+                                  "foreign_column_name": "id"}],
+            }
+            for i in range(20)
+        }
+    
+    def test_unlimited_budget_is_full(self):
+        """Bütçe yoksa örnekler ve açıklamalar dahil tam metin üretilmeli"""
+        text = SchemaRenderer().render(self.schema)
+        
+        assert "Örnek değerler: a, b, c" in text
+        assert "kolon açıklaması" in text
+        assert text.count("## Tablo:") == 20
+    
+    def test_degrades_to_fit_budget(self):
+        """Bütçe küçüldükçe önce örnekler, sonra açıklamalar, sonra kolonlar atılmalı"""
+        renderer = SchemaRenderer()
+        full = estimate_tokens(renderer.render(self.schema))
+        
+        no_samples = renderer.render(self.schema, budget=full - 1)
+        assert "Örnek değerler" not in no_samples
+        assert "kolon açıklaması" in no_samples
+        
+        keys_only = renderer.render(self.schema, budget=estimate_tokens(no_samples) // 2)
+        assert "**col0**" not in keys_only
+        assert "(+8 kolon daha)" in keys_only
+        assert "parent_id → table0.id" in keys_only
+        
+        for budget in (full // 10, 300, 50, 10, 5, 1, 0):
+            assert estimate_tokens(renderer.render(self.schema, budget=budget)) <= budget
+    
+    def test_names_only_keeps_most_relevant(self):
+        """İsim listesi bile sığmazsa en ilgili tablolar kalmalı"""
+        text = SchemaRenderer().render(
+            self.schema, budget=20, relevance={"table7": 2.0, "table3": 1.0}
+        )
+        
+        assert "- table7\n- table3\n" in text
+        assert "tablo daha" in text
+    
+    def test_compact_level(self):
+        """Kompakt seviye her tabloyu tek satırda göstermeli"""
+        text = SchemaRenderer().render(self.schema, level="compact")
+        
+        assert "- table1(id PK, parent_id, col0" in text
+        assert "FK: parent_id→table0.id" in text
+        with pytest.raises(ValueError):
+            SchemaRenderer().render(self.schema, level="tiny")
@@ -1,7 +1,11 @@
 """SQL Validator testleri"""
 
 import pytest
+from unittest.mock import patch
 from src.validation.sql_validator import SQLValidator, ValidationError
+from src.validation.analyzer import ColumnRef
+from src.validation.schema_check import edit_distance
+from src.validation.validation_cache import ValidationCache
 
 
 class TestSQLValidator:
@@ -100,3 +104,310 @@ class TestSQLValidatorStrictMode:
         # Karmaşıklık limiti aşılmalı
         assert is_valid is False or "JOIN" in str(error)
 
+
+
+class TestSQLAnalysis:
+    """Tek geçişli SQL analizi testleri"""
+    
+    def setup_method(self):
+        self.validator = SQLValidator(strict_mode=True)
+    
+    def test_counts_and_tables(self):
+        """JOIN, alt sorgu, GROUP BY sayıları ve tablolar tek analizden gelir"""
+        sql = """
+            SELECT c.name, COUNT(*)
+            FROM public.customers c
+            LEFT JOIN orders o ON o.customer_id = c.id
+            WHERE o.id IN (SELECT order_id FROM payments)
+            GROUP BY c.name
+            HAVING COUNT(*) > 1
+        """
+        analysis = self.validator.analyze(sql)
+        assert analysis.statement_type == "SELECT"
+        assert analysis.tables == ("public.customers", "orders", "payments")
+        assert analysis.join_count == 1
+        assert analysis.subquery_count == 1
+        assert analysis.group_by_count == 1
+        assert analysis.having_count == 1
+        assert analysis.union_count == 0
+    
+    def test_cte_names_are_not_tables(self):
+        """WITH ile tanımlanan adlar tablo listesine girmez"""
+        sql = "WITH recent AS (SELECT * FROM orders) SELECT * FROM recent JOIN customers c ON c.id = recent.customer_id"
+        analysis = self.validator.analyze(sql)
+        assert analysis.statement_type == "WITH"
+        assert analysis.tables == ("orders", "customers")
+        assert self.validator.validate(sql) == (True, None)
+    
+    def test_sanitized_matches_format(self):
+        """Temizlenmiş metin sqlparse.format çıktısıyla aynıdır"""
+        sql = "select name from customers where city = 'İstanbul' order by name"
+        expected = "SELECT name\nFROM customers\nWHERE city = 'İstanbul'\nORDER BY name"
+        assert self.validator.sanitize_sql(sql) == expected
+    
+    def test_sanitize_keeps_string_spacing(self):
+        """String içindeki boşluklar korunur, yorum satırları kaldırılır"""
+        sql = "-- müşteriler\nSELECT * FROM customers WHERE name = 'Ali  Veli'"
+        sanitized = self.validator.sanitize_sql(sql)
+        assert "'Ali  Veli'" in sanitized
+        assert sanitized.startswith("SELECT")
+    
+    def test_parens_in_strings_are_ignored(self):
+        """String içindeki parantez dengeyi bozmaz"""
+        sql = "SELECT * FROM customers WHERE name = 'a(b'"
+        assert self.validator.validate(sql) == (True, None)
+    
+    def test_non_select_statement_rejected(self):
+        """SELECT/WITH dışındaki ifade türü reddedilir"""
+        is_valid, error = self.validator.validate("EXPLAIN SELECT * FROM customers")
+        assert is_valid is False
+        assert "EXPLAIN" in error
+    
+    def test_too_many_subqueries(self):
+        """Alt sorgu sayısı parantez farkından değil gerçek alt sorgulardan sayılır"""
+        nested = "SELECT 1"
+        for _ in range(6):
+            nested = f"SELECT * FROM ({nested}) s"
+        is_valid, error = self.validator.validate(nested)
+        assert is_valid is False
+        assert "alt sorgu" in error
+    
+    def test_scopes_and_predicates(self):
+        """Her SELECT kapsamı kendi kaynaklarını ve AND ile bağlı koşullarını taşır"""
+        sql = """
+            WITH totals AS (SELECT customer_id FROM orders GROUP BY customer_id)
+            SELECT * FROM customers c JOIN totals t ON t.customer_id = c.id
+            WHERE c.city = 'Ankara' AND 10 < c.age AND (c.a = 1 OR c.b = 2)
+              AND c.id IN (SELECT customer_id FROM payments)
+        """
+        main, cte, subquery = self.validator.analyze(sql).scopes
+        
+        assert [ref.name for ref in main.tables] == ["customers", "totals"]
+        assert [(p.left.name, p.operator, p.right) for p in main.predicates] == [
+            ("customer_id", "=", ColumnRef("c", "id")),
+            ("city", "=", None),
+            ("age", ">", None),
+            ("id", "IN", None),
+        ]
+        assert main.top_level and not main.grouped
+        assert (cte.name, cte.grouped, cte.top_level) == ("totals", True, False)
+        assert subquery.name is None and subquery.tables[0].name == "payments"
+    
+    def test_scope_aggregates_and_limit(self):
+        """Kapsam kendi seviyesindeki aggregate'leri ve sabit LIMIT'i taşır"""
+        sql = """
+            SELECT count(*), max(o.total) FROM orders o
+            WHERE o.customer_id IN (SELECT customer_id FROM customers LIMIT 5)
+            LIMIT 1
+        """
+        main, subquery = self.validator.analyze(sql).scopes
+        
+        assert (main.aggregated, main.limit) == (True, 1)
+        assert (subquery.aggregated, subquery.limit) == (False, 5)
+        
+        window, = self.validator.analyze("SELECT sum(x) OVER (ORDER BY y) FROM t").scopes
+        assert not window.aggregated and window.limit is None
+        assert not window.ordered
+    
+    def test_scope_ordered(self):
+        """ORDER BY, DISTINCT ve ALL'sız küme işlemleri kapsamı sıralı işaretler"""
+        def ordered(sql):
+            return [scope.ordered for scope in self.validator.analyze(sql).scopes]
+        
+        assert ordered("SELECT * FROM t LIMIT 5") == [False]
+        assert ordered("SELECT * FROM t ORDER BY id LIMIT 5") == [True]
+        assert ordered("SELECT a FROM t UNION ALL SELECT a FROM u LIMIT 5") == [False, False]
+        assert ordered("SELECT a FROM t UNION SELECT a FROM u LIMIT 5") == [True, True]
+        assert ordered("SELECT a FROM t UNION ALL SELECT a FROM u ORDER BY a") == [True, True]
+        
+        distinct, = self.validator.analyze("SELECT DISTINCT a FROM t LIMIT 5").scopes
+        assert distinct.ordered and [ref.name for ref in distinct.tables] == ["t"]
+
+
+
+class TestForbiddenPatterns:
+    """Birleşik yasaklı kelime/fonksiyon taraması testleri"""
+    
+    def setup_method(self):
+        self.validator = SQLValidator(strict_mode=True)
+    
+    def test_keywords_in_literals_and_identifiers_allowed(self):
+        """String değerleri, tırnaklı kolon adları ve yorumlar komut sayılmaz"""
+        for sql in (
+            "SELECT * FROM orders WHERE status = 'DELETED'",
+            'SELECT "update", "create" FROM audit_log',
+            "SELECT created_at, updated_by FROM orders",
+            "SELECT * FROM orders -- drop edilen siparişler hariç",
+            "SELECT $$ DROP $$ AS label",
+        ):
+            assert self.validator.validate(sql) == (True, None), sql
+    
+    def test_comment_and_escape_tricks_detected(self):
+        """Yorum veya kaçış karakteriyle gizlenmiş komutlar yakalanır"""
+        for sql in (
+            "SELECT 1 /* ' */; DROP TABLE x; -- '",
+            "SELECT 1 -- '\n; DELETE FROM x",
+            "SELECT E'a\\' ' ; DROP TABLE x; --'",
+            "SELECT 'a\\' ' ; DROP TABLE x; --'",
+        ):
+            is_valid, error = self.validator.validate(sql)
+            assert is_valid is False, sql
+            assert "Yasaklı komut" in error
+    
+    def test_multi_word_keyword(self):
+        """Çok kelimeli yasaklı komut boşluk farkına rağmen yakalanır"""
+        is_valid, error = self.validator.validate("START   TRANSACTION")
+        assert is_valid is False
+        assert "START TRANSACTION" in error
+    
+    def test_functions_detected_everywhere(self):
+        """Tehlikeli fonksiyonlar öneki, tırnaklı adı ve string içi SQL'de yakalanır"""
+        for sql, name in (
+            ("SELECT pg_sleep(5)", "pg_sleep"),
+            ("SELECT pg_sleep_for('5 s')", "pg_sleep"),
+            ('SELECT pg_catalog."pg_sleep"(5)', "pg_sleep"),
+            ("SELECT query_to_xml('select pg_sleep(10)', true, true, '')", "pg_sleep"),
+            ("SELECT dblink_exec('x')", "dblink_exec"),
+        ):
+            is_valid, error = self.validator.validate(sql)
+            assert is_valid is False, sql
+            assert f"Tehlikeli fonksiyon tespit edildi: {name}." in error
+
+
+class TestValidationCache:
+    """Validasyon sonucu ve analiz önbelleği testleri"""
+    
+    def setup_method(self):
+        self.cache = ValidationCache(max_entries=2)
+        self.validator = SQLValidator(strict_mode=True, cache=self.cache)
+    
+    def test_repeated_sql_skips_parsing(self):
+        """Aynı SQL ikinci kez geldiğinde sqlparse çağrılmaz"""
+        sql = "SELECT * FROM customers"
+        assert self.validator.validate(sql) == (True, None)
+        
+        with patch("src.validation.analyzer.sqlparse.parse") as parse:
+            assert self.validator.validate(sql) == (True, None)
+            assert self.validator.sanitize_sql(sql) == "SELECT *\nFROM customers"
+            assert self.validator.extract_table_names(sql) == ["customers"]
+            parse.assert_not_called()
+        
+        stats = self.cache.get_stats()
+        assert stats["size"] == 1
+        assert stats["hits"] == 3
+    
+    def test_failures_are_cached(self):
+        """Reddedilen SQL'in hata mesajı da önbellekten döner"""
+        outcome = self.validator.validate("DROP TABLE customers")
+        assert outcome[0] is False
+        assert self.validator.validate("DROP TABLE customers") == outcome
+        assert self.cache.get_stats()["hits"] == 1
+    
+    def test_key_includes_strict_mode_and_rules_version(self):
+        """Anahtar strict mode ve kural sürümüyle değişir"""
+        sql = "SELECT 1"
+        key = ValidationCache.key(sql, True)
+        assert key != ValidationCache.key(sql, False)
+        with patch("src.validation.validation_cache.RULES_VERSION", "other"):
+            assert ValidationCache.key(sql, True) != key
+    
+    def test_lru_eviction(self):
+        """Boyut aşılınca en uzun süredir kullanılmayan girdi atılır"""
+        self.validator.validate("SELECT 1")
+        self.validator.validate("SELECT 2")
+        self.validator.validate("SELECT 1")
+        self.validator.validate("SELECT 3")
+        
+        assert self.cache.get_outcome(ValidationCache.key("SELECT 1", True)) == (True, None)
+        assert self.cache.get_outcome(ValidationCache.key("SELECT 2", True)) is None
+        assert self.cache.get_stats()["evictions"] == 1
+
+
+SCHEMA = {
+    "customers": {
+        "name": "customers",
+        "schema": "public",
+        "columns": [{"name": "customer_id"}, {"name": "name"}, {"name": "city"}],
+    },
+    "orders": {
+        "name": "orders",
+        "schema": "public",
+        "columns": [{"name": "order_id"}, {"name": "customer_id"}, {"name": "total_amount"}],
+    },
+}
+
+
+class TestSchemaCheck:
+    """Schema'ya karşı tablo ve kolon kontrolü testleri"""
+    
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.validator = SQLValidator(strict_mode=True, schema_provider=lambda: SCHEMA)
+    
+    def test_known_references_pass(self):
+        """Schema'daki tablo, kolon ve alias'lar geçer"""
+        sql = """
+            WITH totals AS (SELECT customer_id, SUM(total_amount) AS total FROM orders GROUP BY customer_id)
+            SELECT c.name, t.total FROM customers c JOIN totals t ON t.customer_id = c.customer_id
+            ORDER BY total DESC
+        """
+        assert self.validator.validate(sql) == (True, None)
+    
+    def test_unknown_column_with_suggestion(self):
+        """Bilinmeyen kolon en yakın adla raporlanır"""
+        is_valid, error = self.validator.validate("SELECT o.totl_amount FROM orders o")
+        assert is_valid is False
+        assert "o.totl_amount" in error
+        assert "total_amount" in error
+    
+    def test_unknown_table(self):
+        """Bilinmeyen tablo kolonlardan önce raporlanır"""
+        issues = self.validator.check_schema("SELECT name FROM custmers")
+        assert [(issue.kind, issue.repair) for issue in issues] == [("table", "customers")]
+    
+    def test_suggest_repair(self):
+        """Tek ve açık öneri varsa SQL yerelde düzeltilir"""
+        repaired = self.validator.suggest_repair(
+            "SELECT c.nmae, 'custmers' FROM custmers c WHERE c.city = 'x'"
+        )
+        assert repaired is not None
+        sql, replacements = repaired
+        # Kolon hatası ancak tablo düzeldikten sonra görülür (ikinci tur)
+        assert replacements == {"custmers": "customers", "nmae": "name"}
+        assert sql == "SELECT c.name, 'custmers' FROM customers c WHERE c.city = 'x'"
+        assert self.validator.validate(sql) == (True, None)
+    
+    def test_no_repair_without_match(self):
+        """Yakın ad yoksa düzeltme önerilmez"""
+        assert self.validator.suggest_repair("SELECT zzzzzz FROM orders") is None
+    
+    def test_opaque_sources_skip_unqualified_columns(self):
+        """Kolonları bilinmeyen kaynaklarda çıplak kolonlar kontrol edilmez"""
+        sql = "SELECT o.order_id, n FROM orders o, generate_series(1, 3) AS g(n)"
+        assert self.validator.check_schema(sql) == []
+    
+    def test_system_catalog_tables_pass(self):
+        """pg_catalog, information_schema ve pg_ önekli tablolar bilinmeyen sayılmaz"""
+        for sql in (
+            "SELECT * FROM pg_stat_activity",
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'",
+            "SELECT c.relname FROM pg_catalog.pg_class c JOIN orders o ON o.order_id = c.oid",
+        ):
+            assert self.validator.check_schema(sql) == [], sql
+            assert self.validator.suggest_repair(sql) is None
+        
+        assert self.validator.check_schema("SELECT o.totl_amount FROM orders o, pg_class")
+    
+    def test_schema_errors_are_not_cached(self):
+        """Schema kontrolü sonucu kural önbelleğine yazılmaz"""
+        cache = ValidationCache(max_entries=8)
+        validator = SQLValidator(strict_mode=True, cache=cache, schema_provider=lambda: SCHEMA)
+        sql = "SELECT nmae FROM customers"
+        assert validator.validate(sql)[0] is False
+        assert cache.get_outcome(ValidationCache.key(sql, True)) == (True, None)
+    
+    def test_edit_distance(self):
+        """Yer değiştirme tek işlem sayılır"""
+        assert edit_distance("name", "nmae") == 1
+        assert edit_distance("orders", "order") == 1
+        assert edit_distance("", "abc") == 3